@@ -0,0 +1,12 @@
+public class MaxMin {
+    public static void main(String[] args) {
+        int[] arr = {5, 8, 3, 7, 2};
+        int max = arr[0];
+        int min = arr[0];
+        for (int i = 1; i < arr.length; i++) {
+            if (arr[i] > max) max = arr[i];
+            if (arr[i] < min) min = arr[i];
+        }
+        System.out.println("max = " + max + ", min = " + min);
+    }
+}
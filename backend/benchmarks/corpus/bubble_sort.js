@@ -0,0 +1,16 @@
+// Bubble sort: repeatedly swap adjacent out-of-order elements
+function bubbleSort(arr) {
+  let n = arr.length;
+  for (let i = 0; i < n; i++) {
+    for (let j = 0; j < n - i - 1; j++) {
+      if (arr[j] > arr[j + 1]) {
+        let tmp = arr[j];
+        arr[j] = arr[j + 1];
+        arr[j + 1] = tmp;
+      }
+    }
+  }
+  return arr;
+}
+
+console.log(bubbleSort([5, 2, 8, 1, 4]));
@@ -0,0 +1,9 @@
+def count_even(nums):
+    count = 0
+    for n in nums:
+        if n % 2 == 0:
+            count += 1
+    return count
+
+
+print(count_even([2, 3, 2, 5, 3]))
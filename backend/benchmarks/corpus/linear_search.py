@@ -0,0 +1,10 @@
+# Linear search: return the index of target in arr, or -1
+def linear_search(arr, target):
+    for i in range(len(arr)):
+        if arr[i] == target:
+            return i
+    return -1
+
+
+numbers = [4, 8, 15, 16, 23, 42]
+print(linear_search(numbers, 23))
@@ -0,0 +1,26 @@
+def merge_sort(arr):
+    # Divide the list in half, sort each half, then merge them
+    if len(arr) <= 1:
+        return arr
+    middle = len(arr) // 2
+    left = merge_sort(arr[:middle])
+    right = merge_sort(arr[middle:])
+    return merge(left, right)
+
+
+def merge(left, right):
+    merged = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged
+
+
+print(merge_sort([4, 2, 7, 1, 5]))
@@ -0,0 +1,31 @@
+#include <iostream>
+#include <vector>
+
+// Lomuto partition around the last element
+int partition(std::vector<int>& arr, int low, int high) {
+    int pivot = arr[high];
+    int i = low - 1;
+    for (int j = low; j < high; j++) {
+        if (arr[j] < pivot) {
+            i++;
+            std::swap(arr[i], arr[j]);
+        }
+    }
+    std::swap(arr[i + 1], arr[high]);
+    return i + 1;
+}
+
+void quickSort(std::vector<int>& arr, int low, int high) {
+    if (low < high) {
+        int p = partition(arr, low, high);
+        quickSort(arr, low, p - 1);
+        quickSort(arr, p + 1, high);
+    }
+}
+
+int main() {
+    std::vector<int> arr = {3, 6, 8, 10, 1};
+    quickSort(arr, 0, arr.size() - 1);
+    for (int v : arr) std::cout << v << " ";
+    return 0;
+}
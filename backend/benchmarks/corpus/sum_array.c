@@ -0,0 +1,16 @@
+#include <stdio.h>
+
+/* Sum every element of an array */
+int sum_array(int arr[], int n) {
+    int sum = 0;
+    for (int i = 0; i < n; i++) {
+        sum += arr[i];
+    }
+    return sum;
+}
+
+int main() {
+    int arr[] = {1, 4, 2, 8, 3};
+    printf("%d\n", sum_array(arr, 5));
+    return 0;
+}
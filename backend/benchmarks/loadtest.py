@@ -0,0 +1,294 @@
+# backend/benchmarks/loadtest.py
+#
+# Load generator for the API. Virtual students replay a weighted mix of
+# /api/analyze, /api/evaluate and /api/video requests built from the
+# benchmark corpus, and the run reports latency percentiles, throughput and
+# error rates per route.
+#
+# Targets:
+#   (default)        backend.main:app in-process over httpx's ASGI transport
+#   --uvicorn        a uvicorn server started on a local port for the run
+#   --url URL        an already running server
+#
+#   python -m backend.benchmarks.loadtest --concurrency 50 --duration 30
+#   python -m backend.benchmarks.loadtest --mix analyze=1,evaluate=1 --fresh 0.5
+#   python -m backend.benchmarks.loadtest --url http://127.0.0.1:8001 --json out.json
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+
+from backend.benchmarks.run import load_corpus
+
+DEFAULT_MIX = {"analyze": 4, "evaluate": 4, "video": 2}
+
+ROUTES = {
+    "analyze": "/api/analyze/",
+    "evaluate": "/api/evaluate/",
+    "video": "/api/video/",
+}
+
+CONCEPTS = (
+    "linear_search", "binary_search", "sorting", "merge_sort",
+    "quick_sort", "array_max_min", "loop", "unknown",
+)
+
+
+# ─────────────────────────────────────────
+# TRAFFIC
+# ─────────────────────────────────────────
+class Traffic:
+    """
+    Builds requests for the mix. A --fresh share of submissions is a
+    one-off edit of a corpus sample (a cache miss); the rest resubmit
+    the sample unchanged, like students running starter code.
+    """
+
+    def __init__(self, mix, fresh: float, seed: int):
+        self.rng = random.Random(seed)
+        self.routes = list(mix)
+        self.weights = [mix[route] for route in self.routes]
+        self.fresh = fresh
+        self.samples = [(code, language) for _, code, language in load_corpus()]
+        self.analysis_ids = {}
+        self.edits = 0
+
+    def submission(self):
+        code, language = self.rng.choice(self.samples)
+        if self.rng.random() < self.fresh:
+            self.edits += 1
+            code = f"{code}\n# attempt {self.edits}\n" if language == "python" else f"{code}\n// attempt {self.edits}\n"
+        return code, language
+
+    def next_request(self):
+        route = self.rng.choices(self.routes, self.weights)[0]
+        if route == "video":
+            params = {"language": "python", "concept": self.rng.choice(CONCEPTS)}
+            return route, "GET", {"params": params}, None
+
+        code, language = self.submission()
+        body = {"code": code, "language": language}
+        if route == "evaluate" and code in self.analysis_ids:
+            body["analysisId"] = self.analysis_ids[code]
+        return route, "POST", {"json": body}, code
+
+    def record(self, route, code, response):
+        # Later evaluations of the same code reuse the analysis, as the UI does
+        if route == "analyze" and response.status_code == 200:
+            analysis_id = response.json().get("analysisId")
+            if analysis_id:
+                self.analysis_ids[code] = analysis_id
+
+
+# ─────────────────────────────────────────
+# TARGETS
+# ─────────────────────────────────────────
+@asynccontextmanager
+async def asgi_client():
+    from backend.main import app
+
+    # httpx's transport doesn't send lifespan events, so run startup here
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            yield client
+
+
+@asynccontextmanager
+async def url_client(url: str, concurrency: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        yield client
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(concurrency: int):
+    port = _free_port()
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ])
+    url = f"http://127.0.0.1:{port}"
+    try:
+        async with url_client(url, concurrency) as client:
+            for _ in range(100):
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start within 10s")
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# ─────────────────────────────────────────
+# RUN
+# ─────────────────────────────────────────
+async def student(client, traffic, deadline, remaining, latencies, statuses, warmup):
+    while time.perf_counter() < deadline:
+        if remaining is not None:
+            if remaining[0] <= 0:
+                return
+            remaining[0] -= 1
+
+        route, method, kwargs, code = traffic.next_request()
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, ROUTES[route], **kwargs)
+            status = response.status_code
+            traffic.record(route, code, response)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        elapsed = time.perf_counter() - start
+
+        if warmup[0] > 0:
+            warmup[0] -= 1
+            continue
+        latencies[route].append(elapsed)
+        statuses[route][status] += 1
+
+
+async def run_load(client, traffic, concurrency, duration, requests, warmup):
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    remaining = [requests + warmup] if requests else None
+    start = time.perf_counter()
+    deadline = start + duration if duration else float("inf")
+
+    await asyncio.gather(*(
+        student(client, traffic, deadline, remaining, latencies, statuses, [warmup // concurrency])
+        for _ in range(concurrency)
+    ))
+    return latencies, statuses, time.perf_counter() - start
+
+
+# ─────────────────────────────────────────
+# REPORT
+# ─────────────────────────────────────────
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, elapsed):
+    report = {}
+    for route in sorted(set(latencies) | set(statuses)):
+        values = sorted(latencies[route])
+        count = len(values)
+        errors = sum(n for status, n in statuses[route].items() if not (isinstance(status, int) and status < 400))
+        report[route] = {
+            "requests": count,
+            "throughput": count / elapsed,
+            "p50Ms": percentile(values, 50) * 1000,
+            "p95Ms": percentile(values, 95) * 1000,
+            "p99Ms": percentile(values, 99) * 1000,
+            "maxMs": (values[-1] if values else 0.0) * 1000,
+            "errorRate": errors / count if count else 0.0,
+            "statuses": {str(status): n for status, n in statuses[route].items()},
+        }
+
+    total = sum(r["requests"] for r in report.values())
+    all_values = sorted(v for values in latencies.values() for v in values)
+    errors = sum(r["errorRate"] * r["requests"] for r in report.values())
+    report["total"] = {
+        "requests": total,
+        "throughput": total / elapsed,
+        "p50Ms": percentile(all_values, 50) * 1000,
+        "p95Ms": percentile(all_values, 95) * 1000,
+        "p99Ms": percentile(all_values, 99) * 1000,
+        "maxMs": (all_values[-1] if all_values else 0.0) * 1000,
+        "errorRate": errors / total if total else 0.0,
+        "statuses": {},
+    }
+    return report
+
+
+def print_report(report, elapsed, concurrency):
+    print(f"\n{concurrency} concurrent students, {elapsed:.1f}s\n")
+    print(f"{'route':<10} {'reqs':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}  statuses")
+    for route, r in report.items():
+        statuses = " ".join(f"{status}:{n}" for status, n in sorted(r["statuses"].items()))
+        print(
+            f"{route:<10} {r['requests']:>7} {r['throughput']:>9.1f} {r['p50Ms']:>9.1f} {r['p95Ms']:>9.1f}"
+            f" {r['p99Ms']:>9.1f} {r['maxMs']:>9.1f} {r['errorRate']:>6.1%}  {statuses}"
+        )
+
+
+def parse_mix(text: str):
+    mix = {}
+    for part in text.split(","):
+        route, _, weight = part.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {route!r} (expected one of {', '.join(ROUTES)})")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+async def main_async(args):
+    traffic = Traffic(args.mix, args.fresh, args.seed)
+    if args.url:
+        target = url_client(args.url, args.concurrency)
+    elif args.uvicorn:
+        target = uvicorn_client(args.concurrency)
+    else:
+        target = asgi_client()
+
+    async with target as client:
+        latencies, statuses, elapsed = await run_load(
+            client, traffic, args.concurrency, args.duration, args.requests, args.warmup,
+        )
+
+    report = summarize(latencies, statuses, elapsed)
+    print_report(report, elapsed, args.concurrency)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"concurrency": args.concurrency, "elapsed": elapsed, "routes": report}, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Learn-Flow-AR API.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server (default: in-process ASGI)")
+    target.add_argument("--uvicorn", action="store_true", help="start uvicorn on a free local port")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent virtual students")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (0 = until --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests")
+    parser.add_argument("--warmup", type=int, default=0, help="initial requests left out of the stats")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="route weights, e.g. analyze=4,evaluate=4,video=2")
+    parser.add_argument("--fresh", type=float, default=0.3, help="share of submissions that are new code")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+    if not args.duration and not args.requests:
+        parser.error("set --duration or --requests")
+
+    report = asyncio.run(main_async(args))
+    return 1 if report["total"]["requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
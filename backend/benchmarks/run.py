@@ -0,0 +1,365 @@
+# backend/benchmarks/run.py
+#
+# Micro-benchmarks for each pipeline stage. Code stages run over the sample
+# submissions in benchmarks/corpus, resized to 100 B … 1 MB by repetition;
+# animation generators run over random arrays of 5 … 5000 elements.
+#
+# For every case the runner reports time per call, throughput, peak traced
+# memory during one call, memory still held after it and the number of
+# allocated blocks behind that. Results can be saved as a baseline and later
+# runs compared against it.
+#
+#   python -m backend.benchmarks.run
+#   python -m backend.benchmarks.run --quick --only detect_
+#   python -m backend.benchmarks.run --save baseline.json
+#   python -m backend.benchmarks.run --compare baseline.json --threshold 0.15
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from backend import config
+from backend.services.analysis_context import (
+    LANGUAGE_KEYWORDS,
+    PATTERN_KEYWORDS,
+    PROBLEM_KEYWORDS,
+    build_context,
+)
+from backend.services.ar_animation_engine import (
+    collect_frames,
+    generate_array_max_min_animation,
+    generate_binary_search_animation,
+    generate_linear_search_animation,
+    generate_merge_sort_animation,
+    generate_quick_sort_animation,
+    generate_sorting_animation,
+    iter_counting_frames,
+    iter_loop_frames,
+    iter_sum_array_frames,
+)
+from backend.services.animation_cache import ANIMATION_CACHE, generate_animation
+from backend.services.ar_payload_generator import generate_ar_payload
+from backend.services.evaluator import evaluate_code
+from backend.services.keyword_matcher import KeywordMatcher
+from backend.services.problem_detector import detect_problem
+from backend.services.problem_registry import problem_ids
+from backend.services.python_ast_analyzer import AST_CACHE
+from backend.services.solution_generator import (
+    analyze_code,
+    analyze_patterns,
+    classify_solution,
+    detect_language_from_code,
+    generate_solutions,
+    precompute_solution_tables,
+)
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+CODE_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+ARRAY_SIZES = (5, 50, 500, 5_000)
+QUICK_CODE_SIZES = (100, 1_000, 10_000)
+QUICK_ARRAY_SIZES = (5, 50, 500)
+
+LANGUAGE_BY_SUFFIX = {
+    ".py": "python",
+    ".js": "javascript",
+    ".java": "java",
+    ".c": "c",
+    ".cpp": "cpp",
+}
+
+KEYWORDS = LANGUAGE_KEYWORDS + PROBLEM_KEYWORDS + PATTERN_KEYWORDS
+
+# Bubble sort traces grow with n², so larger arrays only measure swapping
+SORTING_MAX_ARRAY = 500
+
+
+# ─────────────────────────────────────────
+# INPUTS
+# ─────────────────────────────────────────
+def load_corpus():
+    samples = []
+    for path in sorted(CORPUS_DIR.iterdir()):
+        language = LANGUAGE_BY_SUFFIX.get(path.suffix)
+        if language:
+            samples.append((path.name, path.read_text(), language))
+    return samples
+
+
+def resize(code: str, size: int):
+    """Repeat (or cut) a sample so it is exactly size characters long."""
+    if len(code) < size:
+        code = "\n".join([code] * (size // (len(code) + 1) + 1))
+    return code[:size]
+
+
+def random_array(n: int, seed: int = 7):
+    rng = random.Random(seed + n)
+    return [rng.randint(0, 10 * n) for _ in range(n)]
+
+
+# ─────────────────────────────────────────
+# CASES
+# each case is (name, fn, bytes processed per call or None)
+# ─────────────────────────────────────────
+def code_cases(sizes):
+    corpus = load_corpus()
+    for size in sizes:
+        inputs = [(resize(code, size), language) for _, code, language in corpus]
+        contexts = [build_context(code) for code, _ in inputs]
+        detected = [detect_language_from_code(ctx) for ctx in contexts]
+        analyses = [analyze_code(code, language)["analysis"] for code, language in inputs]
+        nbytes = sum(len(code) for code, _ in inputs)
+        lowered = [code.lower() for code, _ in inputs]
+        matcher = KeywordMatcher(KEYWORDS)
+
+        def run_keyword_scan():
+            for text in lowered:
+                hits = matcher.counts(text)
+                for kw in KEYWORDS:
+                    kw in hits
+
+        # The original detectors: one `kw in code_lower` per keyword
+        def run_keyword_scan_baseline():
+            for text in lowered:
+                for kw in KEYWORDS:
+                    kw in text
+
+        def run_build_context():
+            for code, _ in inputs:
+                build_context(code)
+
+        def run_detect_language():
+            for ctx in contexts:
+                detect_language_from_code(ctx)
+
+        def run_detect_problem():
+            for ctx in contexts:
+                detect_problem(ctx)
+
+        def run_analyze_patterns():
+            for ctx, language in zip(contexts, detected):
+                AST_CACHE.clear()
+                analyze_patterns(ctx, language)
+
+        def run_classify_solution():
+            for analysis in analyses:
+                classify_solution(analysis["patternsDetected"])
+
+        def run_generate_solutions():
+            for code, language in inputs:
+                AST_CACHE.clear()
+                generate_solutions(code, language)
+
+        def run_evaluate_code():
+            for (code, language), analysis in zip(inputs, analyses):
+                evaluate_code(code, language, analysis)
+
+        yield f"keyword_scan[{size}B]", run_keyword_scan, nbytes
+        yield f"keyword_scan.baseline[{size}B]", run_keyword_scan_baseline, nbytes
+        yield f"build_context[{size}B]", run_build_context, nbytes
+        yield f"detect_language_from_code[{size}B]", run_detect_language, nbytes
+        yield f"detect_problem[{size}B]", run_detect_problem, nbytes
+        yield f"analyze_patterns[{size}B]", run_analyze_patterns, nbytes
+        yield f"classify_solution[{size}B]", run_classify_solution, None
+        yield f"generate_solutions[{size}B]", run_generate_solutions, nbytes
+        yield f"evaluate_code[{size}B]", run_evaluate_code, None
+
+
+ENGINE_GENERATORS = {
+    "linear_search": lambda arr: generate_linear_search_animation(arr, -1),
+    "binary_search": lambda arr: generate_binary_search_animation(sorted(arr), -1),
+    "sorting": generate_sorting_animation,
+    "array_max_min": generate_array_max_min_animation,
+    "merge_sort": generate_merge_sort_animation,
+    "quick_sort": generate_quick_sort_animation,
+    "loop": lambda arr: collect_frames(iter_loop_frames(arr)),
+    "counting": lambda arr: collect_frames(iter_counting_frames(arr)),
+    "sum_array": lambda arr: collect_frames(iter_sum_array_frames(arr)),
+}
+
+
+def _uncached_payload(problem):
+    ANIMATION_CACHE.clear()
+    return generate_ar_payload(problem, "", "python")
+
+
+def ar_cases(sizes):
+    for problem in (*problem_ids(), "unknown"):
+        yield f"generate_ar_payload[{problem}]", lambda p=problem: _uncached_payload(p), None
+
+    for name, generate in ENGINE_GENERATORS.items():
+        for n in sizes:
+            if name == "sorting" and n > SORTING_MAX_ARRAY:
+                continue
+            arr = random_array(n)
+            yield f"engine.{name}[n={n}]", lambda g=generate, a=arr: g(a), None
+
+    # Repeat lookups: hashing the input and expanding the compact trace
+    arr = random_array(sizes[-1])
+    yield f"generate_animation[merge_sort,memoized,n={sizes[-1]}]", lambda: generate_animation("merge_sort", arr), None
+
+
+# ─────────────────────────────────────────
+# MEASUREMENT
+# ─────────────────────────────────────────
+@contextmanager
+def unlimited_tokens():
+    """
+    Lift config.MAX_TOKENS while benchmarking, so large inputs measure the
+    stages themselves rather than the budget rejection that would stop
+    them first in production. Restored on exit.
+    """
+    saved = config.MAX_TOKENS
+    config.MAX_TOKENS = sys.maxsize
+    try:
+        yield
+    finally:
+        config.MAX_TOKENS = saved
+
+
+def measure(fn, nbytes, min_time: float):
+    fn()  # warm-up: imports, solution tables, lazy registry entries
+
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    per_call = elapsed / calls
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    # Blocks allocated by the call and still live: its result and anything
+    # it cached. Snapshot bookkeeping itself is filtered out.
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "filename")
+    blocks = sum(stat.count_diff for stat in diff)
+
+    return {
+        "calls": calls,
+        "msPerCall": per_call * 1000,
+        "opsPerSec": 1 / per_call,
+        "mbPerSec": nbytes / per_call / 1e6 if nbytes else None,
+        "peakKiB": (peak - base) / 1024,
+        "retainedKiB": (current - base) / 1024,
+        "allocBlocks": blocks,
+    }
+
+
+def run(cases, min_time: float, only=None):
+    results = {}
+    for name, fn, nbytes in cases:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = stats = measure(fn, nbytes, min_time)
+        print(_format_row(name, stats), flush=True)
+    return results
+
+
+# ─────────────────────────────────────────
+# REPORTING
+# ─────────────────────────────────────────
+_HEADER = (
+    f"{'case':<42} {'calls':>7} {'ms/call':>10} {'ops/s':>10} {'MB/s':>8}"
+    f" {'peak KiB':>10} {'kept KiB':>9} {'blocks':>8}"
+)
+
+
+def _format_row(name, stats):
+    mb = f"{stats['mbPerSec']:.1f}" if stats["mbPerSec"] is not None else "-"
+    return (
+        f"{name:<42} {stats['calls']:>7} {stats['msPerCall']:>10.3f} {stats['opsPerSec']:>10.1f}"
+        f" {mb:>8} {stats['peakKiB']:>10.1f} {stats['retainedKiB']:>9.1f} {stats['allocBlocks']:>8}"
+    )
+
+
+def compare(results, baseline, threshold: float):
+    """Print time/peak-memory/block ratios against a baseline; return regressions."""
+    print(f"\n{'case':<42} {'time':>8} {'peak':>8} {'blocks':>8}")
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<42} {'new':>8}")
+            continue
+        time_ratio = stats["msPerCall"] / base["msPerCall"]
+        peak_ratio = (stats["peakKiB"] + 1) / (base["peakKiB"] + 1)
+        # Baselines saved before allocBlocks existed have no block count
+        block_ratio = None
+        if "allocBlocks" in base:
+            block_ratio = (stats["allocBlocks"] + 1) / (base["allocBlocks"] + 1)
+        blocks = f"{block_ratio:>7.2f}x" if block_ratio is not None else f"{'-':>8}"
+        flag = ""
+        if (
+            time_ratio > 1 + threshold
+            or peak_ratio > 1 + threshold
+            or (block_ratio is not None and block_ratio > 1 + threshold)
+        ):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif time_ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<42} {time_ratio:>7.2f}x {peak_ratio:>7.2f}x {blocks}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Learn-Flow-AR pipeline stages.")
+    parser.add_argument("--quick", action="store_true", help="small inputs only (up to 10 KB / 500 elements)")
+    parser.add_argument("--only", action="append", help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend timing each case")
+    parser.add_argument("--save", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change reported as a regression")
+    args = parser.parse_args(argv)
+
+    precompute_solution_tables()
+
+    code_sizes = QUICK_CODE_SIZES if args.quick else CODE_SIZES
+    array_sizes = QUICK_ARRAY_SIZES if args.quick else ARRAY_SIZES
+
+    print(_HEADER)
+    with unlimited_tokens():
+        results = run(code_cases(code_sizes), args.min_time, args.only)
+    results.update(run(ar_cases(array_sizes), args.min_time, args.only))
+
+    if args.save:
+        args.save.write_text(json.dumps({
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }, indent=2))
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
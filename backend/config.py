@@ -0,0 +1,98 @@
+# backend/config.py
+import os
+import tempfile
+
+
+def _env_int(name: str, default: int):
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name: str, default: float):
+    return float(os.environ.get(name, default))
+
+
+# --------------------------------------------------
+# RESULT CACHE (generate_solutions)
+# --------------------------------------------------
+RESULT_CACHE_MAX_ENTRIES = _env_int("LEARNFLOW_CACHE_MAX_ENTRIES", 1024)
+RESULT_CACHE_TTL_SECONDS = _env_float("LEARNFLOW_CACHE_TTL_SECONDS", 3600)
+RESULT_CACHE_MAX_BYTES = _env_int("LEARNFLOW_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+ANALYSIS_CACHE_MAX_ENTRIES = _env_int("LEARNFLOW_ANALYSIS_CACHE_MAX_ENTRIES", 16384)
+
+# --------------------------------------------------
+# AR SCENES (/api/ar)
+# --------------------------------------------------
+AR_SCENE_CACHE_MAX_ENTRIES = _env_int("LEARNFLOW_AR_CACHE_MAX_ENTRIES", 256)
+# Memoized animation traces are bounded by size only
+ANIMATION_CACHE_MAX_BYTES = _env_int("LEARNFLOW_ANIMATION_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+# --------------------------------------------------
+# JSON SERIALIZATION
+# --------------------------------------------------
+# Opt in to the orjson-backed encoder (falls back to stdlib json if missing)
+FAST_JSON = os.environ.get("LEARNFLOW_FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+# --------------------------------------------------
+# PYTHON AST ANALYZER
+# --------------------------------------------------
+# Submissions whose tree exceeds this many nodes fall back to keyword analysis
+AST_NODE_BUDGET = _env_int("LEARNFLOW_AST_NODE_BUDGET", 50000)
+AST_CACHE_MAX_ENTRIES = _env_int("LEARNFLOW_AST_CACHE_MAX_ENTRIES", 4096)
+
+# --------------------------------------------------
+# WORKER PROCESSES
+# --------------------------------------------------
+# 0 = one per CPU
+WORKER_PROCESSES = _env_int("LEARNFLOW_WORKER_PROCESSES", 0)
+# Max tasks running or waiting in the pool; interactive requests beyond it get 503
+WORKER_QUEUE_DEPTH = _env_int("LEARNFLOW_WORKER_QUEUE_DEPTH", 64)
+# Seconds a request waits on one pool task before answering 504
+WORKER_TASK_TIMEOUT = _env_float("LEARNFLOW_WORKER_TASK_TIMEOUT", 10)
+BATCH_MAX_ITEMS = _env_int("LEARNFLOW_BATCH_MAX_ITEMS", 500)
+# Of WORKER_QUEUE_DEPTH, how many slots batch items may hold at once; the
+# rest stay free for interactive requests
+BATCH_QUEUE_DEPTH = _env_int("LEARNFLOW_BATCH_QUEUE_DEPTH", 16)
+
+# --------------------------------------------------
+# INPUT / OUTPUT BUDGETS
+# --------------------------------------------------
+MAX_CODE_BYTES = _env_int("LEARNFLOW_MAX_CODE_BYTES", 256 * 1024)
+# Every token is at least one character, so this default can't reject code
+# that passed MAX_CODE_BYTES: oversized input gets 413, never 422
+MAX_TOKENS = _env_int("LEARNFLOW_MAX_TOKENS", MAX_CODE_BYTES)
+MAX_ANIMATION_FRAMES = _env_int("LEARNFLOW_MAX_ANIMATION_FRAMES", 20000)
+
+# --------------------------------------------------
+# PROFILING (X-Profile: 1 or ?profile=1)
+# --------------------------------------------------
+# Off unless the operator turns it on
+PROFILING_ENABLED = os.environ.get("LEARNFLOW_PROFILING", "0").lower() in ("1", "true", "yes")
+# When set, X-Profile / ?profile= must carry this token instead of "1",
+# and GET /api/profiles/{id} needs it in X-Profile too
+PROFILE_TOKEN = os.environ.get("LEARNFLOW_PROFILE_TOKEN", "")
+# Share of requests profiled without asking (0 = only on request)
+PROFILE_SAMPLE_RATE = _env_float("LEARNFLOW_PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_DIR = os.environ.get(
+    "LEARNFLOW_PROFILE_DIR",
+    os.path.join(tempfile.gettempdir(), "learnflow-profiles"),
+)
+# Oldest profiles are deleted beyond this many
+PROFILE_MAX_FILES = _env_int("LEARNFLOW_PROFILE_MAX_FILES", 200)
+
+# --------------------------------------------------
+# CODE TRACING SANDBOX (POST /api/ar/trace)
+# --------------------------------------------------
+# Runs submitted code: off unless explicitly enabled, and even then only
+# when the workers can be isolated (see services/sandbox.py). While off,
+# traces fall back to the sample scenes.
+SANDBOX_ENABLED = os.environ.get("LEARNFLOW_SANDBOX", "0").lower() in ("1", "true", "yes")
+# Account the workers drop to when the server runs as root (must not be
+# root). An unprivileged server's workers keep its uid instead.
+SANDBOX_USER = os.environ.get("LEARNFLOW_SANDBOX_USER", "nobody")
+# Idle pre-started workers
+SANDBOX_WORKERS = _env_int("LEARNFLOW_SANDBOX_WORKERS", 2)
+SANDBOX_CPU_SECONDS = _env_float("LEARNFLOW_SANDBOX_CPU_SECONDS", 2)
+SANDBOX_WALL_SECONDS = _env_float("LEARNFLOW_SANDBOX_WALL_SECONDS", 5)
+SANDBOX_MEMORY_MB = _env_int("LEARNFLOW_SANDBOX_MEMORY_MB", 256)
+# Recorded list reads/writes per run; longer runs are cut off and marked truncated
+SANDBOX_MAX_EVENTS = _env_int("LEARNFLOW_SANDBOX_MAX_EVENTS", 20000)
@@ -20,10 +20,144 @@
 # @app.get("/")
 # def health():
 #     return {"status": "Backend running"}
-from fastapi import FastAPI
-from backend.routes import analyze, evaluate, video, ar
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from backend.routes import analyze, evaluate, video, ar, metrics, profiles
+from backend.services.ar_payload_generator import precompute_ar_scenes
+from backend.services.budgets import BudgetExceeded
+from backend.services.metrics import (
+    REQUEST_SECONDS,
+    REQUESTS_TOTAL,
+    RESPONSE_BYTES,
+    RequestTrace,
+    end_trace,
+    start_trace,
+)
+from backend.services.profiling import save_profile, should_profile
+from backend.services.sandbox import shutdown_sandbox_pool
+from backend.services.serialization import FastJSONResponse
+from backend.services.solution_generator import DETECTED_LANGUAGES, precompute_solution_tables
+from backend.services.worker_pool import (
+    WorkerPoolSaturated,
+    WorkerTimeout,
+    shutdown_process_pool,
+    start_process_pool,
+)
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI(title="Learn-Flow-AR Backend")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Render every built-in AR sample scene and solution table once,
+    # before serving traffic
+    precompute_ar_scenes(DETECTED_LANGUAGES)
+    precompute_solution_tables()
+    # Spawn the analysis workers now so the first request doesn't pay for it
+    await asyncio.to_thread(start_process_pool)
+    yield
+    shutdown_sandbox_pool()
+    shutdown_process_pool()
+
+
+def _route_template(scope):
+    """
+    Full path template for the matched route, e.g. /api/ar/{analysis_id}.
+    Routes of an included router may only know their own suffix, so the
+    prefix is taken from the concrete path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    try:
+        concrete = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """Latency, status and response size per route template for /metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            # Label by template, not the raw path, to bound cardinality
+            route = _route_template(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=scope["method"])
+            RESPONSE_BYTES.observe(size, route=route)
+            REQUESTS_TOTAL.inc(route=route, method=scope["method"], status=status)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds Server-Timing (per-stage durations) and X-Request-ID headers, and
+    stores a profile for requests that asked for one (see profiling.py).
+    Streamed responses only report the stages done before their headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = should_profile(Headers(scope=scope), QueryParams(scope["query_string"]))
+        trace = RequestTrace(uuid.uuid4().hex, profile)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing(time.perf_counter() - start))
+                headers.append("X-Request-ID", trace.request_id)
+                if trace.profiles:
+                    headers.append("X-Profile-URL", f"/api/profiles/{trace.request_id}")
+            await send(message)
+
+        token = start_trace(trace)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_trace(token)
+            if trace.profiles:
+                await asyncio.to_thread(save_profile, trace.request_id, trace.profiles)
+
+
+app = FastAPI(
+    title="Learn-Flow-AR Backend",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,13 +165,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID", "X-Profile-URL"],
 )
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
 
 app.include_router(analyze.router, prefix="/api/analyze")
 app.include_router(evaluate.router, prefix="/api/evaluate")
 app.include_router(video.router, prefix="/api/video")
 app.include_router(ar.router, prefix="/api/ar")
+app.include_router(profiles.router, prefix="/api/profiles")
+app.include_router(metrics.router)
+
+@app.exception_handler(BudgetExceeded)
+async def budget_exceeded(request: Request, exc: BudgetExceeded):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+
+@app.exception_handler(WorkerPoolSaturated)
+async def pool_saturated(request: Request, exc: WorkerPoolSaturated):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(WorkerTimeout)
+async def pool_timeout(request: Request, exc: WorkerTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
 
 @app.get("/")
-def health():
+async def health():
     return {"status": "Backend running"}
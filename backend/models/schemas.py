@@ -1,6 +1,20 @@
 # models/schemas.py
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from backend import config
+
 
 class CodeRequest(BaseModel):
     code: str
     language: str
+
+
+class EvaluateRequest(CodeRequest):
+    # "analysisId" returned by /api/analyze; lets evaluate skip re-analysis
+    analysisId: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[CodeRequest] = Field(..., max_length=config.BATCH_MAX_ITEMS)
@@ -1,9 +1,57 @@
+import asyncio
+
 from fastapi import APIRouter
-from backend.models.schemas import CodeRequest
-from backend.services.solution_generator import generate_solutions
+from fastapi.responses import StreamingResponse
+from backend.models.schemas import BatchRequest, CodeRequest
+from backend.services.budgets import BudgetExceeded, check_code_size
+from backend.services.result_cache import content_key
+from backend.services.serialization import dumps, json_response
+from backend.services.solution_generator import (
+    SOLUTION_CACHE,
+    generate_solutions,
+    store_solutions,
+)
+from backend.services.worker_pool import run_cpu
 
 router = APIRouter()
 
+
+async def _solutions(code: str, language: str, wait: bool = False):
+    # Cache lookups stay on the event loop; only misses go to the CPU pool
+    check_code_size(code)
+    key = content_key(code, language)
+    result = SOLUTION_CACHE.get(key)
+    if result is None:
+        solutions = await run_cpu(generate_solutions, code, language, wait=wait)
+        result = store_solutions(key, solutions)
+    return result
+
+
 @router.post("/")
-def analyze_code(request: CodeRequest):
-    return generate_solutions(request.code, request.language)
+async def analyze_code(request: CodeRequest):
+    return json_response(await _solutions(request.code, request.language))
+
+
+async def _analyze_item(index: int, item: CodeRequest):
+    try:
+        result = await _solutions(item.code, item.language, wait=True)
+        return {"index": index, "ok": True, "result": result}
+    except BudgetExceeded as exc:
+        return {"index": index, "ok": False, "status": exc.status_code, "error": exc.detail}
+    except Exception as exc:
+        return {"index": index, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+@router.post("/batch")
+async def analyze_batch(request: BatchRequest, stream: bool = False):
+    # Items wait for one of the batch pool slots rather than failing when
+    # the queue is full; the remaining slots stay free for interactive calls
+    tasks = [_analyze_item(i, item) for i, item in enumerate(request.items)]
+
+    if stream:
+        async def ndjson():
+            for finished in asyncio.as_completed(tasks):
+                yield dumps(await finished) + b"\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    return json_response({"results": await asyncio.gather(*tasks)})
@@ -1,2 +1,147 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from backend import config
+from backend.models.schemas import CodeRequest
+from backend.services.ar_animation_engine import DETAIL_LEVELS, FULL
+from backend.services.ar_encoding import BINARY_MEDIA_TYPE, encode_ar_binary
+from backend.services.ar_payload_generator import (
+    build_ar_scene,
+    iter_ar_stream,
+    lookup_ar_scene,
+    store_ar_scene,
+)
+from backend.services.budgets import check_code_size
+from backend.services.metrics import stage
+from backend.services.result_cache import content_key
+from backend.services.serialization import dumps
+from backend.services.solution_generator import ANALYSIS_CACHE, analyze_code, is_scene, lookup_analysis
+from backend.services.trace_animation import trace_ar_payload
+from backend.services.worker_pool import run_cpu
+
 router = APIRouter()
+
+# ?detail=full|pass|keyframes and ?max_frames=N (uniform downsampling)
+DETAIL_PATTERN = "^(" + "|".join(DETAIL_LEVELS) + ")$"
+
+
+def _resolve_scene(analysis_id: str, problem: str = None, language: str = None):
+    """
+    (problem, language) of the scene behind an analysis id. The analysis
+    entry may already be evicted; arPayloadUrl also carries the scene in
+    ?problem=&language=, which is all a rebuild needs.
+    """
+    analysis = lookup_analysis(analysis_id)
+    if analysis is not None:
+        return analysis["problemDetected"], analysis["detectedLanguage"]
+    if problem is not None and language is not None:
+        if not is_scene(problem, language):
+            raise HTTPException(status_code=422, detail="Unknown problem or language")
+        return problem, language
+    raise HTTPException(
+        status_code=404,
+        detail="Unknown or expired analysis id; re-submit the code to /api/analyze"
+    )
+
+
+def _ndjson(events):
+    for event, data in events:
+        yield dumps({"event": event, **data}) + b"\n"
+
+
+def _sse(events):
+    for event, data in events:
+        yield b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+@router.get("/{analysis_id}")
+async def get_ar_payload(
+    analysis_id: str,
+    request: Request,
+    detail: str = Query(FULL, pattern=DETAIL_PATTERN),
+    max_frames: int = Query(None, ge=1, le=config.MAX_ANIMATION_FRAMES),
+    problem: str = None,
+    language: str = None,
+):
+    problem, language = _resolve_scene(analysis_id, problem, language)
+
+    # Clients that can read the packed columnar format ask for it via Accept
+    binary = BINARY_MEDIA_TYPE in request.headers.get("accept", "")
+
+    # Rendered scenes are served from memory; building one is CPU work
+    scene = lookup_ar_scene(problem, language, binary, detail, max_frames)
+    if scene is None:
+        scene = store_ar_scene(
+            problem, language, binary,
+            await run_cpu(build_ar_scene, problem, language, binary, detail, max_frames),
+            detail, max_frames,
+        )
+    body, etag = scene
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=3600",
+        "Vary": "Accept",
+    }
+
+    # Client already has this exact scene
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    media_type = BINARY_MEDIA_TYPE if binary else "application/json"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@router.get("/{analysis_id}/stream")
+def stream_ar_payload(
+    analysis_id: str,
+    request: Request,
+    format: str = Query(None, pattern="^(ndjson|sse)$"),
+    detail: str = Query(FULL, pattern=DETAIL_PATTERN),
+    max_frames: int = Query(None, ge=1, le=config.MAX_ANIMATION_FRAMES),
+    problem: str = None,
+    language: str = None,
+):
+    problem, language = _resolve_scene(analysis_id, problem, language)
+    events = iter_ar_stream(problem, language, detail, max_frames)
+
+    # Explicit ?format= wins, otherwise negotiate on Accept
+    if format is None:
+        accept = request.headers.get("accept", "")
+        format = "sse" if "text/event-stream" in accept else "ndjson"
+
+    if format == "sse":
+        return StreamingResponse(
+            _sse(events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+    return StreamingResponse(_ndjson(events), media_type="application/x-ndjson")
+
+
+@router.post("/trace")
+async def trace_ar(
+    submission: CodeRequest,
+    request: Request,
+    detail: str = Query(FULL, pattern=DETAIL_PATTERN),
+    max_frames: int = Query(None, ge=1, le=config.MAX_ANIMATION_FRAMES),
+):
+    """Scene animated from the submitted code itself, run in the sandbox."""
+    check_code_size(submission.code)
+    key = content_key(submission.code, submission.language)
+    analysis = ANALYSIS_CACHE.get(key)
+    if analysis is None:
+        analysis = await run_cpu(analyze_code, submission.code, submission.language)
+        ANALYSIS_CACHE.put(key, analysis)
+
+    payload = await trace_ar_payload(
+        submission.code,
+        analysis["problemDetected"],
+        analysis["detectedLanguage"],
+        detail,
+        max_frames,
+    )
+
+    binary = BINARY_MEDIA_TYPE in request.headers.get("accept", "")
+    with stage("ar_encode"):
+        body = encode_ar_binary(payload) if binary else dumps(payload)
+    media_type = BINARY_MEDIA_TYPE if binary else "application/json"
+    return Response(content=body, media_type=media_type)
@@ -1,23 +1,37 @@
 from fastapi import APIRouter
-from backend.models.schemas import CodeRequest
-from backend.services.solution_generator import generate_solutions
+from backend.models.schemas import EvaluateRequest
+from backend.services.budgets import check_code_size
+from backend.services.result_cache import content_key
+from backend.services.solution_generator import ANALYSIS_CACHE, analyze_code, lookup_analysis
 from backend.services.evaluator import evaluate_code
+from backend.services.metrics import stage
+from backend.services.serialization import json_response
+from backend.services.worker_pool import run_cpu
 
 router = APIRouter()
 
 @router.post("/")
-def evaluate(request: CodeRequest):
-    # Step 1: Analyze code (reuse same pipeline as /analyze)
-    analysis_result = generate_solutions(
-        request.code,
-        request.language
-    )
+async def evaluate(request: EvaluateRequest):
+    check_code_size(request.code)
+
+    # Step 1: Reuse the analysis from a prior /analyze call when we have it,
+    # otherwise run the analysis-only fast path (no solutions, no AR payload).
+    # An analysisId is only trusted if it is this code's own content key;
+    # any other id would pair this code with another submission's analysis.
+    key = content_key(request.code, request.language)
+    analysis_result = None
+    if request.analysisId in (None, key):
+        analysis_result = lookup_analysis(key)
+    if analysis_result is None:
+        analysis_result = await run_cpu(analyze_code, request.code, request.language)
+        ANALYSIS_CACHE.put(key, analysis_result)
 
     # Step 2: Evaluate using analysis output
-    evaluation = evaluate_code(
-        request.code,
-        request.language,
-        analysis_result["analysis"]
-    )
+    with stage("evaluate"):
+        evaluation = evaluate_code(
+            request.code,
+            request.language,
+            analysis_result["analysis"]
+        )
 
-    return evaluation
+    return json_response(evaluation)
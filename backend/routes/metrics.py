@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from backend.services.animation_cache import ANIMATION_CACHE
+from backend.services.ar_payload_generator import AR_SCENE_CACHE
+from backend.services.metrics import CONTENT_TYPE, CounterFunc, Gauge, render_metrics
+from backend.services.python_ast_analyzer import AST_CACHE
+from backend.services.solution_generator import ANALYSIS_CACHE, SOLUTION_CACHE
+from backend.services.worker_pool import queue_depth
+
+router = APIRouter()
+
+# Caches in this (the serving) process; pool workers keep their own AST and
+# animation caches
+CACHES = {
+    "solutions": SOLUTION_CACHE,
+    "analysis": ANALYSIS_CACHE,
+    "ar_scene": AR_SCENE_CACHE,
+    "animation": ANIMATION_CACHE,
+    "ast": AST_CACHE,
+}
+
+
+def _cache_stat(field):
+    return lambda: {(name,): cache.stats()[field] for name, cache in CACHES.items()}
+
+
+Gauge("learnflow_cache_hit_ratio", "Hit ratio of each result cache.", ("cache",), _cache_stat("hitRatio"))
+CounterFunc("learnflow_cache_hits_total", "Cache hits since startup.", ("cache",), _cache_stat("hits"))
+CounterFunc("learnflow_cache_misses_total", "Cache misses since startup.", ("cache",), _cache_stat("misses"))
+Gauge("learnflow_cache_entries", "Entries held by each cache.", ("cache",), _cache_stat("entries"))
+Gauge("learnflow_cache_bytes", "Approximate bytes held by each cache.", ("cache",), _cache_stat("bytes"))
+Gauge("learnflow_worker_queue_depth", "Pool tasks running or queued.", collect=queue_depth)
+
+
+@router.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
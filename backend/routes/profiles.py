@@ -0,0 +1,35 @@
+import os
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from backend import config
+from backend.services.profiling import authorized, profile_path, profile_report
+
+router = APIRouter()
+
+
+@router.get("/{request_id}")
+async def get_profile(
+    request_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$"),
+    x_profile: str = Header(None),
+):
+    if not config.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if config.PROFILE_TOKEN and not authorized(x_profile):
+        raise HTTPException(status_code=403, detail="Profile token required")
+    try:
+        path = profile_path(request_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "pstats":
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{request_id}.prof")
+
+    report = profile_report(request_id, sort)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(report)
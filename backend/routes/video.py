@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Query
 from backend.services.video_library import VIDEO_LIBRARY
+from backend.services.problem_registry import get_video as registered_video
+from backend.services.serialization import json_response
 
 router = APIRouter()
 
 @router.get("/")
-def get_video(
+async def get_video(
     language: str = Query(...),
     concept: str = Query(...)
 ):
-    video = VIDEO_LIBRARY.get(concept, VIDEO_LIBRARY["unknown"])
-    return video
+    video = registered_video(concept) or VIDEO_LIBRARY["unknown"]
+    return json_response(video)
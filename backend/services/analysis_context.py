@@ -0,0 +1,111 @@
+# backend/services/analysis_context.py
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from backend import config
+from backend.services.budgets import token_budget_exceeded
+from backend.services.keyword_matcher import KeywordMatcher
+from backend.services.lexer import TokenLimitExceeded, guess_mode, lex, strip_non_code
+
+# --------------------------------------------------
+# KEYWORD VOCABULARY (one entry per stage)
+# --------------------------------------------------
+LANGUAGE_KEYWORDS = (
+    "def ", ":", "function", "=>", "let ",
+    "public static", "system.out",
+    "#include", "printf", "std::", "cout",
+)
+
+PROBLEM_KEYWORDS = (
+    "mid", "middle", "low", "left", "high", "right",
+    "merge", "sort", "divide",
+    "pivot", "partition", "quick",
+    "swap", "bubble", "selection", "insertion", ".sort(", "sorted(",
+    "arr[j] > arr[j+1]", "arr[j]>arr[j+1]",
+    "max", "min", "arr", "array", "list",
+    "for", "while",
+    "==", "equals", "target", "search", "find", "return", "found",
+    "sum", "count",
+)
+
+PATTERN_KEYWORDS = (
+    "for", "while", "(", "def", "void", "int",
+    "max(", "min(", "sorted(",
+    "math.max", ".sort(",
+    "collections.max", "arrays.sort",
+    "std::max", "max_element",
+    "binary_search", "low", "high", "mid",
+)
+
+_MATCHER = KeywordMatcher(LANGUAGE_KEYWORDS + PROBLEM_KEYWORDS + PATTERN_KEYWORDS)
+
+
+# --------------------------------------------------
+# CONTEXT
+# --------------------------------------------------
+@dataclass(frozen=True)
+class AnalysisContext:
+    """
+    Everything the pipeline stages need from a submission, computed once
+    per request so no stage has to lowercase or rescan the code itself.
+
+    code_lower and keyword_counts only cover real code: comments and string
+    literals are blanked out using the lexer's token array.
+    """
+    code: str
+    code_lower: str
+    lex_mode: str
+    tokens: array
+    keyword_counts: Mapping
+    line_offsets: tuple
+
+    @property
+    def token_count(self):
+        return len(self.tokens) // 3
+
+    def has(self, *keywords):
+        return any(kw in self.keyword_counts for kw in keywords)
+
+    def count(self, keyword: str):
+        return self.keyword_counts.get(keyword, 0)
+
+    def line_of(self, offset: int):
+        """1-based line number of a character offset."""
+        return bisect_right(self.line_offsets, offset)
+
+
+def build_context(code: str, max_tokens: int = None):
+    max_tokens = config.MAX_TOKENS if max_tokens is None else max_tokens
+
+    # Choose Python or C-family rules up front so the code is lexed once
+    lex_mode = guess_mode(code)
+    try:
+        tokens = lex(code, lex_mode, max_tokens)
+    except TokenLimitExceeded:
+        raise token_budget_exceeded(max_tokens) from None
+    stripped = strip_non_code(code, tokens)
+    code_lower = stripped.lower()
+
+    line_offsets = [0]
+    pos = code.find("\n")
+    while pos != -1:
+        line_offsets.append(pos + 1)
+        pos = code.find("\n", pos + 1)
+
+    return AnalysisContext(
+        code=code,
+        code_lower=code_lower,
+        lex_mode=lex_mode,
+        tokens=tokens,
+        keyword_counts=_MATCHER.counts(code_lower),
+        line_offsets=tuple(line_offsets),
+    )
+
+
+def as_context(code):
+    """Accept either raw code or an already-built context."""
+    if isinstance(code, AnalysisContext):
+        return code
+    return build_context(code)
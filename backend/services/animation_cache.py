@@ -0,0 +1,177 @@
+# backend/services/animation_cache.py
+#
+# Memoized animation traces. The same (algorithm, array, parameters) keeps
+# coming back across students and demo sessions, so a generated trace is
+# kept in compact columnar form, keyed by a hash of those inputs, in a
+# ResultCache bounded by total bytes rather than entry count.
+import hashlib
+import sys
+from array import array
+
+from backend import config
+from backend.services.ar_encoding import FIELD_LAYOUT
+from backend.services.result_cache import ResultCache
+from backend.services.ar_animation_engine import (
+    FULL,
+    downsample_frames,
+    iter_array_max_min_frames,
+    iter_binary_search_frames,
+    iter_counting_frames,
+    iter_linear_search_frames,
+    iter_loop_frames,
+    iter_merge_sort_frames,
+    iter_quick_sort_frames,
+    iter_sorting_frames,
+    iter_sum_array_frames,
+)
+
+# algorithm id -> frames(arr, target, detail)
+ENGINE_FRAMES = {
+    "linear_search": iter_linear_search_frames,
+    "binary_search": iter_binary_search_frames,
+    "sorting": lambda arr, target, detail: iter_sorting_frames(arr, detail),
+    "array_max_min": lambda arr, target, detail: iter_array_max_min_frames(arr, detail),
+    "merge_sort": lambda arr, target, detail: iter_merge_sort_frames(arr, detail),
+    "quick_sort": lambda arr, target, detail: iter_quick_sort_frames(arr, detail),
+    "loop": lambda arr, target, detail: iter_loop_frames(arr, detail),
+    "counting": lambda arr, target, detail: iter_counting_frames(arr, detail),
+    "sum_array": lambda arr, target, detail: iter_sum_array_frames(arr, detail),
+}
+
+
+def animation_key(algorithm: str, arr, params=()):
+    # repr keeps 1, 1.0 and True apart, which the explanation text doesn't
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(algorithm.encode())
+    digest.update(b"\0")
+    digest.update(repr(list(arr)).encode())
+    digest.update(b"\0")
+    digest.update(repr(tuple(params)).encode())
+    return digest.hexdigest()
+
+
+def _pack_args(args):
+    if all(type(v) is int for v in args):
+        try:
+            return array("q", args)
+        except OverflowError:
+            pass
+    elif all(type(v) is float for v in args):
+        return array("d", args)
+    return tuple(args)
+
+
+class CompactTrace:
+    """
+    A frame trace in parallel typed arrays. Each animation is a style (its
+    dict minus the node fields, shared by every frame that looks the same)
+    plus up to two node ints; each explanation is a template index plus a
+    slice of one flat argument array.
+    """
+    __slots__ = ("styles", "style", "a", "b", "template_ids", "template", "arg_offsets", "args")
+
+    def __init__(self, frames):
+        styles = []
+        style_ids = {}
+        style = array("H")
+        col_a = array("i")
+        col_b = array("i")
+        template_ids = []
+        template_lookup = {}
+        template = array("H")
+        arg_offsets = array("I", [0])
+        args = []
+
+        for animation, (template_id, frame_args) in frames:
+            field_a, field_b = FIELD_LAYOUT[animation["type"]]
+            shape = tuple((k, None if k in (field_a, field_b) else v) for k, v in animation.items())
+            index = style_ids.get(shape)
+            if index is None:
+                index = style_ids[shape] = len(styles)
+                styles.append((dict(shape), field_a, field_b))
+            style.append(index)
+            col_a.append(animation[field_a])
+            col_b.append(animation[field_b] if field_b else -1)
+
+            index = template_lookup.get(template_id)
+            if index is None:
+                index = template_lookup[template_id] = len(template_ids)
+                template_ids.append(template_id)
+            template.append(index)
+            args.extend(frame_args)
+            arg_offsets.append(len(args))
+
+        self.styles = styles
+        self.style = style
+        self.a = col_a
+        self.b = col_b
+        self.template_ids = template_ids
+        self.template = template
+        self.arg_offsets = arg_offsets
+        self.args = _pack_args(args)
+
+    def __len__(self):
+        return len(self.style)
+
+    def animations(self):
+        styles = self.styles
+        animations = []
+        for index, a, b in zip(self.style, self.a, self.b):
+            base, field_a, field_b = styles[index]
+            animation = base.copy()
+            animation[field_a] = a
+            if field_b:
+                animation[field_b] = b
+            animations.append(animation)
+        return animations
+
+    def explanations(self):
+        ids, args, offsets = self.template_ids, self.args, self.arg_offsets
+        if isinstance(args, array):
+            args = args.tolist()
+        return [
+            [ids[index], *args[offsets[i]:offsets[i + 1]]]
+            for i, index in enumerate(self.template)
+        ]
+
+    def collect(self):
+        """(animations, explanations) lists, as collect_frames returns them."""
+        return self.animations(), self.explanations()
+
+    @property
+    def nbytes(self):
+        args = self.args
+        if isinstance(args, array):
+            args_bytes = args.itemsize * len(args)
+        else:
+            args_bytes = sys.getsizeof(args) + sum(sys.getsizeof(v) for v in args)
+        columns = (self.style, self.a, self.b, self.template, self.arg_offsets)
+        return sum(col.itemsize * len(col) for col in columns) + args_bytes
+
+
+ANIMATION_CACHE = ResultCache(
+    max_entries=sys.maxsize,   # bounded by ANIMATION_CACHE_MAX_BYTES alone
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS,
+    max_bytes=config.ANIMATION_CACHE_MAX_BYTES,
+    sizeof=lambda trace: trace.nbytes,
+)
+
+
+def memoized_trace(algorithm: str, arr, params, frames):
+    """
+    CompactTrace of frames() for these inputs, generated on first use.
+    params must capture everything besides arr that frames() depends on.
+    """
+    key = animation_key(algorithm, arr, params)
+    return ANIMATION_CACHE.get_or_compute(key, lambda: CompactTrace(frames()))
+
+
+def generate_animation(algorithm: str, arr, target=None, detail: str = FULL, max_frames: int = None):
+    """Memoized (animations, explanations) for one of the ENGINE_FRAMES algorithms."""
+    if algorithm not in ENGINE_FRAMES:
+        raise ValueError(f"Unknown animation algorithm {algorithm!r}")
+    trace = memoized_trace(
+        algorithm, arr, (target, detail, max_frames),
+        lambda: downsample_frames(ENGINE_FRAMES[algorithm](arr, target, detail), max_frames),
+    )
+    return trace.collect()
@@ -1,151 +1,622 @@
 # backend/services/ar_animation_engine.py
+#
+# Each algorithm has an iter_* generator that yields (animation, explanation)
+# frames one at a time, so callers can stream a trace without holding it in
+# memory. The generate_* functions collect a full trace into the
+# (animations, explanations) lists used by the AR payload.
+#
+# Explanations are (template_id, args) pairs rather than formatted strings:
+# the template table ships once per payload and the client expands it.
+#
+# Every generator takes a detail level, so long traces can be cut down
+# without generating the skipped frames at all:
+#   "full"       every comparison / visit
+#   "pass"       one frame per iteration of the outer loop
+#   "keyframes"  state changes only (swaps, new extremes, found) + final state
+# downsample_frames then caps any trace at a fixed number of frames.
+#
+# Merge sort and quick sort run the real (iterative) algorithm first and
+# record it into a TraceBuffer of fixed-width integer events; frames are
+# decoded from the buffer afterwards by replaying it on a copy of the input.
+from array import array
 
-def generate_linear_search_animation(arr, target):
+EXPLANATION_TEMPLATES = {
+    "found": "Target {0} found at index {1}!",
+    "ls.check": "Checking index {0} (value {1})",
+    "bs.range": "Search range: index {0} to {1}",
+    "bs.mid": "Checking mid = index {0} (value {1})",
+    "sort.compare": "Comparing index {0} ({1}) and index {2} ({3})",
+    "sort.swap": "Swapping — {0} > {1}, moving left",
+    "sort.pass": "Pass {0} complete: {1} settled at index {2}",
+    "sort.done": "Array fully sorted!",
+    "mm.start": "Start: assume max = min = {0}",
+    "mm.max": "New max found: {0} at index {1}",
+    "mm.min": "New min found: {0} at index {1}",
+    "loop.visit": "Loop iteration {0}: visiting index {1} (value {2})",
+    "count.visit": "Counting element at index {0} (value {1})",
+    "sum.add": "Add {0} → running sum = {1}",
+    "ms.merge": "Merging index {0}..{1} with index {2}..{3}",
+    "ms.compare": "Comparing {1} (index {0}) with {3} (index {2})",
+    "ms.place": "Placing {0} at index {1}",
+    "ms.merged": "Index {0} to {1} is now sorted",
+    "ms.width": "All runs of length {0} are sorted",
+    "qs.partition": "Partitioning index {0} to {1} around pivot {2}",
+    "qs.compare": "Comparing {1} (index {0}) with pivot {2}",
+    "qs.swap": "Swapping {0} and {1}",
+    "qs.placed": "Pivot {0} placed at its sorted position, index {1}",
+}
+
+
+def expand_explanation(explanation, templates=EXPLANATION_TEMPLATES):
+    template_id, args = explanation[0], explanation[1:]
+    return templates[template_id].format(*args)
+
+
+FULL, PASS, KEYFRAMES = "full", "pass", "keyframes"
+DETAIL_LEVELS = (FULL, PASS, KEYFRAMES)
+
+
+def _check_detail(detail: str):
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"Unknown detail level {detail!r}; expected one of {', '.join(DETAIL_LEVELS)}")
+    return detail
+
+
+def downsample_frames(frames, max_frames: int = None):
+    """
+    Keep at most max_frames frames, evenly spaced over the trace, in one
+    pass and O(max_frames) memory: whenever the buffer overflows, every
+    other kept frame is dropped and the sampling stride doubles. The last
+    frame (the final state) is always kept.
+    """
+    if max_frames is None:
+        yield from frames
+        return
+    if max_frames < 1:
+        raise ValueError("max_frames must be at least 1")
+
+    kept = []
+    stride = 1
+    index = -1
+    last = None
+    for index, frame in enumerate(frames):
+        last = frame
+        if index % stride == 0:
+            kept.append(frame)
+            if len(kept) > max_frames:
+                del kept[1::2]
+                stride *= 2
+
+    if index >= 0 and index % stride != 0:
+        if len(kept) == max_frames:
+            kept[-1] = last
+        else:
+            kept.append(last)
+    yield from kept
+
+
+def collect_frames(frames):
     animations = []
     explanations = []
+    for animation, (template_id, args) in frames:
+        animations.append(animation)
+        explanations.append([template_id, *args])
+    return animations, explanations
+
+
+# ─────────────────────────────────────────
+# LINEAR SEARCH
+# ─────────────────────────────────────────
+def iter_linear_search_frames(arr, target, detail: str = FULL):
+    steps = _check_detail(detail) != KEYFRAMES
 
     for i, val in enumerate(arr):
-        animations.append({
-            "type": "highlight",
-            "node": i,
-            "color": "red",
-            "duration": 0.8
-        })
-        explanations.append(f"Checking index {i} (value {val})")
+        if steps:
+            yield {
+                "type": "highlight",
+                "node": i,
+                "color": "red",
+                "duration": 0.8
+            }, ("ls.check", (i, val))
 
         if val == target:
-            animations.append({
+            yield {
                 "type": "highlight",
                 "node": i,
                 "color": "green",
                 "duration": 1.2
-            })
-            explanations.append(f"Target {target} found at index {i}!")
+            }, ("found", (target, i))
             break
 
-    return animations, explanations
 
+def generate_linear_search_animation(arr, target, detail: str = FULL, max_frames: int = None):
+    return collect_frames(downsample_frames(iter_linear_search_frames(arr, target, detail), max_frames))
 
-def generate_binary_search_animation(arr, target):
-    animations = []
-    explanations = []
+
+# ─────────────────────────────────────────
+# BINARY SEARCH
+# ─────────────────────────────────────────
+def iter_binary_search_frames(arr, target, detail: str = FULL):
+    _check_detail(detail)
     low, high = 0, len(arr) - 1
 
     while low <= high:
         mid = (low + high) // 2
 
-        animations.append({
-            "type": "highlight_range",
-            "low": low,
-            "high": high,
-            "color": "yellow",
-            "duration": 1
-        })
-        explanations.append(f"Search range: index {low} to {high}")
+        if detail != KEYFRAMES:
+            yield {
+                "type": "highlight_range",
+                "low": low,
+                "high": high,
+                "color": "yellow",
+                "duration": 1
+            }, ("bs.range", (low, high))
 
-        animations.append({
-            "type": "highlight",
-            "node": mid,
-            "color": "red",
-            "duration": 0.8
-        })
-        explanations.append(f"Checking mid = index {mid} (value {arr[mid]})")
+        if detail == FULL:
+            yield {
+                "type": "highlight",
+                "node": mid,
+                "color": "red",
+                "duration": 0.8
+            }, ("bs.mid", (mid, arr[mid]))
 
         if arr[mid] == target:
-            animations.append({
+            yield {
                 "type": "highlight",
                 "node": mid,
                 "color": "green",
                 "duration": 1.2
-            })
-            explanations.append(f"Target {target} found at index {mid}!")
+            }, ("found", (target, mid))
             break
         elif arr[mid] < target:
             low = mid + 1
         else:
             high = mid - 1
 
-    return animations, explanations
 
+def generate_binary_search_animation(arr, target, detail: str = FULL, max_frames: int = None):
+    return collect_frames(downsample_frames(iter_binary_search_frames(arr, target, detail), max_frames))
 
-def generate_sorting_animation(arr):
-    animations = []
-    explanations = []
+
+# ─────────────────────────────────────────
+# SORTING (Bubble Sort)
+# ─────────────────────────────────────────
+def iter_sorting_frames(arr, detail: str = FULL):
+    _check_detail(detail)
+    compares = detail == FULL
+    swaps = detail != PASS
     a = arr[:]
+    n = len(a)
 
-    for i in range(len(a)):
-        for j in range(0, len(a) - i - 1):
-            animations.append({
-                "type": "compare",
-                "nodeA": j,
-                "nodeB": j + 1,
-                "color": "red",
-                "duration": 0.6
-            })
-            explanations.append(f"Comparing index {j} ({a[j]}) and index {j+1} ({a[j+1]})")
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            if compares:
+                yield {
+                    "type": "compare",
+                    "nodeA": j,
+                    "nodeB": j + 1,
+                    "color": "red",
+                    "duration": 0.6
+                }, ("sort.compare", (j, a[j], j + 1, a[j + 1]))
 
             if a[j] > a[j + 1]:
                 a[j], a[j + 1] = a[j + 1], a[j]
-                animations.append({
-                    "type": "swap",
-                    "nodeA": j,
-                    "nodeB": j + 1,
-                    "duration": 0.8
-                })
-                explanations.append(f"Swapping — {a[j+1]} > {a[j]}, moving left")
+                if swaps:
+                    yield {
+                        "type": "swap",
+                        "nodeA": j,
+                        "nodeB": j + 1,
+                        "duration": 0.8
+                    }, ("sort.swap", (a[j + 1], a[j]))
 
-    animations.append({
+        if detail == PASS:
+            settled = n - i - 1
+            yield {
+                "type": "highlight",
+                "node": settled,
+                "color": "green",
+                "duration": 0.8
+            }, ("sort.pass", (i + 1, a[settled], settled))
+
+    yield {
         "type": "highlight_range",
         "low": 0,
-        "high": len(a) - 1,
+        "high": n - 1,
         "color": "green",
         "duration": 1
-    })
-    explanations.append("Array fully sorted!")
-    return animations, explanations
+    }, ("sort.done", ())
 
 
-def generate_array_max_min_animation(arr):
-    animations = []
-    explanations = []
+def generate_sorting_animation(arr, detail: str = FULL, max_frames: int = None):
+    return collect_frames(downsample_frames(iter_sorting_frames(arr, detail), max_frames))
+
+
+# ─────────────────────────────────────────
+# ARRAY MAX MIN
+# ─────────────────────────────────────────
+def iter_array_max_min_frames(arr, detail: str = FULL):
+    _check_detail(detail)
     current_max = arr[0]
     current_min = arr[0]
 
-    animations.append({
+    yield {
         "type": "highlight",
         "node": 0,
         "color": "green",
         "duration": 0.8
-    })
-    explanations.append(f"Start: assume max = min = {arr[0]}")
+    }, ("mm.start", (arr[0],))
 
     for i in range(1, len(arr)):
-        animations.append({
-            "type": "highlight",
-            "node": i,
-            "color": "red",
-            "duration": 0.6
-        })
-        explanations.append(f"Checking index {i} (value {arr[i]})")
+        new_max = arr[i] > current_max
+        new_min = arr[i] < current_min
 
-        if arr[i] > current_max:
+        # "pass" shows the check only when nothing changes at this index
+        if detail == FULL or (detail == PASS and not (new_max or new_min)):
+            yield {
+                "type": "highlight",
+                "node": i,
+                "color": "red",
+                "duration": 0.6
+            }, ("ls.check", (i, arr[i]))
+
+        if new_max:
             current_max = arr[i]
-            animations.append({
+            yield {
                 "type": "highlight",
                 "node": i,
                 "color": "green",
                 "duration": 0.8
-            })
-            explanations.append(f"New max found: {current_max} at index {i}")
+            }, ("mm.max", (current_max, i))
 
-        if arr[i] < current_min:
+        if new_min:
             current_min = arr[i]
-            animations.append({
+            yield {
                 "type": "highlight",
                 "node": i,
                 "color": "yellow",
                 "duration": 0.8
-            })
-            explanations.append(f"New min found: {current_min} at index {i}")
+            }, ("mm.min", (current_min, i))
+
+
+def generate_array_max_min_animation(arr, detail: str = FULL, max_frames: int = None):
+    return collect_frames(downsample_frames(iter_array_max_min_frames(arr, detail), max_frames))
+
+
+# ─────────────────────────────────────────
+# LOOP / COUNTING / SUM ARRAY
+# one frame per element, so "pass" == "full"; keyframes keep the last one
+# ─────────────────────────────────────────
+def _final_only(frames):
+    last = None
+    for last in frames:
+        pass
+    if last is not None:
+        yield last
+
+
+def iter_loop_frames(arr, detail: str = FULL):
+    frames = _iter_loop_frames(arr)
+    return _final_only(frames) if _check_detail(detail) == KEYFRAMES else frames
+
+
+def _iter_loop_frames(arr):
+    for i, val in enumerate(arr):
+        yield {
+            "type": "highlight",
+            "node": i,
+            "color": "red",
+            "duration": 0.7
+        }, ("loop.visit", (i + 1, i, val))
+
+
+def iter_counting_frames(arr, detail: str = FULL):
+    frames = _iter_counting_frames(arr)
+    return _final_only(frames) if _check_detail(detail) == KEYFRAMES else frames
+
+
+def _iter_counting_frames(arr):
+    for i, val in enumerate(arr):
+        yield {
+            "type": "highlight",
+            "node": i,
+            "color": "yellow",
+            "duration": 0.7
+        }, ("count.visit", (i, val))
+
+
+def iter_sum_array_frames(arr, detail: str = FULL):
+    frames = _iter_sum_array_frames(arr)
+    return _final_only(frames) if _check_detail(detail) == KEYFRAMES else frames
+
+
+def _iter_sum_array_frames(arr):
+    running_sum = 0
+    for i, val in enumerate(arr):
+        running_sum += val
+        yield {
+            "type": "highlight",
+            "node": i,
+            "color": "green",
+            "duration": 0.7
+        }, ("sum.add", (val, running_sum))
+
+
+def _sorted_frame(n):
+    return {
+        "type": "highlight_range",
+        "low": 0,
+        "high": n - 1,
+        "color": "green",
+        "duration": 1
+    }, ("sort.done", ())
+
+
+# ─────────────────────────────────────────
+# TRACE BUFFER
+# ─────────────────────────────────────────
+class TraceBuffer:
+    """
+    Fixed-width (op, a, b, c) integer events in one preallocated array.
+    Events hold indices only, never values, so a trace costs 32 bytes per
+    event whatever the array holds. Capacity doubles if an estimate was low.
+    """
+    __slots__ = ("data", "size")
+    WIDTH = 4
+
+    def __init__(self, capacity: int):
+        self.data = array("q", bytes(8 * self.WIDTH * max(capacity, 1)))
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def record(self, op: int, a: int = 0, b: int = 0, c: int = 0):
+        data = self.data
+        i = self.size * 4
+        if i == len(data):
+            data.extend(array("q", bytes(8 * len(data))))
+        data[i] = op
+        data[i + 1] = a
+        data[i + 2] = b
+        data[i + 3] = c
+        self.size += 1
+
+    def __iter__(self):
+        data = self.data
+        for i in range(0, self.size * 4, 4):
+            yield data[i], data[i + 1], data[i + 2], data[i + 3]
+
+
+def _log2_ceil(n: int):
+    return max(n - 1, 0).bit_length()
+
+
+# ─────────────────────────────────────────
+# MERGE SORT (bottom-up)
+# ─────────────────────────────────────────
+MS_MERGE, MS_COMPARE, MS_PLACE, MS_MERGED, MS_WIDTH = range(5)
+
+
+def trace_merge_sort(arr):
+    """Sort a copy of arr bottom-up; return (sorted list, TraceBuffer)."""
+    a = list(arr)
+    n = len(a)
+    aux = [None] * n
+    passes = _log2_ceil(n)
+    # each pass: < n compares + n places + a width event; merge/merged
+    # events over all passes total < 2n
+    trace = TraceBuffer(passes * (2 * n + 1) + 2 * n)
+    record = trace.record
+
+    width = 1
+    while width < n:
+        for low in range(0, n - width, 2 * width):
+            mid = low + width - 1
+            high = min(low + 2 * width - 1, n - 1)
+            record(MS_MERGE, low, mid, high)
+            aux[low:high + 1] = a[low:high + 1]
+
+            i, j = low, mid + 1
+            for k in range(low, high + 1):
+                if i > mid:
+                    src = j
+                    j += 1
+                elif j > high:
+                    src = i
+                    i += 1
+                else:
+                    record(MS_COMPARE, i, j)
+                    if aux[j] < aux[i]:
+                        src = j
+                        j += 1
+                    else:
+                        src = i
+                        i += 1
+                a[k] = aux[src]
+                record(MS_PLACE, k, src)
+            record(MS_MERGED, low, high)
+        record(MS_WIDTH, 2 * width)
+        width *= 2
+
+    return a, trace
+
+
+def iter_merge_sort_frames(arr, detail: str = FULL):
+    """
+    full: every merge, compare and placement; pass: one frame per merged
+    run; keyframes: one frame per doubling of the run length.
+    """
+    _check_detail(detail)
+    _, trace = trace_merge_sort(arr)
+    a = list(arr)
+    aux = list(arr)
+    full = detail == FULL
+
+    for op, x, y, z in trace:
+        if op == MS_PLACE:
+            a[x] = aux[y]
+            if full:
+                yield {
+                    "type": "highlight",
+                    "node": x,
+                    "color": "green",
+                    "duration": 0.6
+                }, ("ms.place", (a[x], x))
+        elif op == MS_COMPARE:
+            if full:
+                yield {
+                    "type": "compare",
+                    "nodeA": x,
+                    "nodeB": y,
+                    "color": "red",
+                    "duration": 0.6
+                }, ("ms.compare", (x, aux[x], y, aux[y]))
+        elif op == MS_MERGE:
+            aux[x:z + 1] = a[x:z + 1]
+            if full:
+                yield {
+                    "type": "highlight_range",
+                    "low": x,
+                    "high": z,
+                    "color": "yellow",
+                    "duration": 1
+                }, ("ms.merge", (x, y, y + 1, z))
+        elif op == MS_MERGED:
+            if detail == PASS:
+                yield {
+                    "type": "highlight_range",
+                    "low": x,
+                    "high": y,
+                    "color": "green",
+                    "duration": 0.8
+                }, ("ms.merged", (x, y))
+        elif op == MS_WIDTH:
+            if detail == KEYFRAMES and x < len(a):
+                yield {
+                    "type": "highlight_range",
+                    "low": 0,
+                    "high": len(a) - 1,
+                    "color": "yellow",
+                    "duration": 0.8
+                }, ("ms.width", (x,))
+
+    if a:
+        yield _sorted_frame(len(a))
+
+
+def generate_merge_sort_animation(arr, detail: str = FULL, max_frames: int = None):
+    return collect_frames(downsample_frames(iter_merge_sort_frames(arr, detail), max_frames))
+
+
+# ─────────────────────────────────────────
+# QUICK SORT (Lomuto partition, explicit stack)
+# ─────────────────────────────────────────
+QS_PARTITION, QS_COMPARE, QS_SWAP, QS_PLACED = range(4)
+
+
+def trace_quick_sort(arr):
+    """
+    Sort a copy of arr with an explicit stack instead of recursion; return
+    (sorted list, TraceBuffer). The pivot is the median of the first,
+    middle and last element, swapped into the last slot, so sorted input
+    stays O(n log n).
+    """
+    a = list(arr)
+    n = len(a)
+    # ~1.2 n log2 n compares plus swaps on random input; grows past that
+    trace = TraceBuffer(2 * n * (_log2_ceil(n) + 1))
+    record = trace.record
+
+    stack = [(0, n - 1)] if n > 1 else []
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            if low == high:
+                record(QS_PLACED, low)
+            continue
+
+        mid = (low + high) // 2
+        pick = sorted((low, mid, high), key=a.__getitem__)[1]
+        if pick != high:
+            a[pick], a[high] = a[high], a[pick]
+            record(QS_SWAP, pick, high)
+        record(QS_PARTITION, low, high)
+
+        pivot = a[high]
+        i = low
+        for j in range(low, high):
+            record(QS_COMPARE, j, high)
+            if a[j] < pivot:
+                if i != j:
+                    a[i], a[j] = a[j], a[i]
+                    record(QS_SWAP, i, j)
+                i += 1
+        if i != high:
+            a[i], a[high] = a[high], a[i]
+            record(QS_SWAP, i, high)
+        record(QS_PLACED, i)
+
+        # larger side first, so the stack stays O(log n) deep
+        left, right = (low, i - 1), (i + 1, high)
+        if i - low > high - i:
+            stack.append(left)
+            stack.append(right)
+        else:
+            stack.append(right)
+            stack.append(left)
+
+    return a, trace
+
+
+def iter_quick_sort_frames(arr, detail: str = FULL):
+    """
+    full: every partition, compare and swap; pass: the placed pivot of each
+    partition; keyframes: swaps and placed pivots.
+    """
+    _check_detail(detail)
+    _, trace = trace_quick_sort(arr)
+    a = list(arr)
+    full = detail == FULL
+
+    for op, x, y, _z in trace:
+        if op == QS_COMPARE:
+            if full:
+                yield {
+                    "type": "compare",
+                    "nodeA": x,
+                    "nodeB": y,
+                    "color": "red",
+                    "duration": 0.6
+                }, ("qs.compare", (x, a[x], a[y]))
+        elif op == QS_SWAP:
+            a[x], a[y] = a[y], a[x]
+            if detail != PASS:
+                yield {
+                    "type": "swap",
+                    "nodeA": x,
+                    "nodeB": y,
+                    "duration": 0.8
+                }, ("qs.swap", (a[y], a[x]))
+        elif op == QS_PARTITION:
+            if full:
+                yield {
+                    "type": "highlight_range",
+                    "low": x,
+                    "high": y,
+                    "color": "yellow",
+                    "duration": 1
+                }, ("qs.partition", (x, y, a[y]))
+        elif op == QS_PLACED:
+            yield {
+                "type": "highlight",
+                "node": x,
+                "color": "green",
+                "duration": 0.8
+            }, ("qs.placed", (a[x], x))
+
+    if a:
+        yield _sorted_frame(len(a))
+
 
-    return animations, explanations
\ No newline at end of file
+def generate_quick_sort_animation(arr, detail: str = FULL, max_frames: int = None):
+    return collect_frames(downsample_frames(iter_quick_sort_frames(arr, detail), max_frames))
@@ -0,0 +1,176 @@
+# backend/services/ar_encoding.py
+#
+# Columnar form of an animation timeline. Instead of one dict per step with
+# repeated "type"/"node"/"color"/"duration" keys, a trace is five typed
+# arrays indexed by step. The binary wire format packs those arrays after a
+# small JSON header so the frontend can read them straight off a DataView.
+#
+# Layout (little-endian):
+#   0   4s   magic  b"LFAR"
+#   4   u16  format version
+#   6   u16  reserved (0)
+#   8   u32  frame count n
+#   12  u32  header length h (bytes of UTF-8 JSON)
+#   16  h    header JSON, zero-padded to a multiple of 4
+#   ..  n    u8  type code   (index into header.animationTables.types)
+#   ..  n    u8  color code  (index into header.animationTables.colors)
+#   ..       zero padding to a multiple of 4
+#   ..  4n   i32 first node field  (-1 when unused)
+#   ..  4n   i32 second node field (-1 when unused)
+#   ..  4n   f32 duration
+import json
+import struct
+import sys
+from array import array
+
+BINARY_MEDIA_TYPE = "application/vnd.learnflow.ar+binary"
+FORMAT_VERSION = 1
+MAGIC = b"LFAR"
+
+# Which dict keys map onto the two integer columns, per animation type
+FIELD_LAYOUT = {
+    "highlight": ("node", None),
+    "highlight_range": ("low", "high"),
+    "compare": ("nodeA", "nodeB"),
+    "swap": ("nodeA", "nodeB"),
+}
+
+_PREFIX = struct.Struct("<4sHHII")
+
+
+def _pad4(n: int):
+    return -n % 4
+
+
+def _little_endian(column: array):
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+class AnimationColumns:
+    """An animation timeline stored as parallel typed arrays."""
+
+    def __init__(self):
+        self.types = []
+        self.colors = [""]
+        self._type_ids = {}
+        self._color_ids = {"": 0}
+        self.kind = array("B")
+        self.color = array("B")
+        self.a = array("i")
+        self.b = array("i")
+        self.duration = array("f")
+
+    def __len__(self):
+        return len(self.kind)
+
+    def append(self, animation: dict):
+        anim_type = animation["type"]
+        field_a, field_b = FIELD_LAYOUT[anim_type]
+
+        kind = self._type_ids.get(anim_type)
+        if kind is None:
+            kind = self._type_ids[anim_type] = len(self.types)
+            self.types.append(anim_type)
+
+        color_name = animation.get("color", "")
+        color = self._color_ids.get(color_name)
+        if color is None:
+            color = self._color_ids[color_name] = len(self.colors)
+            self.colors.append(color_name)
+
+        self.kind.append(kind)
+        self.color.append(color)
+        self.a.append(animation[field_a])
+        self.b.append(animation[field_b] if field_b else -1)
+        self.duration.append(animation["duration"])
+
+    def to_dicts(self):
+        animations = []
+        for kind, color, a, b, duration in zip(self.kind, self.color, self.a, self.b, self.duration):
+            anim_type = self.types[kind]
+            field_a, field_b = FIELD_LAYOUT[anim_type]
+            animation = {"type": anim_type, field_a: a}
+            if field_b:
+                animation[field_b] = b
+            if color:
+                animation["color"] = self.colors[color]
+            animation["duration"] = _round_f32(duration)
+            animations.append(animation)
+        return animations
+
+    def tables(self):
+        return {
+            "types": list(self.types),
+            "colors": list(self.colors),
+            "fields": {t: list(FIELD_LAYOUT[t]) for t in self.types},
+        }
+
+    @property
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in (self.kind, self.color, self.a, self.b, self.duration))
+
+
+def _round_f32(value: float):
+    # float32 durations like 0.6 come back as 0.6000000238...; the source
+    # values are short decimals, so restore them
+    rounded = round(value, 4)
+    return int(rounded) if rounded == int(rounded) else rounded
+
+
+def to_columns(animations):
+    columns = AnimationColumns()
+    for animation in animations:
+        columns.append(animation)
+    return columns
+
+
+# ─────────────────────────────────────────
+# BINARY WIRE FORMAT
+# ─────────────────────────────────────────
+def encode_ar_binary(payload: dict):
+    columns = to_columns(payload["animations"])
+    header = {k: v for k, v in payload.items() if k != "animations"}
+    header["animationTables"] = columns.tables()
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    n = len(columns)
+
+    parts = [
+        _PREFIX.pack(MAGIC, FORMAT_VERSION, 0, n, len(header_bytes)),
+        header_bytes,
+        b"\0" * _pad4(len(header_bytes)),
+        columns.kind.tobytes(),
+        columns.color.tobytes(),
+        b"\0" * _pad4(2 * n),
+    ]
+    for column in (columns.a, columns.b, columns.duration):
+        parts.append(_little_endian(column).tobytes())
+    return b"".join(parts)
+
+
+def decode_ar_binary(data: bytes):
+    magic, version, _, n, header_len = _PREFIX.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not a Learn-Flow AR binary payload")
+
+    offset = _PREFIX.size
+    header = json.loads(data[offset:offset + header_len])
+    offset += header_len + _pad4(header_len)
+
+    tables = header.pop("animationTables")
+    columns = AnimationColumns()
+    columns.types = tables["types"]
+    columns.colors = tables["colors"]
+
+    columns.kind.frombytes(data[offset:offset + n])
+    columns.color.frombytes(data[offset + n:offset + 2 * n])
+    offset += 2 * n + _pad4(2 * n)
+    for column in (columns.a, columns.b, columns.duration):
+        column.frombytes(data[offset:offset + 4 * n])
+        if sys.byteorder == "big":
+            column.byteswap()
+        offset += 4 * n
+
+    return {**header, "animations": columns.to_dicts()}
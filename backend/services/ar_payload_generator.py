@@ -1,315 +1,195 @@
 # backend/services/ar_payload_generator.py
-from backend.services.video_library import VISUALGO_LINKS
+import hashlib
+
+from backend import config
+from backend.services.animation_cache import memoized_trace
+from backend.services.ar_encoding import encode_ar_binary
+from backend.services.budgets import BudgetExceeded, limit_frames
+from backend.services.metrics import run_timed, stage
+from backend.services.result_cache import ResultCache
+from backend.services.serialization import dumps
 from backend.services.ar_animation_engine import (
-    generate_linear_search_animation,
-    generate_binary_search_animation,
-    generate_sorting_animation,
-    generate_array_max_min_animation
+    EXPLANATION_TEMPLATES,
+    FULL,
+    downsample_frames,
 )
+from backend.services.problem_registry import get_scene, get_visualgo_url, problem_ids
 
+# Template table shipped with every payload; scenes with their own
+# explanation text (see ar_scenes) extend it
+GENERIC_TEMPLATES = {
+    **EXPLANATION_TEMPLATES,
+    "generic": "Generic algorithm — no specific visualization available.",
+}
 
-def generate_ar_payload(problem: str, code: str, language: str):
-
-    # ─────────────────────────────────────────
-    # LINEAR SEARCH
-    # ─────────────────────────────────────────
-    if problem == "linear_search":
-        arr = [5, 8, 3, 7, 2]
-        target = 7
-        animations, explanations = generate_linear_search_animation(arr, target)
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        return {
-            "visualizationType": "array_traversal",
-            "scene": "LinearSearchScene",
-            "cameraPosition": [0, 5, -12],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
 
-    # ─────────────────────────────────────────
-    # BINARY SEARCH
-    # ─────────────────────────────────────────
-    if problem == "binary_search":
-        arr = [1, 3, 5, 7, 9, 11, 13]
-        target = 9
-        animations, explanations = generate_binary_search_animation(arr, target)
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        return {
-            "visualizationType": "divide_and_conquer",
-            "scene": "BinarySearchScene",
-            "cameraPosition": [0, 6, -14],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
+def _array_nodes(arr):
+    return [
+        {"id": i, "label": str(val), "type": "array_element",
+         "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
+        for i, val in enumerate(arr)
+    ]
 
-    # ─────────────────────────────────────────
-    # SORTING (Bubble Sort)
-    # ─────────────────────────────────────────
-    if problem == "sorting":
-        arr = [5, 2, 8, 1, 4]
-        animations, explanations = generate_sorting_animation(arr)
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        return {
-            "visualizationType": "swap_animation",
-            "scene": "SortingScene",
-            "cameraPosition": [0, 6, -12],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
 
-    # ─────────────────────────────────────────
-    # ARRAY MAX MIN
-    # ─────────────────────────────────────────
-    if problem == "array_max_min":
-        arr = [5, 8, 3, 7, 2]
-        animations, explanations = generate_array_max_min_animation(arr)
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        return {
-            "visualizationType": "array_traversal",
-            "scene": "ArrayMaxMinScene",
-            "cameraPosition": [0, 5, -12],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
+def build_scene_header(problem: str, language: str):
+    """Everything in the payload except the animation trace itself."""
+    spec = get_scene(problem)
+    metadata = {
+        "problem": problem,
+        "language": language,
+        "visualgoUrl": get_visualgo_url(problem)
+    }
 
-    # ─────────────────────────────────────────
-    # MERGE SORT
-    # ─────────────────────────────────────────
-    if problem == "merge_sort":
-        arr = [4, 2, 7, 1, 5]
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        animations = [
-            {"type": "highlight_range", "low": 0, "high": 4, "color": "yellow", "duration": 1},
-            {"type": "highlight_range", "low": 0, "high": 1, "color": "red", "duration": 1},
-            {"type": "highlight_range", "low": 2, "high": 4, "color": "red", "duration": 1},
-            {"type": "highlight_range", "low": 0, "high": 4, "color": "green", "duration": 1},
-        ]
-        explanations = [
-            "Split full array [4, 2, 7, 1, 5] into two halves",
-            "Recursively sorting left half [4, 2]",
-            "Recursively sorting right half [7, 1, 5]",
-            "Merging both sorted halves into final array"
-        ]
+    # GENERIC FALLBACK (safe — no arr reference)
+    if spec is None:
         return {
-            "visualizationType": "divide_and_conquer",
-            "scene": "MergeSortScene",
-            "cameraPosition": [0, 6, -14],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
+            "visualizationType": "generic_algorithm",
+            "scene": "GenericScene",
+            "cameraPosition": [0, 5, -10],
+            "metadata": metadata,
+            "nodes": [],
             "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
+            "explanationTemplates": GENERIC_TEMPLATES,
         }
 
-    # ─────────────────────────────────────────
-    # QUICK SORT
-    # ─────────────────────────────────────────
-    if problem == "quick_sort":
-        arr = [3, 6, 8, 10, 1]
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        animations = [
-            {"type": "highlight", "node": 4, "color": "yellow", "duration": 1},
-            {"type": "compare", "nodeA": 0, "nodeB": 4, "color": "red", "duration": 0.8},
-            {"type": "compare", "nodeA": 1, "nodeB": 4, "color": "red", "duration": 0.8},
-            {"type": "compare", "nodeA": 2, "nodeB": 4, "color": "red", "duration": 0.8},
-            {"type": "highlight", "node": 4, "color": "green", "duration": 1},
-            {"type": "highlight_range", "low": 0, "high": 4, "color": "green", "duration": 1},
-        ]
-        explanations = [
-            "Select pivot: last element (value 1)",
-            "Compare index 0 (value 3) with pivot",
-            "Compare index 1 (value 6) with pivot",
-            "Compare index 2 (value 8) with pivot",
-            "Pivot placed in its correct sorted position",
-            "Array fully partitioned and sorted"
-        ]
-        return {
-            "visualizationType": "partition",
-            "scene": "QuickSortScene",
-            "cameraPosition": [0, 6, -12],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
+    return {
+        "visualizationType": spec["visualizationType"],
+        "scene": spec["scene"],
+        "cameraPosition": spec["cameraPosition"],
+        "metadata": metadata,
+        "nodes": _array_nodes(spec["array"]),
+        "edges": [],
+        "explanationTemplates": (
+            {**GENERIC_TEMPLATES, **spec["templates"]} if "templates" in spec
+            else GENERIC_TEMPLATES
+        ),
+    }
 
-    # ─────────────────────────────────────────
-    # LOOP
-    # ─────────────────────────────────────────
-    if problem == "loop":
-        arr = [1, 2, 3, 4, 5]
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        animations = [
-            {"type": "highlight", "node": i, "color": "red", "duration": 0.7}
-            for i in range(len(arr))
-        ]
-        explanations = [f"Loop iteration {i+1}: visiting index {i} (value {arr[i]})" for i in range(len(arr))]
-        return {
-            "visualizationType": "array_traversal",
-            "scene": "LoopScene",
-            "cameraPosition": [0, 5, -10],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
 
-    # ─────────────────────────────────────────
-    # COUNTING
-    # ─────────────────────────────────────────
-    if problem == "counting":
-        arr = [2, 3, 2, 5, 3]
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        animations = [
-            {"type": "highlight", "node": i, "color": "yellow", "duration": 0.7}
-            for i in range(len(arr))
-        ]
-        explanations = [f"Counting element at index {i} (value {arr[i]})" for i in range(len(arr))]
-        return {
-            "visualizationType": "array_traversal",
-            "scene": "CountingScene",
-            "cameraPosition": [0, 5, -10],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
+def iter_scene_frames(problem: str, detail: str = FULL, max_frames: int = None):
+    """
+    Yield (animation, explanation) frames for a problem's sample scene at
+    the given detail level, evenly downsampled to at most max_frames.
+    """
+    spec = get_scene(problem)
+    if spec is None:
+        return iter(())
+    frames = spec["frames"](spec["array"], detail)
+    return limit_frames(downsample_frames(frames, max_frames))
 
-    # ─────────────────────────────────────────
-    # SUM ARRAY
-    # ─────────────────────────────────────────
-    if problem == "sum_array":
-        arr = [1, 4, 2, 8, 3]
-        running_sum = 0
+
+def generate_ar_payload(problem: str, code: str, language: str, detail: str = FULL, max_frames: int = None):
+    header = build_scene_header(problem, language)
+
+    spec = get_scene(problem)
+    if spec is None:
         animations = []
-        explanations = []
-        for i, val in enumerate(arr):
-            running_sum += val
-            animations.append({"type": "highlight", "node": i, "color": "green", "duration": 0.7})
-            explanations.append(f"Add {val} → running sum = {running_sum}")
-        nodes = [
-            {"id": i, "label": str(val), "type": "array_element",
-             "position": [i * 2, 0, 0], "color": "blue", "scale": 1}
-            for i, val in enumerate(arr)
-        ]
-        return {
-            "visualizationType": "array_traversal",
-            "scene": "SumArrayScene",
-            "cameraPosition": [0, 5, -10],
-            "metadata": {
-                "problem": problem,
-                "language": language,
-                "totalSteps": len(animations),
-                "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
-            },
-            "nodes": nodes,
-            "edges": [],
-            "animations": animations,
-            "explanationOverlay": explanations
-        }
+        explanations = [["generic"]]
+    else:
+        # Every language and encoding of a scene shares one trace
+        trace = memoized_trace(
+            problem, spec["array"], (detail, max_frames),
+            lambda: iter_scene_frames(problem, detail, max_frames),
+        )
+        animations, explanations = trace.collect()
 
-    # ─────────────────────────────────────────
-    # GENERIC FALLBACK (safe — no arr reference)
-    # ─────────────────────────────────────────
+    metadata = header["metadata"]
     return {
-        "visualizationType": "generic_algorithm",
-        "scene": "GenericScene",
-        "cameraPosition": [0, 5, -10],
+        **header,
         "metadata": {
-            "problem": problem,
-            "language": language,
-            "totalSteps": 0,
-            "visualgoUrl": VISUALGO_LINKS.get(problem, "https://visualgo.net/en")
+            "problem": metadata["problem"],
+            "language": metadata["language"],
+            "totalSteps": len(animations),
+            "detail": detail,
+            "visualgoUrl": metadata["visualgoUrl"],
         },
-        "nodes": [],
-        "edges": [],
-        "animations": [],
-        "explanationOverlay": ["Generic algorithm — no specific visualization available."]
-    }
\ No newline at end of file
+        "animations": animations,
+        "explanationOverlay": explanations
+    }
+
+
+def iter_ar_stream(problem: str, language: str, detail: str = FULL, max_frames: int = None):
+    """
+    Yield (event, data) pairs for streaming a scene: one "scene" header,
+    one "frame" per animation step, then "end" with the step count (or
+    "error" if the trace runs past the frame budget).
+    Frames are produced lazily, so memory stays flat for long traces
+    (with max_frames, at most that many are buffered for downsampling).
+    """
+    yield "scene", build_scene_header(problem, language)
+
+    total = 0
+    try:
+        for index, (animation, (template_id, args)) in enumerate(iter_scene_frames(problem, detail, max_frames)):
+            total = index + 1
+            yield "frame", {
+                "index": index,
+                "animation": animation,
+                "explanation": [template_id, *args],
+            }
+    except BudgetExceeded as exc:
+        # Headers are already sent, so report the failure in-band
+        yield "error", {"status": exc.status_code, "detail": exc.detail}
+        return
+
+    yield "end", {"totalSteps": total}
+
+
+# ─────────────────────────────────────────
+# SERIALIZED SCENE CACHE (served by /api/ar)
+# ─────────────────────────────────────────
+AR_SCENE_CACHE = ResultCache(
+    max_entries=config.AR_SCENE_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS,
+    max_bytes=config.RESULT_CACHE_MAX_BYTES,
+    sizeof=lambda scene: len(scene[0]),
+)
+
+
+def build_ar_scene(problem: str, language: str, binary: bool, detail: str = FULL, max_frames: int = None):
+    # Scenes are driven by sample arrays, not the submitted code
+    with stage("ar_payload"):
+        payload = generate_ar_payload(problem, "", language, detail, max_frames)
+    with stage("ar_encode"):
+        if binary:
+            body = encode_ar_binary(payload)
+        else:
+            body = dumps(payload)
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return body, etag
+
+
+# Sample scenes depend only on (problem, language), so every combination is
+# rendered once at startup (at full detail) and served straight from this dict.
+PRECOMPUTED_SCENES = {}
+
+
+def precompute_ar_scenes(languages):
+    for problem in (*problem_ids(), "unknown"):
+        for language in languages:
+            for binary in (False, True):
+                # Startup renders aren't request latency; keep them out of
+                # the stage histograms
+                PRECOMPUTED_SCENES[(problem, language, binary)], _ = run_timed(
+                    build_ar_scene, problem, language, binary
+                )
+
+
+def _scene_key(problem: str, language: str, binary: bool, detail: str, max_frames: int):
+    return f"{problem}:{language}:{'bin' if binary else 'json'}:{detail}:{max_frames or ''}"
+
+
+def lookup_ar_scene(problem: str, language: str, binary: bool = False, detail: str = FULL, max_frames: int = None):
+    """(body_bytes, etag) if the scene is already rendered, else None."""
+    scene = None
+    if detail == FULL and max_frames is None:
+        scene = PRECOMPUTED_SCENES.get((problem, language, binary))
+    if scene is None:
+        scene = AR_SCENE_CACHE.get(_scene_key(problem, language, binary, detail, max_frames))
+    return scene
+
+
+def store_ar_scene(problem: str, language: str, binary: bool, scene, detail: str = FULL, max_frames: int = None):
+    AR_SCENE_CACHE.put(_scene_key(problem, language, binary, detail, max_frames), scene)
+    return scene
+
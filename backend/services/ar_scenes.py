@@ -0,0 +1,99 @@
+# backend/services/ar_scenes.py
+#
+# Sample scenes for the built-in problems. Each scene is a sample array plus
+# a frame generator; the problem registry points at these by name, so this
+# module is only imported once an AR payload is actually built.
+#
+# "frames" is called as frames(array, detail) with a detail level from
+# ar_animation_engine.DETAIL_LEVELS. A scene may carry a "templates" dict
+# with explanation text its frames use beyond EXPLANATION_TEMPLATES, and a
+# "target" that traced submissions are called with (see sandbox.py).
+from backend.services.ar_animation_engine import (
+    iter_linear_search_frames,
+    iter_binary_search_frames,
+    iter_sorting_frames,
+    iter_array_max_min_frames,
+    iter_merge_sort_frames,
+    iter_quick_sort_frames,
+    iter_loop_frames,
+    iter_counting_frames,
+    iter_sum_array_frames,
+)
+
+
+# ─────────────────────────────────────────
+# SCENES
+# ─────────────────────────────────────────
+LINEAR_SEARCH = {
+    "visualizationType": "array_traversal",
+    "scene": "LinearSearchScene",
+    "cameraPosition": [0, 5, -12],
+    "array": [5, 8, 3, 7, 2],
+    "target": 7,
+    "frames": lambda arr, detail: iter_linear_search_frames(arr, 7, detail),
+}
+
+BINARY_SEARCH = {
+    "visualizationType": "divide_and_conquer",
+    "scene": "BinarySearchScene",
+    "cameraPosition": [0, 6, -14],
+    "array": [1, 3, 5, 7, 9, 11, 13],
+    "target": 9,
+    "frames": lambda arr, detail: iter_binary_search_frames(arr, 9, detail),
+}
+
+SORTING = {
+    "visualizationType": "swap_animation",
+    "scene": "SortingScene",
+    "cameraPosition": [0, 6, -12],
+    "array": [5, 2, 8, 1, 4],
+    "frames": iter_sorting_frames,
+}
+
+ARRAY_MAX_MIN = {
+    "visualizationType": "array_traversal",
+    "scene": "ArrayMaxMinScene",
+    "cameraPosition": [0, 5, -12],
+    "array": [5, 8, 3, 7, 2],
+    "frames": iter_array_max_min_frames,
+}
+
+MERGE_SORT = {
+    "visualizationType": "divide_and_conquer",
+    "scene": "MergeSortScene",
+    "cameraPosition": [0, 6, -14],
+    "array": [4, 2, 7, 1, 5],
+    "frames": iter_merge_sort_frames,
+}
+
+QUICK_SORT = {
+    "visualizationType": "partition",
+    "scene": "QuickSortScene",
+    "cameraPosition": [0, 6, -12],
+    "array": [3, 6, 8, 10, 1],
+    "frames": iter_quick_sort_frames,
+}
+
+LOOP = {
+    "visualizationType": "array_traversal",
+    "scene": "LoopScene",
+    "cameraPosition": [0, 5, -10],
+    "array": [1, 2, 3, 4, 5],
+    "frames": iter_loop_frames,
+}
+
+COUNTING = {
+    "visualizationType": "array_traversal",
+    "scene": "CountingScene",
+    "cameraPosition": [0, 5, -10],
+    "array": [2, 3, 2, 5, 3],
+    "frames": iter_counting_frames,
+}
+
+SUM_ARRAY = {
+    "visualizationType": "array_traversal",
+    "scene": "SumArrayScene",
+    "cameraPosition": [0, 5, -10],
+    "array": [1, 4, 2, 8, 3],
+    "frames": iter_sum_array_frames,
+}
@@ -0,0 +1,33 @@
+# backend/services/budgets.py
+#
+# Hard limits on how much work one submission may cause. Each check fails
+# fast with BudgetExceeded, which main.py turns into a 413/422 response.
+from backend import config
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def check_code_size(code: str, limit: int = None):
+    limit = config.MAX_CODE_BYTES if limit is None else limit
+    # Each char is 1-4 UTF-8 bytes, so only encode when it could go either way.
+    # surrogatepass: lone surrogates are valid JSON and count as 3 bytes
+    if len(code) > limit or (len(code) * 4 > limit and len(code.encode("utf-8", "surrogatepass")) > limit):
+        raise BudgetExceeded(413, f"Code exceeds the {limit}-byte limit")
+
+
+def token_budget_exceeded(limit: int):
+    return BudgetExceeded(422, f"Code exceeds the {limit}-token limit")
+
+
+def limit_frames(frames, limit: int = None):
+    """Pass frames through, failing once more than `limit` are produced."""
+    limit = config.MAX_ANIMATION_FRAMES if limit is None else limit
+    for count, frame in enumerate(frames, 1):
+        if count > limit:
+            raise BudgetExceeded(422, f"Animation exceeds the {limit}-frame limit")
+        yield frame
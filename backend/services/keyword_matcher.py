@@ -0,0 +1,51 @@
+# backend/services/keyword_matcher.py
+from collections.abc import Mapping
+
+
+class KeywordHits(Mapping):
+    """
+    {keyword: occurrences} over one text, resolved on first use.
+    Presence is a C-level `in` search that stops at the first hit; a count
+    is one str.count (non-overlapping). Each keyword is searched for at most
+    once per text, however many stages ask about it.
+    """
+    __slots__ = ("_text", "_matcher", "_present", "_counts")
+
+    def __init__(self, text: str, matcher):
+        self._text = text
+        self._matcher = matcher
+        self._present = {}
+        self._counts = {}
+
+    def __contains__(self, keyword):
+        present = self._present.get(keyword)
+        if present is None:
+            present = keyword in self._matcher.vocabulary and keyword in self._text
+            self._present[keyword] = present
+        return present
+
+    def __getitem__(self, keyword):
+        if keyword not in self:
+            raise KeyError(keyword)
+        n = self._counts.get(keyword)
+        if n is None:
+            n = self._counts[keyword] = self._text.count(keyword)
+        return n
+
+    def __iter__(self):
+        return (kw for kw in self._matcher.keywords if kw in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class KeywordMatcher:
+    """A fixed keyword set, matched with the built-in str searches."""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self.vocabulary = frozenset(self.keywords)
+
+    def counts(self, text: str):
+        """{keyword: occurrences} for every keyword found in text."""
+        return KeywordHits(text, self)
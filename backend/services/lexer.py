@@ -0,0 +1,103 @@
+# backend/services/lexer.py
+#
+# Single-pass lexer for the languages the handlers cover. It only needs to
+# tell code apart from comments and string literals, so there are two modes:
+#   "c"      — C, C++, Java, JavaScript (// and /* */ comments, "..", '..', `..`)
+#   "python" — # comments, prefixed and triple-quoted strings
+# Each mode is one compiled scanner whose alternatives never overlap, so a
+# submission is lexed in one left-to-right pass.
+import re
+from array import array
+
+IDENT, NUMBER, STRING, COMMENT, PUNCT = range(5)
+KIND_NAMES = ("ident", "number", "string", "comment", "punct")
+
+_KINDS = {
+    "comment": COMMENT,
+    "string": STRING,
+    "ident": IDENT,
+    "number": NUMBER,
+    "punct": PUNCT,
+}
+
+_C_FAMILY = re.compile(r"""
+      (?P<comment> //[^\n]* | /\*[\s\S]*?(?:\*/|\Z) )
+    | (?P<string>  "(?:[^"\\\n]|\\[\s\S])*"?
+                 | '(?:[^'\\\n]|\\[\s\S])*'?
+                 | `(?:[^`\\]|\\[\s\S])*`? )
+    | (?P<ident>   [^\W\d]\w* )
+    | (?P<number>  \d[\w.]* )
+    | (?P<punct>   [^\w\s] )
+""", re.VERBOSE)
+
+_PYTHON = re.compile(r"""
+      (?P<comment> \#[^\n]* )
+    | (?P<string>  (?i:[rbuf]{0,2})
+                   (?: \"\"\"[\s\S]*?(?:\"\"\"|\Z)
+                     | '''[\s\S]*?(?:'''|\Z)
+                     | "(?:[^"\\\n]|\\[\s\S])*"?
+                     | '(?:[^'\\\n]|\\[\s\S])*'? ) )
+    | (?P<ident>   [^\W\d]\w* )
+    | (?P<number>  \d[\w.]* )
+    | (?P<punct>   [^\w\s] )
+""", re.VERBOSE)
+
+_SCANNERS = {"c": _C_FAMILY, "python": _PYTHON}
+
+# A line that starts a Python function: C-family code can only have one
+# inside a comment or string, and those never start a line with "def"
+_PYTHON_DEF = re.compile(r"^[ \t]*(?:async[ \t]+)?def[ \t]+[^\W\d]\w*[ \t]*\(", re.MULTILINE)
+
+
+class TokenLimitExceeded(Exception):
+    pass
+
+
+def lex(code: str, mode: str = "c", max_tokens: int = None):
+    """
+    Return a flat array of (kind, start, end) triples. Scanning stops as
+    soon as more than max_tokens tokens are seen.
+    """
+    tokens = array("I")
+    kinds = _KINDS
+    append = tokens.append
+    limit = -1 if max_tokens is None else max_tokens * 3
+    for match in _SCANNERS[mode].finditer(code):
+        if len(tokens) == limit:
+            raise TokenLimitExceeded(max_tokens)
+        append(kinds[match.lastgroup])
+        append(match.start())
+        append(match.end())
+    return tokens
+
+
+def guess_mode(code: str):
+    """Pick the lexer mode with one regex probe instead of a trial lex."""
+    if ":" in code and _PYTHON_DEF.search(code):
+        return "python"
+    return "c"
+
+
+def iter_tokens(tokens):
+    for i in range(0, len(tokens), 3):
+        yield tokens[i], tokens[i + 1], tokens[i + 2]
+
+
+def strip_non_code(code: str, tokens):
+    """
+    Blank out comments and string literals (newlines kept, so offsets and
+    line numbers still line up with the original text).
+    """
+    pieces = []
+    last = 0
+    for kind, start, end in iter_tokens(tokens):
+        if kind == COMMENT or kind == STRING:
+            pieces.append(code[last:start])
+            segment = code[start:end]
+            pieces.append(" " * len(segment) if "\n" not in segment
+                          else re.sub(r"[^\n]", " ", segment))
+            last = end
+    if not pieces:
+        return code
+    pieces.append(code[last:])
+    return "".join(pieces)
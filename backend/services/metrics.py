@@ -0,0 +1,247 @@
+# backend/services/metrics.py
+#
+# Minimal Prometheus metrics: counters, callback gauges and histograms,
+# rendered in the text exposition format by /metrics.
+#
+# Pipeline stages are timed with `with stage("name"):`. Inside a worker
+# process the durations are collected by run_timed and shipped back with
+# the result, so the parent process (which owns /metrics) observes them;
+# in-process calls observe straight into STAGE_SECONDS.
+#
+# While a request is being served its RequestTrace also collects the stage
+# durations, for the Server-Timing header.
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """A gauge whose samples are read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), collect=None):
+        super().__init__(name, help, labelnames)
+        self._collect = collect
+
+    def _samples(self):
+        values = self._collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values.items()]
+
+
+class CounterFunc(Gauge):
+    """A counter read from a callback (e.g. a cache's own hit count)."""
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}   # label values -> [bucket counts..., sum]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="' + _number(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+def render_metrics():
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────
+# HTTP
+# ─────────────────────────────────────────
+REQUEST_SECONDS = Histogram(
+    "learnflow_request_seconds",
+    "Request latency by route.",
+    ("route", "method"),
+)
+RESPONSE_BYTES = Histogram(
+    "learnflow_response_bytes",
+    "Response body size by route.",
+    ("route",),
+    buckets=BYTE_BUCKETS,
+)
+REQUESTS_TOTAL = Counter(
+    "learnflow_requests_total",
+    "Requests by route and status code.",
+    ("route", "method", "status"),
+)
+
+
+# ─────────────────────────────────────────
+# REQUEST TRACE
+# ─────────────────────────────────────────
+class RequestTrace:
+    """Per-request record of stage timings and worker profiles."""
+    __slots__ = ("request_id", "profile", "timings", "profiles")
+
+    def __init__(self, request_id: str, profile: bool = False):
+        self.request_id = request_id
+        self.profile = profile
+        self.timings = []    # (stage, seconds), in completion order
+        self.profiles = []   # raw cProfile stats from pool workers
+
+    def server_timing(self, total: float = None):
+        """Server-Timing header value; repeated stages are summed."""
+        totals = {}
+        for name, elapsed in self.timings:
+            totals[name] = totals.get(name, 0.0) + elapsed
+        if total is not None:
+            totals["total"] = total
+        return ", ".join(f"{name};dur={elapsed * 1000:.3f}" for name, elapsed in totals.items())
+
+
+_current_trace = ContextVar("learnflow_request_trace", default=None)
+
+
+def start_trace(trace: RequestTrace):
+    return _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+# ─────────────────────────────────────────
+# STAGE TIMING
+# ─────────────────────────────────────────
+STAGE_SECONDS = Histogram(
+    "learnflow_stage_seconds",
+    "Time spent in each pipeline stage.",
+    ("stage",),
+)
+
+# Active list of (stage, seconds) for the current task, or None to observe
+# directly into STAGE_SECONDS
+_stage_log = ContextVar("learnflow_stage_log", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        log = _stage_log.get()
+        if log is None:
+            observe_stages(((name, elapsed),))
+        else:
+            log.append((name, elapsed))
+
+
+def run_timed(fn, *args):
+    """Call fn(*args) and return (result, [(stage, seconds), ...])."""
+    log = []
+    token = _stage_log.set(log)
+    try:
+        return fn(*args), log
+    finally:
+        _stage_log.reset(token)
+
+
+def observe_stages(timings):
+    trace = _current_trace.get()
+    for name, elapsed in timings:
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        if trace is not None:
+            trace.timings.append((name, elapsed))
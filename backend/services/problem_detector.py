@@ -1,79 +1,72 @@
 # backend/services/problem_detector.py
+from backend.services.analysis_context import as_context
+from backend.services.problem_registry import iter_detectors
 
-def detect_problem(code: str):
-    code_lower = code.lower()
+
+def _any(hits, *keywords):
+    return any(kw in hits for kw in keywords)
+
+
+def detect_problem(code):
+    # Keyword hits come from the shared single-pass scan in the context
+    ctx = as_context(code)
+    hits = ctx.keyword_counts
 
     # -------- Binary Search --------
     if (
-        ("mid" in code_lower or "middle" in code_lower) and
-        ("low" in code_lower or "left" in code_lower) and
-        ("high" in code_lower or "right" in code_lower)
+        _any(hits, "mid", "middle") and
+        _any(hits, "low", "left") and
+        _any(hits, "high", "right")
     ):
         return "binary_search"
 
     # -------- Merge Sort --------
-    if (
-        "merge" in code_lower and
-        ("sort" in code_lower or "divide" in code_lower)
-    ):
+    if "merge" in hits and _any(hits, "sort", "divide"):
         return "merge_sort"
 
     # -------- Quick Sort --------
-    if (
-        "pivot" in code_lower or
-        "partition" in code_lower or
-        ("quick" in code_lower and "sort" in code_lower)
-    ):
+    if _any(hits, "pivot", "partition") or ("quick" in hits and "sort" in hits):
         return "quick_sort"
 
     # -------- Sorting --------
-    if (
-        "swap" in code_lower or
-        "bubble" in code_lower or
-        "selection" in code_lower or
-        "insertion" in code_lower or
-        ".sort(" in code_lower or
-        "sorted(" in code_lower or
-        "arr[j] > arr[j+1]" in code_lower or
-        "arr[j]>arr[j+1]" in code_lower
+    if _any(
+        hits,
+        "swap", "bubble", "selection", "insertion", ".sort(", "sorted(",
+        "arr[j] > arr[j+1]", "arr[j]>arr[j+1]",
     ):
         return "sorting"
 
     # -------- Array Max Min --------
     if (
-        ("max" in code_lower or "min" in code_lower) and
-        ("arr" in code_lower or "array" in code_lower or "list" in code_lower) and
-        ("for" in code_lower or "while" in code_lower)
+        _any(hits, "max", "min") and
+        _any(hits, "arr", "array", "list") and
+        _any(hits, "for", "while")
     ):
         return "array_max_min"
 
     # -------- Linear Search --------
     if (
-        ("for" in code_lower or "while" in code_lower) and
-        ("==" in code_lower or "equals" in code_lower or "target" in code_lower or
-         "search" in code_lower or "find" in code_lower) and
-        ("return" in code_lower or "found" in code_lower)
+        _any(hits, "for", "while") and
+        _any(hits, "==", "equals", "target", "search", "find") and
+        _any(hits, "return", "found")
     ):
         return "linear_search"
 
     # -------- Sum Array --------
-    if (
-        "sum" in code_lower and
-        ("arr" in code_lower or "array" in code_lower or
-         "list" in code_lower or "for" in code_lower)
-    ):
+    if "sum" in hits and _any(hits, "arr", "array", "list", "for"):
         return "sum_array"
 
     # -------- Counting --------
-    if (
-        "count" in code_lower and
-        ("arr" in code_lower or "array" in code_lower or
-         "list" in code_lower or "for" in code_lower)
-    ):
+    if "count" in hits and _any(hits, "arr", "array", "list", "for"):
         return "counting"
 
+    # -------- Problems registered by plugin packs --------
+    for problem_id, detector in iter_detectors():
+        if detector(ctx):
+            return problem_id
+
     # -------- Loop (generic fallback) --------
-    if "for" in code_lower or "while" in code_lower:
+    if _any(hits, "for", "while"):
         return "loop"
 
-    return "unknown"
\ No newline at end of file
+    return "unknown"
@@ -0,0 +1,146 @@
+# backend/services/problem_registry.py
+#
+# One table for every problem the pipeline knows: which handler writes its
+# solution variants, which sample scene drives its AR payload, and which
+# video explains it. Handlers and scenes are "module:attribute" references
+# resolved on first use, so the catalog can grow without adding imports to
+# startup.
+#
+# Problem packs installed as separate distributions register through the
+# "learnflow_ar.problems" entry-point group. Each entry point loads to a
+# ProblemSpec or an iterable of them; packs are loaded the first time the
+# registry is consulted. Pack problems can also supply a detector (a
+# "module:function" taking an AnalysisContext and returning bool), which
+# detect_problem tries before its generic "loop" fallback.
+import importlib
+import threading
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.metadata import entry_points
+
+from backend.services.video_library import VIDEO_LIBRARY, VISUALGO_LINKS
+
+ENTRY_POINT_GROUP = "learnflow_ar.problems"
+
+
+@dataclass(frozen=True)
+class ProblemSpec:
+    problem_id: str
+    handler: str = None
+    scene: str = None
+    video: dict = None
+    visualgo_url: str = "https://visualgo.net/en"
+    detector: str = None
+
+
+@lru_cache(maxsize=None)
+def load_ref(ref: str):
+    module_name, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _builtin(problem_id: str, handler: str, scene: str):
+    return ProblemSpec(
+        problem_id=problem_id,
+        handler=f"backend.services.handlers.{handler}:get_solutions",
+        scene=f"backend.services.ar_scenes:{scene}",
+        video=VIDEO_LIBRARY.get(problem_id),
+        visualgo_url=VISUALGO_LINKS.get(problem_id, "https://visualgo.net/en"),
+    )
+
+
+PROBLEMS = {
+    spec.problem_id: spec
+    for spec in (
+        _builtin("linear_search", "linear_search", "LINEAR_SEARCH"),
+        _builtin("binary_search", "binary_search", "BINARY_SEARCH"),
+        _builtin("sorting", "sorting", "SORTING"),
+        _builtin("array_max_min", "array_max_min", "ARRAY_MAX_MIN"),
+        _builtin("merge_sort", "merge_sort", "MERGE_SORT"),
+        _builtin("quick_sort", "quick_sort", "QUICK_SORT"),
+        _builtin("loop", "loop", "LOOP"),
+        _builtin("counting", "counting", "COUNTING"),
+        _builtin("sum_array", "sum_array", "SUM_ARRAY"),
+    )
+}
+
+# Plugin problems that brought their own detector, in registration order
+_DETECTORS = []
+
+_plugins_loaded = False
+_plugins_lock = threading.Lock()
+
+
+def register_problem(spec: ProblemSpec):
+    PROBLEMS[spec.problem_id] = spec
+    if spec.detector:
+        _DETECTORS.append(spec)
+    return spec
+
+
+def load_plugins():
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    with _plugins_lock:
+        if _plugins_loaded:
+            return
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                loaded = ep.load()
+                specs = [loaded] if isinstance(loaded, ProblemSpec) else list(loaded)
+                for spec in specs:
+                    if not isinstance(spec, ProblemSpec):
+                        raise TypeError(f"expected ProblemSpec, got {type(spec).__name__}")
+            except Exception as exc:
+                # A broken pack shouldn't take the built-in problems down with it
+                warnings.warn(f"Skipping problem pack {ep.name!r}: {exc}")
+                continue
+            for spec in specs:
+                register_problem(spec)
+        _plugins_loaded = True
+
+
+# --------------------------------------------------
+# LOOKUPS
+# --------------------------------------------------
+def get_problem(problem_id: str):
+    load_plugins()
+    return PROBLEMS.get(problem_id)
+
+
+def problem_ids():
+    load_plugins()
+    return tuple(PROBLEMS)
+
+
+def get_handler(problem_id: str):
+    spec = get_problem(problem_id)
+    if spec is None or spec.handler is None:
+        return None
+    return load_ref(spec.handler)
+
+
+def get_scene(problem_id: str):
+    spec = get_problem(problem_id)
+    if spec is None or spec.scene is None:
+        return None
+    return load_ref(spec.scene)
+
+
+def get_video(problem_id: str):
+    spec = get_problem(problem_id)
+    return spec.video if spec is not None else None
+
+
+def get_visualgo_url(problem_id: str):
+    spec = get_problem(problem_id)
+    return spec.visualgo_url if spec is not None else VISUALGO_LINKS["unknown"]
+
+
+def iter_detectors():
+    """(problem_id, detector) for plugin problems that can detect themselves."""
+    load_plugins()
+    for spec in _DETECTORS:
+        yield spec.problem_id, load_ref(spec.detector)
@@ -0,0 +1,104 @@
+# backend/services/profiling.py
+#
+# Opt-in per-request profiling, off unless LEARNFLOW_PROFILING is set. A
+# request asks for a profile with the X-Profile: 1 header or ?profile=1
+# (the LEARNFLOW_PROFILE_TOKEN value instead of 1 when a token is
+# configured), or is picked by LEARNFLOW_PROFILE_SAMPLE_RATE; its pool
+# tasks then run under cProfile in the worker, and the merged stats are
+# written to PROFILE_DIR as <request id>.prof, readable with pstats or
+# snakeviz.
+#
+# Only work done on the pool is profiled: the event loop serves other
+# requests at the same time, so a profile of it would not be this
+# request's alone.
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+from io import StringIO
+
+from backend import config
+from backend.services.metrics import run_timed
+
+REQUEST_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def authorized(value):
+    """Whether an X-Profile / ?profile= value may ask for or read profiles."""
+    if not config.PROFILING_ENABLED or not value:
+        return False
+    if config.PROFILE_TOKEN:
+        return hmac.compare_digest(value.encode(), config.PROFILE_TOKEN.encode())
+    return value == "1"
+
+
+def should_profile(headers, query_params):
+    if not config.PROFILING_ENABLED:
+        return False
+    if authorized(headers.get("x-profile")) or authorized(query_params.get("profile")):
+        return True
+    return config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+
+
+def run_profiled(fn, *args):
+    """Worker-side: run_timed under cProfile, plus the raw stats."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result, timings = run_timed(fn, *args)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, timings, profiler.stats
+
+
+class _Snapshot:
+    # The interface pstats.Stats expects from a profiler
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profile_path(request_id: str):
+    if not REQUEST_ID_RE.match(request_id):
+        raise ValueError("Invalid request id")
+    return os.path.join(config.PROFILE_DIR, f"{request_id}.prof")
+
+
+def save_profile(request_id: str, profiles):
+    merged = pstats.Stats(_Snapshot(profiles[0]))
+    for stats in profiles[1:]:
+        merged.add(_Snapshot(stats))
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    merged.dump_stats(profile_path(request_id))
+    _prune()
+
+
+def _prune():
+    entries = [e for e in os.scandir(config.PROFILE_DIR) if e.name.endswith(".prof")]
+    excess = len(entries) - config.PROFILE_MAX_FILES
+    if excess > 0:
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def profile_report(request_id: str, sort: str = "cumulative", limit: int = 60):
+    """Text summary of a stored profile, or None if there isn't one."""
+    path = profile_path(request_id)
+    if not os.path.exists(path):
+        return None
+    out = StringIO()
+    stats = pstats.Stats(path, stream=out)
+    # The header would otherwise print the server-side file path
+    stats.files = [f"Profile {request_id}"]
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
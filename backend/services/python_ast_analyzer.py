@@ -0,0 +1,158 @@
+# backend/services/python_ast_analyzer.py
+import ast
+
+from backend import config
+from backend.services.result_cache import ResultCache, content_key
+
+BUILT_IN_CALLS = {"max", "min", "sorted"}
+BUILT_IN_METHODS = {"sort"}
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+COMPREHENSION_NODES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# Keyed by content hash; stores the walk's result rather than the tree
+# itself, which is all any caller needs and far smaller.
+AST_CACHE = ResultCache(
+    max_entries=config.AST_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS,
+    max_bytes=config.RESULT_CACHE_MAX_BYTES,
+)
+
+_UNPARSEABLE = {}
+
+
+def _called_name(call: ast.Call):
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _is_midpoint(expr):
+    """(low + high) // 2, low + (high - low) // 2, (low + high) >> 1"""
+    if not isinstance(expr, ast.BinOp):
+        return False
+    if isinstance(expr.op, ast.FloorDiv) or isinstance(expr.op, ast.RShift):
+        return isinstance(expr.left, ast.BinOp) and isinstance(expr.left.op, (ast.Add, ast.Sub))
+    if isinstance(expr.op, ast.Add):
+        return _is_midpoint(expr.right) or _is_midpoint(expr.left)
+    return False
+
+
+def _is_halving(expr):
+    """A midpoint, or n // 2 / n >> 1 (splitting a range in two)"""
+    if _is_midpoint(expr):
+        return True
+    return (
+        isinstance(expr, ast.BinOp)
+        and isinstance(expr.right, ast.Constant)
+        and (
+            (isinstance(expr.op, ast.FloorDiv) and expr.right.value == 2)
+            or (isinstance(expr.op, ast.RShift) and expr.right.value == 1)
+        )
+    )
+
+
+def _walk(tree, node_budget: int):
+    """
+    One iterative pass over the tree. Returns None if the node budget runs
+    out, so pathological inputs cost at most node_budget visits.
+    """
+    max_depth = 0
+    for_count = 0
+    while_count = 0
+    recursion = False
+    built_in = False
+    binary_search = False
+    visited = 0
+    # Divide and conquer: a function that halves its range and calls itself
+    recursive_functions = set()
+    halving_functions = set()
+
+    # (node, loop depth, enclosing function name, inside a while loop)
+    stack = [(tree, 0, None, False)]
+    while stack:
+        node, depth, function, in_while = stack.pop()
+        visited += 1
+        if visited > node_budget:
+            return None
+
+        if isinstance(node, LOOP_NODES):
+            depth += 1
+            max_depth = max(max_depth, depth)
+            if isinstance(node, ast.While):
+                while_count += 1
+                in_while = True
+            else:
+                for_count += 1
+        elif isinstance(node, COMPREHENSION_NODES):
+            # Each generator loops inside the ones before it; its iterable
+            # is evaluated once per pass of the enclosing generators
+            for level, generator in enumerate(node.generators):
+                loop_depth = depth + level + 1
+                max_depth = max(max_depth, loop_depth)
+                for_count += 1
+                stack.append((generator.iter, depth + level, function, in_while))
+                for child in (generator.target, *generator.ifs):
+                    stack.append((child, loop_depth, function, in_while))
+            inner = depth + len(node.generators)
+            for child in ast.iter_child_nodes(node):
+                if not isinstance(child, ast.comprehension):
+                    stack.append((child, inner, function, in_while))
+            continue
+        elif isinstance(node, FUNCTION_NODES):
+            function, depth, in_while = node.name, 0, False
+        elif isinstance(node, ast.Call):
+            name = _called_name(node)
+            if name is not None and name == function:
+                recursion = True
+                recursive_functions.add(function)
+            if isinstance(node.func, ast.Name) and name in BUILT_IN_CALLS:
+                built_in = True
+            elif isinstance(node.func, ast.Attribute) and name in BUILT_IN_METHODS:
+                built_in = True
+            # bisect.bisect_left(...) or, imported, bisect_left(...)
+            if name is not None and name.startswith("bisect"):
+                binary_search = True
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            if in_while and _is_midpoint(node.value):
+                binary_search = True
+            elif function is not None and _is_halving(node.value):
+                halving_functions.add(function)
+
+        # Every flag already at its final value: nothing left to learn
+        if max_depth >= 2 and while_count and recursion and built_in and binary_search:
+            break
+
+        for child in ast.iter_child_nodes(node):
+            stack.append((child, depth, function, in_while))
+
+    binary_search = binary_search or not recursive_functions.isdisjoint(halving_functions)
+    loops = for_count + while_count
+    return {
+        "nested_loop": max_depth >= 2,
+        "single_loop": loops == 1 and while_count == 0,
+        "while_loop": while_count > 0,
+        "recursion": recursion,
+        "built_in": built_in,
+        "binary_search": binary_search,
+    }
+
+
+def _analyze(code: str):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return _UNPARSEABLE
+    return _walk(tree, config.AST_NODE_BUDGET) or _UNPARSEABLE
+
+
+def analyze_python_patterns(code: str):
+    """
+    Pattern flags for Python source from a single AST walk, or None if the
+    code does not parse or exceeds the node budget.
+    """
+    result = AST_CACHE.get_or_compute(content_key(code, "python"), lambda: _analyze(code))
+    return result or None
@@ -0,0 +1,98 @@
+# backend/services/result_cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_code(code: str):
+    """Canonical form used for cache keys: unified newlines, no trailing whitespace."""
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def content_key(code: str, language: str):
+    # surrogatepass: a lone surrogate ("\ud800") is valid JSON, so it can
+    # reach us in submitted code and must still hash
+    digest = hashlib.sha256()
+    digest.update(language.strip().lower().encode("utf-8", "surrogatepass"))
+    digest.update(b"\0")
+    digest.update(normalize_code(code).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _json_size(value):
+    return len(json.dumps(value, default=str))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL and a ceiling on the
+    total (approximate, JSON-encoded) size of the stored values.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int, sizeof=_json_size):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()   # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,861 @@
+# backend/services/sandbox.py
+#
+# Runs submitted Python in throwaway worker processes and records what it
+# does to the input array, for trace_animation to turn into frames.
+#
+# This executes untrusted code, so it is off unless LEARNFLOW_SANDBOX is
+# set. The trimmed builtins below are NOT a security boundary: object
+# introspection (().__class__.__base__.__subclasses__() and friends) reaches
+# real modules from any Python code. Containment comes from the OS. Each
+# worker is a fresh interpreter started with an empty environment. Before it
+# reads a submission it:
+#   - joins new mount, PID, network, IPC and UTS namespaces, and runs the
+#     submission as PID 1 of its PID namespace (no other process visible)
+#   - pivots into an empty read-only tmpfs holding nothing but read-only
+#     binds of the Python install: no /proc, /etc, /tmp, home or project
+#     directories, so there is nothing of the host's left to read
+#   - drops every capability, and runs as the server's own uid or, when
+#     the server was started as root, as LEARNFLOW_SANDBOX_USER (never root)
+#   - sets no_new_privs and clears the dumpable flag
+#   - installs a seccomp filter that blocks exec, fork/clone, sockets,
+#     ptrace, kill, mount, pivot_root and namespace calls
+#   - sets rlimits for processes, CPU time, memory, file size and core dumps
+# If any step fails the pool refuses to start and traces fall back to the
+# sample scenes. The server itself never needs root: an unprivileged
+# server's workers create a user namespace of their own for the steps that
+# need privileges (the kernel must allow unprivileged user namespaces).
+#
+# Errors come back as one of the ERROR_MESSAGES keys, never as exception
+# text, since a submission can put anything it can read into a message.
+#
+# The pool is created by the first trace request, never at server start.
+# From then on workers are started ahead of time, and each runs a warm-up
+# trace before reporting ready, so a request only pays for sending the code
+# over a pipe. Each worker runs exactly one submission and exits; a
+# replacement is started as soon as one is handed out.
+#
+# Limits, per submission:
+#   CPU time      RLIMIT_CPU (SIGXCPU ends the run, SIGKILL one second later)
+#   memory        RLIMIT_AS
+#   wall clock    the parent kills the worker
+#   files         RLIMIT_FSIZE = 0
+#   trace size    LEARNFLOW_SANDBOX_MAX_EVENTS recorded reads/writes
+# Replies are JSON, never pickle, since the worker may be running hostile
+# code.
+import builtins
+import ctypes
+import errno
+import json
+import math
+import multiprocessing
+import os
+import platform
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from multiprocessing.connection import Connection
+
+try:
+    import pwd
+    import resource
+except ImportError:   # not on Windows, where the pool can't be isolated
+    pwd = resource = None
+
+from backend import config
+from backend.services.ar_animation_engine import TraceBuffer
+
+SUBMISSION = "<submission>"
+
+READ, WRITE, SLICE = range(3)
+
+SAFE_MODULES = frozenset({
+    "bisect", "collections", "copy", "functools", "heapq", "itertools",
+    "math", "operator", "random", "typing",
+})
+
+_SAFE_BUILTIN_NAMES = (
+    "abs", "all", "any", "bin", "bool", "callable", "chr", "classmethod", "dict",
+    "divmod", "enumerate", "filter", "float", "format", "frozenset", "hash",
+    "hex", "int", "isinstance", "issubclass", "iter", "len", "list", "map",
+    "max", "min", "next", "object", "ord", "pow", "property", "range", "repr",
+    "reversed", "round", "set", "slice", "sorted", "staticmethod", "str",
+    "sum", "super", "tuple", "zip", "__build_class__",
+    "ArithmeticError", "AssertionError", "Exception", "IndexError", "KeyError",
+    "LookupError", "NotImplementedError", "RecursionError", "RuntimeError",
+    "StopIteration", "TypeError", "ValueError", "ZeroDivisionError",
+)
+
+# Parameter names the entry function may take besides the array
+TARGET_PARAMS = {"target", "key", "x", "value", "val", "item", "search", "k"}
+LOW_PARAMS = {"low", "lo", "l", "left", "start", "begin", "first", "p"}
+HIGH_PARAMS = {"high", "hi", "h", "r", "right", "end", "last", "q"}
+LENGTH_PARAMS = {"n", "size", "length"}
+
+_WARM_UP = """
+def bubble(a):
+    for i in range(len(a)):
+        for j in range(len(a) - i - 1):
+            if a[j] > a[j + 1]:
+                a[j], a[j + 1] = a[j + 1], a[j]
+    return a
+"""
+
+
+# Exceptions a submission may raise that are reported by name
+_REPORTED_EXCEPTIONS = (
+    "ArithmeticError", "AssertionError", "AttributeError", "ImportError",
+    "IndexError", "KeyError", "LookupError", "NameError", "NotImplementedError",
+    "OverflowError", "RecursionError", "RuntimeError", "StopIteration",
+    "TypeError", "UnboundLocalError", "ValueError", "ZeroDivisionError",
+)
+
+# error key -> what the client is told
+ERROR_MESSAGES = {
+    "syntax": "The code has a syntax error",
+    "no_function": "The code defines no function to call",
+    "arguments": "Couldn't tell what to pass to the code's function",
+    "cpu": "CPU time limit exceeded",
+    "memory": "Memory limit exceeded",
+    "exception": "The code raised an exception",
+    "failure": "The sandbox failed",
+    **{name: f"The code raised {name}" for name in _REPORTED_EXCEPTIONS},
+}
+
+_EXCEPTION_KEYS = {getattr(builtins, name): name for name in _REPORTED_EXCEPTIONS}
+
+
+def error_message(key):
+    """Client-facing text for a worker's error key."""
+    if type(key) is not str or key not in ERROR_MESSAGES:
+        key = "failure"
+    return ERROR_MESSAGES[key]
+
+
+class SandboxError(Exception):
+    """
+    The submission could not be traced (limits, crash, busy pool). The
+    message never carries worker output, so it is safe to show clients.
+    """
+
+
+class _ArgumentError(Exception):
+    pass
+
+
+class _TraceLimit(BaseException):
+    # BaseException so `except Exception` in the submission can't swallow it
+    pass
+
+
+class _CpuLimit(BaseException):
+    pass
+
+
+# ─────────────────────────────────────────
+# WORKER SIDE
+# ─────────────────────────────────────────
+def _safe_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and name.partition(".")[0] in SAFE_MODULES:
+        return __import__(name, globals, locals, fromlist, level)
+    raise ImportError(f"Import of {name!r} is not allowed here")
+
+
+SAFE_BUILTINS = {name: getattr(builtins, name) for name in _SAFE_BUILTIN_NAMES}
+SAFE_BUILTINS["__import__"] = _safe_import
+SAFE_BUILTINS["print"] = lambda *args, **kwargs: None
+
+
+def _plain(value):
+    # Only builtin scalars cross back; anything else is described by type, so
+    # no submission-defined __repr__ runs here
+    kind = type(value)
+    if value is None or kind is bool or kind is int:
+        return value
+    if kind is float:
+        return value if math.isfinite(value) else repr(value)
+    if kind is str:
+        return value[:40]
+    if kind is list or kind is tuple or kind is TracedList:
+        items = tuple.__getitem__ if kind is tuple else list.__getitem__
+        head = [str(_plain(v)) for v in items(value, slice(0, 10))]
+        more = ", ..." if len(value) > 10 else ""
+        return "[" + ", ".join(head) + more + "]"
+    return f"<{kind.__name__}>"
+
+
+class _Recorder:
+    __slots__ = ("size", "limit", "events", "values", "step", "line")
+
+    def __init__(self, size: int, limit: int):
+        self.size = size
+        self.limit = limit
+        self.events = TraceBuffer(min(limit, 1024))
+        self.values = []
+        self.step = 0
+        self.line = 0
+
+    def record(self, op: int, position: int, value):
+        if not 0 <= position < self.size:
+            return
+        if len(self.events) >= self.limit:
+            raise _TraceLimit()
+        self.events.record(op, position, self.step, self.line)
+        self.values.append(_plain(value))
+
+    def flat_events(self):
+        return self.events.data[:len(self.events) * TraceBuffer.WIDTH].tolist()
+
+
+class TracedList(list):
+    """
+    The array handed to the submission. Reads and writes are recorded at
+    their position in the original input; slices and copies stay traced,
+    shifted by their start index.
+    """
+    __slots__ = ("_recorder", "_offset")
+
+    def __init__(self, values, recorder: _Recorder, offset: int = 0):
+        super().__init__(values)
+        self._recorder = recorder
+        self._offset = offset
+
+    def _position(self, index: int):
+        return self._offset + (index + len(self) if index < 0 else index)
+
+    def __getitem__(self, index):
+        value = list.__getitem__(self, index)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return value
+            if stop > start:
+                self._recorder.record(SLICE, self._offset + start, self._offset + stop - 1)
+            return TracedList(value, self._recorder, self._offset + start)
+        self._recorder.record(READ, self._position(index), value)
+        return value
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                for i in range(start, min(stop, len(self))):
+                    self._recorder.record(WRITE, self._offset + i, list.__getitem__(self, i))
+            return
+        self._recorder.record(WRITE, self._position(index), value)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            value = list.__getitem__(self, i)
+            self._recorder.record(READ, self._offset + i, value)
+            yield value
+
+    def copy(self):
+        return TracedList(list.__getitem__(self, slice(None)), self._recorder, self._offset)
+
+
+def _tracer(recorder: _Recorder):
+    # Line events split the recorded reads/writes into steps: everything one
+    # source line does becomes one frame
+    def local(frame, event, arg):
+        if event == "line":
+            recorder.step += 1
+            recorder.line = frame.f_lineno
+        elif event == "return":
+            caller = frame.f_back
+            if caller is not None and caller.f_code.co_filename == SUBMISSION:
+                recorder.step += 1
+                recorder.line = caller.f_lineno
+        return local
+
+    def trace(frame, event, arg):
+        if frame.f_code.co_filename != SUBMISSION:
+            return None
+        return local
+
+    return trace
+
+
+def _entry_point(namespace):
+    """The submission's top-level function that no other one calls."""
+    functions = {
+        name: value for name, value in namespace.items()
+        if callable(value) and getattr(getattr(value, "__code__", None), "co_filename", None) == SUBMISSION
+    }
+    called = set()
+    for name, fn in functions.items():
+        called.update(ref for ref in fn.__code__.co_names if ref != name)
+    roots = [fn for name, fn in functions.items() if name not in called]
+    return (roots or list(functions.values()) or [None])[0]
+
+
+def _call_args(fn, array, target):
+    code = fn.__code__
+    required = code.co_argcount - len(fn.__defaults__ or ())
+    if required < 1:
+        raise _ArgumentError()
+
+    args = [array]
+    for name in code.co_varnames[1:required]:
+        lowered = name.lower()
+        if lowered in TARGET_PARAMS:
+            args.append(target if target is not None else list.__getitem__(array, len(array) // 2))
+        elif lowered in LOW_PARAMS:
+            args.append(0)
+        elif lowered in HIGH_PARAMS:
+            args.append(len(array) - 1)
+        elif lowered in LENGTH_PARAMS:
+            args.append(len(array))
+        else:
+            raise _ArgumentError()
+    return args
+
+
+def run_submission(code: str, array, target=None, max_events: int = None):
+    """Execute code, call its entry function on a TracedList, return the trace."""
+    recorder = _Recorder(len(array), max_events or config.SANDBOX_MAX_EVENTS)
+    reply = {"ok": True, "error": None, "truncated": False, "result": None}
+
+    try:
+        compiled = compile(code, SUBMISSION, "exec")
+    except (SyntaxError, ValueError):
+        return {**reply, "ok": False, "error": "syntax", "events": [], "values": []}
+
+    namespace = {"__builtins__": SAFE_BUILTINS, "__name__": "__submission__"}
+    traced = TracedList(array, recorder)
+    sys.settrace(_tracer(recorder))
+    try:
+        exec(compiled, namespace)
+        entry = _entry_point(namespace)
+        if entry is None:
+            reply.update(ok=False, error="no_function")
+        else:
+            reply["result"] = _plain(entry(*_call_args(entry, traced, target)))
+    except _TraceLimit:
+        reply["truncated"] = True
+    except _CpuLimit:
+        reply.update(ok=False, error="cpu")
+    except MemoryError:
+        reply.update(ok=False, error="memory")
+    except _ArgumentError:
+        reply.update(ok=False, error="arguments")
+    except BaseException as exc:
+        reply.update(ok=False, error=_EXCEPTION_KEYS.get(type(exc), "exception"))
+    finally:
+        sys.settrace(None)
+
+    reply["events"] = recorder.flat_events()
+    reply["values"] = recorder.values
+    return reply
+
+
+# ─────────────────────────────────────────
+CLONE_NEWNS = 0x00020000
+CLONE_NEWUTS = 0x04000000
+CLONE_NEWIPC = 0x08000000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWPID = 0x20000000
+CLONE_NEWNET = 0x40000000
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_NOEXEC = 0x8
+MS_REMOUNT = 0x20
+MS_NOATIME = 0x400
+MS_NODIRATIME = 0x800
+MS_BIND = 0x1000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+MS_RELATIME = 0x200000
+MNT_DETACH = 0x2
+PR_SET_PDEATHSIG = 1
+PR_SET_DUMPABLE = 4
+PR_CAPBSET_DROP = 24
+PR_SET_SECCOMP = 22
+PR_SET_NO_NEW_PRIVS = 38
+PR_CAP_AMBIENT = 47
+PR_CAP_AMBIENT_CLEAR_ALL = 4
+LINUX_CAPABILITY_VERSION_3 = 0x20080522
+SECCOMP_MODE_FILTER = 2
+SECCOMP_RET_KILL_PROCESS = 0x80000000
+SECCOMP_RET_ERRNO = 0x00050000
+SECCOMP_RET_ALLOW = 0x7FFF0000
+
+# Mount flags a user namespace may not clear on a bind of a host mount
+# (statvfs f_flag bit -> mount flag)
+_LOCKED_FLAGS = {
+    0x2: MS_NOSUID, 0x4: MS_NODEV, 0x8: MS_NOEXEC,
+    0x400: MS_NOATIME, 0x800: MS_NODIRATIME, 0x1000: MS_RELATIME,
+}
+
+# The tmpfs that becomes the worker's whole filesystem is built here, in
+# the worker's own mount namespace (the host's /tmp is untouched)
+_NEW_ROOT = b"/tmp"
+
+# machine -> pivot_root syscall number (glibc has no portable wrapper)
+SYS_PIVOT_ROOT = {"x86_64": 155, "aarch64": 41}
+
+# machine -> (audit arch, syscalls answered with EPERM)
+SECCOMP_DENY = {
+    "x86_64": (0xC000003E, (
+        41, 42, 43, 49, 50, 288,     # socket connect accept bind listen accept4
+        56, 57, 58, 435,             # clone fork vfork clone3
+        59, 322,                     # execve execveat
+        62, 200, 234,                # kill tkill tgkill
+        101, 310, 311,               # ptrace process_vm_readv/writev
+        165, 166, 272, 308,          # mount umount2 unshare setns
+        155, 161,                    # pivot_root chroot
+        428, 429, 430, 431, 432, 433,  # open_tree move_mount fsopen fsconfig fsmount fspick
+        321, 298, 323,               # bpf perf_event_open userfaultfd
+        248, 249, 250,               # add_key request_key keyctl
+    )),
+    "aarch64": (0xC00000B7, (
+        198, 200, 201, 202, 203, 242,
+        220, 435,
+        221, 281,
+        129, 130, 131,
+        117, 270, 271,
+        40, 39, 97, 268,
+        41, 51,
+        428, 429, 430, 431, 432, 433,
+        280, 241, 282,
+        217, 218, 219,
+    )),
+}
+
+
+class _SockFilter(ctypes.Structure):
+    _fields_ = [("code", ctypes.c_ushort), ("jt", ctypes.c_ubyte), ("jf", ctypes.c_ubyte), ("k", ctypes.c_uint)]
+
+
+class _SockFprog(ctypes.Structure):
+    _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.POINTER(_SockFilter))]
+
+
+class _CapHeader(ctypes.Structure):
+    _fields_ = [("version", ctypes.c_uint32), ("pid", ctypes.c_int)]
+
+
+class _CapData(ctypes.Structure):
+    _fields_ = [("effective", ctypes.c_uint32), ("permitted", ctypes.c_uint32), ("inheritable", ctypes.c_uint32)]
+
+
+def _seccomp_program(machine: str):
+    arch, denied = SECCOMP_DENY[machine]
+    ld, jeq, jge, ret = 0x20, 0x15, 0x35, 0x06
+    # (code, k, jump-if-true target, jump-if-false target); targets are
+    # "deny"/"kill" or None for the next instruction
+    program = [
+        (ld, 4, None, None),                    # seccomp_data.arch
+        (jeq, arch, None, "kill"),
+        (ld, 0, None, None),                    # seccomp_data.nr
+    ]
+    if machine == "x86_64":
+        program.append((jge, 0x40000000, "kill", None))   # x32 syscall numbers
+    program += [(jeq, nr, "deny", None) for nr in denied]
+    program.append((ret, SECCOMP_RET_ALLOW, None, None))
+    targets = {"deny": len(program), "kill": len(program) + 1}
+    program.append((ret, SECCOMP_RET_ERRNO | 1, None, None))   # EPERM
+    program.append((ret, SECCOMP_RET_KILL_PROCESS, None, None))
+
+    def offset(index, target):
+        return 0 if target is None else targets[target] - index - 1
+
+    return [
+        _SockFilter(code, offset(i, jt), offset(i, jf), k)
+        for i, (code, k, jt, jf) in enumerate(program)
+    ]
+
+
+def _libc_call(result: int, what: str):
+    if result != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, f"{what} failed: {os.strerror(err)}")
+
+
+def _python_dirs():
+    """The interpreter's install prefixes, outermost only."""
+    dirs = []
+    for path in sorted({os.path.abspath(p) for p in (sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix)}):
+        if not any(path.startswith(parent.rstrip("/") + "/") for parent in dirs):
+            dirs.append(path)
+    return dirs
+
+
+def _write_file(path: str, data: str):
+    with open(path, "w") as f:
+        f.write(data)
+
+
+# Everything but the user namespace, which only an unprivileged server needs
+_NAMESPACES = CLONE_NEWNS | CLONE_NEWPID | CLONE_NEWNET | CLONE_NEWIPC | CLONE_NEWUTS
+
+
+def _enter_user_namespace(libc):
+    # An unprivileged server's workers get the capabilities they need for
+    # the other namespaces from a user namespace of their own, in which
+    # their uid maps to itself. Those capabilities are dropped again
+    # before the submission runs.
+    uid, gid = os.getuid(), os.getgid()
+    _libc_call(libc.unshare(CLONE_NEWUSER | _NAMESPACES), "unshare")
+    _write_file("/proc/self/setgroups", "deny")
+    _write_file("/proc/self/uid_map", f"{uid} {uid} 1")
+    _write_file("/proc/self/gid_map", f"{gid} {gid} 1")
+
+
+def _fork_init(conn):
+    """
+    Fork into the new PID namespace. Only the child returns; this process
+    waits outside it and exits with the child.
+    """
+    pid = os.fork()
+    if pid:
+        conn.close()
+        _, status = os.waitpid(pid, 0)
+        os._exit(os.waitstatus_to_exitcode(status) & 0xFF)
+
+
+def _bind_read_only(libc, source_fd: int, target: bytes):
+    _libc_call(
+        libc.mount(f"/proc/self/fd/{source_fd}".encode(), target, None, MS_BIND | MS_REC, None),
+        f"bind mount of {os.fsdecode(target)}",
+    )
+    locked = os.statvfs(target).f_flag
+    flags = MS_REMOUNT | MS_BIND | MS_RDONLY | MS_NOSUID | MS_NODEV
+    flags |= sum(flag for bit, flag in _LOCKED_FLAGS.items() if locked & bit)
+    _libc_call(libc.mount(None, target, None, flags, None), f"read-only remount of {os.fsdecode(target)}")
+
+
+def _pivot_to_tmpfs(libc, machine: str, python_dirs):
+    """
+    Replace the filesystem with an empty tmpfs holding only read-only binds
+    of the Python prefixes: no /proc, /etc, /home, /tmp or project files.
+    """
+    # Private first, so nothing below propagates back to the host
+    _libc_call(libc.mount(b"none", b"/", None, MS_REC | MS_PRIVATE, None), "mount(MS_PRIVATE)")
+    # Opened before the tmpfs goes over _NEW_ROOT, which might hide them
+    sources = [(path, os.open(path, os.O_PATH | os.O_DIRECTORY)) for path in python_dirs]
+    _libc_call(
+        libc.mount(b"tmpfs", _NEW_ROOT, b"tmpfs", MS_NOSUID | MS_NODEV, b"size=64k,mode=0755"),
+        "tmpfs mount",
+    )
+    for path, fd in sources:
+        target = _NEW_ROOT + os.fsencode(path)
+        os.makedirs(target, 0o755)
+        _bind_read_only(libc, fd, target)
+        os.close(fd)
+    _libc_call(
+        libc.mount(None, _NEW_ROOT, None, MS_REMOUNT | MS_BIND | MS_RDONLY | MS_NOSUID | MS_NODEV, None),
+        "read-only remount of the new root",
+    )
+
+    os.chdir(_NEW_ROOT)
+    _libc_call(libc.syscall(SYS_PIVOT_ROOT[machine], b".", b"."), "pivot_root")
+    # The old root is stacked on top of the new one; detach it
+    _libc_call(libc.umount2(b".", MNT_DETACH), "umount2(old root)")
+    os.chdir("/")
+
+
+def _drop_bounding_set(libc):
+    cap = 0
+    while libc.prctl(PR_CAPBSET_DROP, cap, 0, 0, 0) == 0:
+        cap += 1
+    if ctypes.get_errno() != errno.EINVAL or cap == 0:
+        raise OSError("prctl(PR_CAPBSET_DROP) failed")
+
+
+def _clear_capabilities(libc):
+    _libc_call(libc.prctl(PR_CAP_AMBIENT, PR_CAP_AMBIENT_CLEAR_ALL, 0, 0, 0), "prctl(PR_CAP_AMBIENT)")
+    header = _CapHeader(LINUX_CAPABILITY_VERSION_3, 0)
+    _libc_call(libc.capset(ctypes.byref(header), ctypes.byref((_CapData * 2)())), "capset")
+
+
+def _capabilities(libc):
+    header = _CapHeader(LINUX_CAPABILITY_VERSION_3, 0)
+    data = (_CapData * 2)()
+    _libc_call(libc.capget(ctypes.byref(header), ctypes.byref(data)), "capget")
+    return [value for d in data for value in (d.effective, d.permitted, d.inheritable)]
+
+
+def _check_isolation(libc, python_dirs):
+    # Check the result rather than trusting the calls above
+    top_level = {path.split("/")[1] for path in python_dirs}
+    if set(os.listdir("/")) != top_level or os.path.exists("/proc/self"):
+        raise OSError("Sandbox worker can still see the host filesystem")
+    if os.getpid() != 1:
+        raise OSError("Sandbox worker is not in its own PID namespace")
+    if os.getuid() == 0 or any(_capabilities(libc)):
+        raise OSError("Sandbox worker kept root or its capabilities")
+    try:
+        os.setuid(0)
+    except OSError:
+        pass
+    else:
+        raise OSError("Sandbox worker could become root")
+
+
+def _isolate(user: str, conn):
+    """
+    Confine this process before it sees untrusted code. Forks once: only
+    the confined child returns (see _fork_init). Raises OSError (or
+    KeyError for an unknown user) if any step can't be applied.
+    """
+    machine = platform.machine()
+    if sys.platform != "linux" or resource is None or machine not in SECCOMP_DENY:
+        raise OSError(f"Sandbox isolation is not supported on {sys.platform}/{machine}")
+
+    os.environ.clear()
+    # Everything the submission may import, loaded while the files are
+    # still reachable
+    for name in SAFE_MODULES:
+        __import__(name)
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    # A server started as root builds the sandbox with its own privileges
+    # and then hands the worker to an unprivileged user; an unprivileged
+    # server's workers keep its uid and use a user namespace instead
+    privileged = os.geteuid() == 0
+    if privileged:
+        entry = pwd.getpwnam(user)
+        if entry.pw_uid == 0 or entry.pw_gid == 0:
+            raise OSError(f"Sandbox user {user!r} must not be root")
+        _libc_call(libc.unshare(_NAMESPACES), "unshare")
+    else:
+        _enter_user_namespace(libc)
+    _fork_init(conn)
+
+    python_dirs = _python_dirs()
+    _pivot_to_tmpfs(libc, machine, python_dirs)
+    _drop_bounding_set(libc)
+    if privileged:
+        os.setgroups([])
+        os.setresgid(entry.pw_gid, entry.pw_gid, entry.pw_gid)
+        os.setresuid(entry.pw_uid, entry.pw_uid, entry.pw_uid)
+    _clear_capabilities(libc)
+    # Die with the waiter outside, which is what the pool kills on a
+    # timeout. Set after the uid change, which would reset it.
+    _libc_call(libc.prctl(PR_SET_PDEATHSIG, signal.SIGKILL, 0, 0, 0), "prctl(PR_SET_PDEATHSIG)")
+    _libc_call(libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "prctl(PR_SET_NO_NEW_PRIVS)")
+    _libc_call(libc.prctl(PR_SET_DUMPABLE, 0, 0, 0, 0), "prctl(PR_SET_DUMPABLE)")
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+    program = _seccomp_program(machine)
+    fprog = _SockFprog(len(program), (_SockFilter * len(program))(*program))
+    _libc_call(
+        libc.prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, ctypes.byref(fprog), 0, 0),
+        "prctl(PR_SET_SECCOMP)",
+    )
+    _check_isolation(libc, python_dirs)
+
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimit()
+
+
+def _apply_limits(limits):
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = math.ceil(usage.ru_utime + usage.ru_stime + limits["cpuSeconds"])
+    signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    memory = limits["memoryMB"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _worker_main(fd: int, limits):
+    conn = Connection(fd)
+    try:
+        _isolate(limits["user"], conn)
+        run_submission(_WARM_UP, [3, 1, 2])
+    except (OSError, KeyError) as exc:
+        conn.send_bytes(f"Sandbox isolation failed: {exc}".encode()[:512])
+        return
+    try:
+        conn.send_bytes(b"ready")
+        task = json.loads(conn.recv_bytes())
+    except (EOFError, OSError):
+        return
+    _apply_limits(limits)
+
+    try:
+        reply = run_submission(task["code"], task["array"], task.get("target"), limits["maxEvents"])
+        body = json.dumps(reply).encode()
+    except BaseException:
+        body = json.dumps({"ok": False, "error": "failure"}).encode()
+    try:
+        conn.send_bytes(body)
+    except (EOFError, OSError):
+        pass
+
+
+# ─────────────────────────────────────────
+# PARENT SIDE
+# ─────────────────────────────────────────
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _limits():
+    return {
+        "user": config.SANDBOX_USER,
+        "cpuSeconds": config.SANDBOX_CPU_SECONDS,
+        "memoryMB": config.SANDBOX_MEMORY_MB,
+        "maxEvents": config.SANDBOX_MAX_EVENTS,
+    }
+
+
+class SandboxPool:
+    """Idle single-use workers, started before they are needed."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle = queue.Queue()
+        self._closed = False
+
+    def start(self, timeout: float):
+        """Start the workers and wait until each reports it is isolated."""
+        workers = [self._launch() for _ in range(self.size)]
+        try:
+            for process, conn in workers:
+                self._handshake(conn, time.monotonic() + timeout)
+        except SandboxError:
+            for process, conn in workers:
+                self._discard(process, conn)
+            raise
+        for process, conn in workers:
+            self._idle.put((process, conn, True))
+
+    @staticmethod
+    def _launch():
+        # A fresh interpreter with an empty environment: nothing from the
+        # server's memory or env is inherited
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = subprocess.Popen(
+            [sys.executable, "-E", "-s", "-m", __name__, str(child_conn.fileno()), json.dumps(_limits())],
+            cwd=_PROJECT_ROOT,
+            env={},
+            pass_fds=(child_conn.fileno(),),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        child_conn.close()
+        return process, parent_conn
+
+    @staticmethod
+    def _discard(process, conn):
+        conn.close()
+        if process.poll() is None:
+            process.kill()
+        try:
+            process.wait(1)
+        except subprocess.TimeoutExpired:
+            pass
+
+    @staticmethod
+    def _handshake(conn, deadline):
+        try:
+            if not conn.poll(max(deadline - time.monotonic(), 0)):
+                raise SandboxError("Sandbox worker did not start")
+            message = conn.recv_bytes(512)
+        except (EOFError, OSError):
+            raise SandboxError("Sandbox worker did not start") from None
+        if message != b"ready":
+            # The reason names users and paths: for the operator, not clients
+            warnings.warn(f"Sandbox worker did not start: {message.decode(errors='replace')}")
+            raise SandboxError("Sandbox worker did not start")
+
+    def run(self, task: dict, timeout: float):
+        deadline = time.monotonic() + timeout
+        try:
+            process, conn, ready = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise SandboxError("All sandbox workers are busy") from None
+        if not self._closed:
+            self._idle.put((*self._launch(), False))   # replacement starts while this one runs
+
+        try:
+            if not ready:
+                self._handshake(conn, deadline)
+            return self._exchange(conn, task, deadline, timeout)
+        finally:
+            self._discard(process, conn)
+
+    @staticmethod
+    def _exchange(conn, task, deadline, timeout):
+        conn.send_bytes(json.dumps(task).encode())
+
+        if not conn.poll(max(deadline - time.monotonic(), 0)):
+            raise SandboxError(f"Time limit of {timeout:g}s exceeded")
+        try:
+            # Generous bound: a few dozen bytes per recorded event
+            body = conn.recv_bytes(64 * config.SANDBOX_MAX_EVENTS + 65536)
+        except EOFError:
+            raise SandboxError("Sandbox worker was killed (resource limit exceeded)") from None
+        except OSError:
+            raise SandboxError("Sandbox reply too large") from None
+        return json.loads(body)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                process, conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(process, conn)
+
+
+_pool = None
+_pool_error = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool():
+    """
+    The sandbox pool, started on first use; None if tracing is disabled.
+    Raises SandboxError if the workers can't be isolated (and keeps
+    raising it, without retrying, until the server restarts).
+    """
+    global _pool, _pool_error
+    if not config.SANDBOX_ENABLED or config.SANDBOX_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool_error is not None:
+            raise SandboxError(_pool_error)
+        if _pool is None:
+            pool = SandboxPool(config.SANDBOX_WORKERS)
+            try:
+                pool.start(config.SANDBOX_WALL_SECONDS)
+            except SandboxError as exc:
+                _pool_error = f"Code tracing is unavailable: {exc}"
+                raise SandboxError(_pool_error) from None
+            _pool = pool
+        return _pool
+
+
+def shutdown_sandbox_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def run_sandboxed(code: str, array, target=None):
+    """Trace code on array in a sandbox worker; blocking, so call it off the event loop."""
+    pool = get_sandbox_pool()
+    if pool is None:
+        raise SandboxError("Code tracing is disabled")
+    reply = pool.run({"code": code, "array": list(array), "target": target}, config.SANDBOX_WALL_SECONDS)
+    if not isinstance(reply, dict):
+        raise SandboxError("Malformed sandbox reply")
+    return reply
+
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]), json.loads(sys.argv[2]))
@@ -0,0 +1,90 @@
+# backend/services/serialization.py
+#
+# Response encoding shared by all routes. Routes return json_response(...)
+# so their dicts skip FastAPI's jsonable_encoder walk, and the bytes come
+# from orjson when LEARNFLOW_FAST_JSON is set (stdlib json otherwise).
+#
+# Values wrapped in JSONFragment are already-encoded JSON (cached solution
+# tables, AR scenes, ...). They are spliced into the output verbatim instead
+# of being decoded and re-encoded.
+import json
+import re
+import secrets
+
+from fastapi.responses import JSONResponse
+
+from backend import config
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_USE_ORJSON = config.FAST_JSON and orjson is not None
+_NATIVE_FRAGMENTS = _USE_ORJSON and hasattr(orjson, "Fragment")
+
+# Placeholder strings stand in for fragments during encoding; the random
+# token keeps them from colliding with real string values.
+_TOKEN = secrets.token_hex(8)
+_PLACEHOLDER_RE = re.compile(rb'"\\u0000' + _TOKEN.encode() + rb':(\d+)\\u0000"')
+
+
+class JSONFragment:
+    """Pre-encoded JSON bytes to embed as-is in a response."""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data.encode() if isinstance(data, str) else data
+
+    @classmethod
+    def encode(cls, value):
+        return cls(dumps(value))
+
+
+def _orjson_dumps(obj, default):
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _stdlib_dumps(obj, default):
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _dumps_with(encoder, obj):
+    if encoder is _orjson_dumps and _NATIVE_FRAGMENTS:
+        return encoder(obj, lambda o: orjson.Fragment(o.data) if isinstance(o, JSONFragment) else _unsupported(o))
+
+    fragments = []
+
+    def default(o):
+        if isinstance(o, JSONFragment):
+            fragments.append(o.data)
+            return f"\0{_TOKEN}:{len(fragments) - 1}\0"
+        return _unsupported(o)
+
+    body = encoder(obj, default)
+    if fragments:
+        body = _PLACEHOLDER_RE.sub(lambda m: fragments[int(m.group(1))], body)
+    return body
+
+
+def _unsupported(o):
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Encode obj to JSON bytes, splicing in any JSONFragment values."""
+    if _USE_ORJSON:
+        try:
+            return _dumps_with(_orjson_dumps, obj)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; let the stdlib handle it
+    return _dumps_with(_stdlib_dumps, obj)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+
+def json_response(content, status_code: int = 200, headers=None):
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
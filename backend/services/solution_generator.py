@@ -3,35 +3,38 @@
 # --------------------------------------------------
 # IMPORTS
 # --------------------------------------------------
-from backend.services.handlers.loop import get_solutions as loop_handler
-from backend.services.handlers.counting import get_solutions as counting_handler
-from backend.services.handlers.sum_array import get_solutions as sum_handler
-from backend.services.problem_detector import detect_problem
-from backend.services.handlers.linear_search import get_solutions as linear_search
-from backend.services.handlers.array_max_min import get_solutions as array_max_min
-from backend.services.handlers.sorting import get_solutions as sorting
-from backend.services.handlers.merge_sort import get_solutions as merge_sort
-from backend.services.handlers.quick_sort import get_solutions as quick_sort
+from types import MappingProxyType
+from urllib.parse import urlencode
 
-# ✅ KEEP ONLY THIS (REMOVE duplicate import)
-from backend.services.ar_payload_generator import generate_ar_payload
+from backend.services.problem_detector import detect_problem
+from backend.services.problem_registry import get_handler, problem_ids
+from backend.services.analysis_context import AnalysisContext, as_context, build_context
+from backend.services.metrics import stage
+from backend.services.python_ast_analyzer import analyze_python_patterns
+from backend.services.result_cache import ResultCache
+from backend.services.serialization import JSONFragment, dumps
+from backend import config
 
 
 # --------------------------------------------------
 # LANGUAGE DETECTION
 # --------------------------------------------------
-def detect_language_from_code(code: str):
-    code_lower = code.lower()
+# Every value detect_language_from_code can return
+DETECTED_LANGUAGES = ("python", "javascript", "java", "c", "cpp", "unknown")
+
+
+def detect_language_from_code(code):
+    ctx = as_context(code)
 
-    if "def " in code_lower and ":" in code_lower:
+    if ctx.has("def ") and ctx.has(":"):
         return "python"
-    if "function" in code_lower or "=>" in code_lower or "let " in code_lower:
+    if ctx.has("function", "=>", "let "):
         return "javascript"
-    if "public static" in code_lower or "system.out" in code_lower:
+    if ctx.has("public static", "system.out"):
         return "java"
-    if "#include" in code_lower and "printf" in code_lower:
+    if ctx.has("#include") and ctx.has("printf"):
         return "c"
-    if "#include" in code_lower and ("std::" in code_lower or "cout" in code_lower):
+    if ctx.has("#include") and ctx.has("std::", "cout"):
         return "cpp"
 
     return "unknown"
@@ -40,33 +43,34 @@ def detect_language_from_code(code: str):
 # --------------------------------------------------
 # PATTERN ANALYSIS
 # --------------------------------------------------
-def analyze_patterns(code: str, language: str):
-    code_lower = code.lower()
+def analyze_patterns(code, language: str):
+    ctx = as_context(code)
+
+    # Python gets a real syntax-tree analysis; keyword counts are the
+    # fallback for other languages and for code that doesn't parse
+    if language == "python":
+        patterns = analyze_python_patterns(ctx.code)
+        if patterns is not None:
+            return patterns
+
+    for_count = ctx.count("for")
+    while_count = ctx.count("while")
 
     return {
         "nested_loop": (
-            code_lower.count("for") >= 2
-            or (code_lower.count("for") >= 1 and code_lower.count("while") >= 1)
-        ),
-        "single_loop": code_lower.count("for") == 1 and code_lower.count("while") == 0,
-        "while_loop": "while" in code_lower,
-        "recursion": (
-            "def" in code_lower
-            or "void" in code_lower
-            or "int" in code_lower
-        ) and code_lower.count("(") > 1,
-        "built_in": any(
-            x in code_lower
-            for x in [
-                "max(", "min(", "sorted(",
-                "math.max", ".sort(",
-                "collections.max", "arrays.sort",
-                "std::max", "max_element"
-            ]
+            for_count >= 2
+            or (for_count >= 1 and while_count >= 1)
         ),
-        "binary_search": any(
-            x in code_lower for x in ["binary_search", "low", "high", "mid"]
+        "single_loop": for_count == 1 and while_count == 0,
+        "while_loop": while_count > 0,
+        "recursion": ctx.has("def", "void", "int") and ctx.count("(") > 1,
+        "built_in": ctx.has(
+            "max(", "min(", "sorted(",
+            "math.max", ".sort(",
+            "collections.max", "arrays.sort",
+            "std::max", "max_element"
         ),
+        "binary_search": ctx.has("binary_search", "low", "high", "mid"),
     }
 
 
@@ -89,6 +93,16 @@ def classify_solution(patterns):
     return "brute-force", "O(n²)", 45
 
 
+# Every (timeComplexity, score) pair classify_solution can return
+CLASSIFICATIONS = (
+    ("O(n²)", 40),
+    ("O(log n)", 90),
+    ("O(n)", 85),
+    ("O(n)", 70),
+    ("O(n²)", 45),
+)
+
+
 # --------------------------------------------------
 # FALLBACK SOLUTIONS
 # --------------------------------------------------
@@ -120,54 +134,31 @@ def generate_solution_variants(language: str):
 
 
 # --------------------------------------------------
-# MAIN PIPELINE
+# ANALYSIS-ONLY PIPELINE (no solutions, no AR payload)
 # --------------------------------------------------
-def generate_solutions(code: str, language: str):
+def analyze_code(code, language: str):
+    if isinstance(code, AnalysisContext):
+        ctx = code
+    else:
+        with stage("context"):
+            ctx = build_context(code)
 
     # 1️⃣ Detect language
-    detected_language = detect_language_from_code(code)
+    with stage("language"):
+        detected_language = detect_language_from_code(ctx)
 
     # 2️⃣ Detect problem
-    problem = detect_problem(code)
+    with stage("problem"):
+        problem = detect_problem(ctx)
 
     # 3️⃣ Analyze patterns
-    patterns = analyze_patterns(code, detected_language)
+    with stage("patterns"):
+        patterns = analyze_patterns(ctx, detected_language)
 
     # 4️⃣ Classify solution
-    solution_type, time_complexity, score = classify_solution(patterns)
-
-    # 5️⃣ Select handler
-    if problem == "linear_search":
-        variants = linear_search(detected_language)
-    elif problem == "array_max_min":
-        variants = array_max_min(detected_language)
-    elif problem == "sorting":
-        variants = sorting(detected_language)
-    elif problem == "merge_sort":
-        variants = merge_sort(detected_language)
-    elif problem == "quick_sort":
-        variants = quick_sort(detected_language)
-# ✅ NEW HANDLERS (ADD HERE)
-    elif problem == "loop":
-       variants = loop_handler(detected_language)
-    elif problem == "counting":
-       variants = counting_handler(detected_language)
-    elif problem == "sum_array":
-       variants = sum_handler(detected_language)
-    else:
-       variants = generate_solution_variants(detected_language)
-    # --------------------------------------------------
-    # ✅ FIXED AR PAYLOAD (IMPORTANT)
-    # --------------------------------------------------
-    ar_payload = generate_ar_payload(
-        problem,
-        code,
-        detected_language   # ✅ THIS FIXES YOUR UI ISSUE
-    )
+    with stage("classify"):
+        solution_type, time_complexity, score = classify_solution(patterns)
 
-    # --------------------------------------------------
-    # FINAL RESPONSE
-    # --------------------------------------------------
     return {
         "detectedLanguage": detected_language,
         "problemDetected": problem,
@@ -177,37 +168,154 @@ def generate_solutions(code: str, language: str):
             "score": score,
             "patternsDetected": patterns,
         },
-        "solutions": [
-            {
-                "type": "brute-force",
-                "title": "Brute Force Approach",
-                "description": f"Brute force solution for {problem}.",
-                "timeComplexity": "O(n²)",
-                "spaceComplexity": "O(1)",
-                "efficiency": 40,
-                "code": variants.get("brute", ""),
-                "explanation": "Checks all possible combinations."
-            },
-            {
-                "type": "better",
-                "title": "Better Approach",
-                "description": f"Improved solution for {problem}.",
-                "timeComplexity": "O(n)",
-                "spaceComplexity": "O(1)",
-                "efficiency": 70,
-                "code": variants.get("better", ""),
-                "explanation": "Reduces unnecessary work."
-            },
-            {
-                "type": "optimal",
-                "title": "Optimal Approach",
-                "description": f"Most efficient solution for {problem}.",
-                "timeComplexity": time_complexity,
-                "spaceComplexity": "O(1)",
-                "efficiency": score,
-                "code": variants.get("optimal", ""),
-                "explanation": "Best known approach."
-            }
-        ],
-        "arPayload": ar_payload   # ✅ IMPORTANT
-    }
\ No newline at end of file
+    }
+
+
+# --------------------------------------------------
+# MAIN PIPELINE
+# --------------------------------------------------
+def generate_solutions(code: str, language: str):
+
+    # 0️⃣ Normalize + scan the code once; every stage reads this context
+    with stage("context"):
+        ctx = build_context(code)
+
+    # 1️⃣–4️⃣ Language, problem, patterns, classification
+    result = analyze_code(ctx, language)
+    detected_language = result["detectedLanguage"]
+    problem = result["problemDetected"]
+    time_complexity = result["analysis"]["timeComplexity"]
+    score = result["analysis"]["score"]
+
+    # 5️⃣ Look up the pre-encoded solutions for this problem/language/class
+    with stage("solutions"):
+        solutions = solution_table(problem)[(detected_language, time_complexity, score)]
+
+    # --------------------------------------------------
+    # FINAL RESPONSE
+    # (AR payload is built lazily by /api/ar/{analysisId})
+    # --------------------------------------------------
+    return {**result, "solutions": solutions}
+
+
+# --------------------------------------------------
+# PRECOMPUTED SOLUTION TABLES
+# --------------------------------------------------
+def _solution_entries(problem, time_complexity, score, variants):
+    return [
+        {
+            "type": "brute-force",
+            "title": "Brute Force Approach",
+            "description": f"Brute force solution for {problem}.",
+            "timeComplexity": "O(n²)",
+            "spaceComplexity": "O(1)",
+            "efficiency": 40,
+            "code": variants.get("brute", ""),
+            "explanation": "Checks all possible combinations."
+        },
+        {
+            "type": "better",
+            "title": "Better Approach",
+            "description": f"Improved solution for {problem}.",
+            "timeComplexity": "O(n)",
+            "spaceComplexity": "O(1)",
+            "efficiency": 70,
+            "code": variants.get("better", ""),
+            "explanation": "Reduces unnecessary work."
+        },
+        {
+            "type": "optimal",
+            "title": "Optimal Approach",
+            "description": f"Most efficient solution for {problem}.",
+            "timeComplexity": time_complexity,
+            "spaceComplexity": "O(1)",
+            "efficiency": score,
+            "code": variants.get("optimal", ""),
+            "explanation": "Best known approach."
+        }
+    ]
+
+
+# problem -> read-only {(language, timeComplexity, score): JSONFragment}.
+# A problem's table is compiled once, covering every detected language and
+# classification, so generate_solutions is a lookup that allocates nothing
+# and the response encoder splices the bytes in as-is.
+_SOLUTION_TABLES = {}
+
+
+def solution_table(problem: str):
+    table = _SOLUTION_TABLES.get(problem)
+    if table is None:
+        handler = get_handler(problem)
+        entries = {}
+        for language in DETECTED_LANGUAGES:
+            variants = handler(language) if handler else {}
+            if not variants:
+                variants = generate_solution_variants(language)
+            for time_complexity, score in CLASSIFICATIONS:
+                entries[(language, time_complexity, score)] = JSONFragment.encode(
+                    _solution_entries(problem, time_complexity, score, variants)
+                )
+        table = _SOLUTION_TABLES[problem] = MappingProxyType(entries)
+    return table
+
+
+def precompute_solution_tables():
+    for problem in (*problem_ids(), "unknown"):
+        solution_table(problem)
+
+
+# --------------------------------------------------
+# CACHED ENTRY POINT (used by the routes)
+# --------------------------------------------------
+SOLUTION_CACHE = ResultCache(
+    max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS,
+    max_bytes=config.RESULT_CACHE_MAX_BYTES,
+    sizeof=lambda result: len(dumps(result)),
+)
+
+# Analysis-only results, keyed by the same content hash that /api/analyze
+# hands back as "analysisId". Entries are tiny, so this outlives the
+# full-result cache and lets /api/evaluate skip the pipeline entirely.
+ANALYSIS_CACHE = ResultCache(
+    max_entries=config.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS,
+    max_bytes=config.RESULT_CACHE_MAX_BYTES,
+)
+
+
+def store_solutions(key: str, solutions: dict):
+    """
+    Attach the analysis id / AR link to a fresh generate_solutions result
+    and record it in both caches. Used for results computed in-process and
+    for ones that come back from the worker pool.
+    """
+    # The link also names the scene, so it still works once the analysis
+    # entry behind the id has been evicted
+    scene = urlencode({
+        "problem": solutions["problemDetected"],
+        "language": solutions["detectedLanguage"],
+    })
+    result = {
+        **solutions,
+        "analysisId": key,
+        "arPayloadUrl": f"/api/ar/{key}?{scene}",
+    }
+    ANALYSIS_CACHE.put(key, {
+        "detectedLanguage": result["detectedLanguage"],
+        "problemDetected": result["problemDetected"],
+        "analysis": result["analysis"],
+    })
+    SOLUTION_CACHE.put(key, result)
+    return result
+
+
+def lookup_analysis(analysis_id: str):
+    return ANALYSIS_CACHE.get(analysis_id)
+
+
+def is_scene(problem: str, language: str):
+    """Whether (problem, language) names an AR scene the pipeline can produce."""
+    return language in DETECTED_LANGUAGES and (problem == "unknown" or problem in problem_ids())
+
@@ -0,0 +1,238 @@
+# backend/services/trace_animation.py
+#
+# AR payloads animated from the submission itself. The code runs in the
+# sandbox on the scene's sample array; the reads and writes it makes are
+# grouped by executed source line and turned into the usual frames:
+#   two writes that exchange values     -> swap
+#   other writes                        -> highlight (green)
+#   reads on a line with a comparison   -> compare (two indices) / check (one)
+#   other reads and slices              -> highlight / highlight_range
+# Detail levels follow ar_animation_engine: "pass" drops plain reads,
+# "keyframes" keeps writes only. Anything that can't be traced (not Python,
+# no scene, sandbox failure, array never touched) falls back to the sample
+# scene, with the reason in metadata.traceError. Reasons are fixed texts
+# (sandbox.ERROR_MESSAGES), never the worker's own output.
+import ast
+import asyncio
+
+from backend import config
+from backend.services.animation_cache import ANIMATION_CACHE, CompactTrace, animation_key
+from backend.services.ar_animation_engine import FULL, KEYFRAMES, PASS, downsample_frames
+from backend.services.ar_payload_generator import build_scene_header, generate_ar_payload
+from backend.services.metrics import stage
+from backend.services.problem_registry import get_scene
+from backend.services.result_cache import content_key
+from backend.services.sandbox import READ, SLICE, WRITE, SandboxError, error_message, run_sandboxed
+from backend.services.worker_pool import run_cpu
+
+TRACE_TEMPLATES = {
+    "trace.read": "Reading index {0} (value {1})",
+    "trace.check": "Checking index {0} (value {1})",
+    "trace.compare": "Comparing index {0} ({1}) with index {2} ({3})",
+    "trace.write": "Writing {1} to index {0}",
+    "trace.swap": "Swapping index {0} ({1}) and index {2} ({3})",
+    "trace.slice": "Working on index {0} to {1}",
+    "trace.return": "Your code returned {0}",
+    "trace.done": "Your code finished",
+    "trace.truncated": "Trace cut off after {0} array operations",
+    "trace.error": "Your code stopped: {0}",
+}
+
+_SCALARS = (type(None), bool, int, float, str)
+
+
+def _compare_lines(code: str):
+    lines = set()
+    for node in ast.walk(ast.parse(code)):
+        if isinstance(node, ast.Compare):
+            lines.update(range(node.lineno, (node.end_lineno or node.lineno) + 1))
+    return lines
+
+
+def _events(reply, size: int):
+    """(op, position, step, line, value) tuples, after checking the worker's reply."""
+    flat = reply.get("events")
+    values = reply.get("values")
+    if not isinstance(flat, list) or not isinstance(values, list) or len(flat) != 4 * len(values):
+        raise SandboxError("Malformed sandbox trace")
+    events = []
+    for i, value in enumerate(values):
+        op, position, step, line = flat[4 * i:4 * i + 4]
+        if (
+            not all(type(x) is int for x in (op, position, step, line))
+            or op not in (READ, WRITE, SLICE)
+            or not 0 <= position < size
+            or type(value) not in _SCALARS
+            or (op == SLICE and (type(value) is not int or not position <= value < size))
+        ):
+            raise SandboxError("Malformed sandbox trace")
+        events.append((op, position, step, line, value))
+    return events
+
+
+def _step_frames(group, state, compared: bool, detail: str):
+    writes = [(position, value) for op, position, _, _, value in group if op == WRITE]
+    if writes:
+        if len(writes) == 2:
+            (p, p_new), (q, q_new) = writes
+            if p != q and p_new == state[q] and q_new == state[p]:
+                state[p], state[q] = p_new, q_new
+                yield {
+                    "type": "swap",
+                    "nodeA": p,
+                    "nodeB": q,
+                    "duration": 0.8
+                }, ("trace.swap", (p, q_new, q, p_new))
+                return
+        for position, value in writes:
+            state[position] = value
+            yield {
+                "type": "highlight",
+                "node": position,
+                "color": "green",
+                "duration": 0.6
+            }, ("trace.write", (position, value))
+        return
+
+    if detail == KEYFRAMES:
+        return
+    reads = {}
+    for op, position, _, _, value in group:
+        if op == READ:
+            reads.setdefault(position, value)
+    reads = list(reads.items())
+
+    if compared and reads:
+        if len(reads) >= 2:
+            (p, p_value), (q, q_value) = reads[:2]
+            yield {
+                "type": "compare",
+                "nodeA": p,
+                "nodeB": q,
+                "color": "red",
+                "duration": 0.6
+            }, ("trace.compare", (p, p_value, q, q_value))
+        else:
+            (p, p_value), = reads
+            yield {
+                "type": "highlight",
+                "node": p,
+                "color": "red",
+                "duration": 0.6
+            }, ("trace.check", (p, p_value))
+        return
+
+    if detail == PASS:
+        return
+    for op, position, _, _, value in group:
+        if op == SLICE:
+            yield {
+                "type": "highlight_range",
+                "low": position,
+                "high": value,
+                "color": "yellow",
+                "duration": 0.8
+            }, ("trace.slice", (position, value))
+    for position, value in reads:
+        yield {
+            "type": "highlight",
+            "node": position,
+            "color": "yellow",
+            "duration": 0.5
+        }, ("trace.read", (position, value))
+
+
+def iter_trace_frames(reply, code: str, array, detail: str = FULL):
+    """Frames for a sandbox reply (see sandbox.run_submission)."""
+    events = _events(reply, len(array))
+    compare_lines = _compare_lines(code)
+    state = list(array)
+
+    start = 0
+    for end in range(1, len(events) + 1):
+        if end == len(events) or events[end][2] != events[start][2]:
+            group = events[start:end]
+            yield from _step_frames(group, state, group[0][3] in compare_lines, detail)
+            start = end
+
+    if reply.get("error"):
+        last = ("trace.error", (error_message(reply["error"]),))
+    elif reply.get("truncated"):
+        last = ("trace.truncated", (len(events),))
+    elif reply.get("result") is not None:
+        last = ("trace.return", (reply["result"],))
+    else:
+        last = ("trace.done", ())
+    yield {
+        "type": "highlight_range",
+        "low": 0,
+        "high": len(array) - 1,
+        "color": "green",
+        "duration": 1
+    }, last
+
+
+def compact_trace(reply, code: str, array, detail: str = FULL, max_frames: int = None):
+    """CompactTrace of a sandbox reply, or None if the array was never touched."""
+    with stage("trace_frames"):
+        if not reply.get("events"):
+            return None
+        frames = iter_trace_frames(reply, code, array, detail)
+        return CompactTrace(downsample_frames(frames, max_frames or config.MAX_ANIMATION_FRAMES))
+
+
+def _traced_payload(problem: str, language: str, trace: CompactTrace, detail: str):
+    header = build_scene_header(problem, language)
+    animations, explanations = trace.collect()
+    metadata = header["metadata"]
+    return {
+        **header,
+        "metadata": {
+            "problem": problem,
+            "language": language,
+            "totalSteps": len(animations),
+            "detail": detail,
+            "source": "trace",
+            "visualgoUrl": metadata["visualgoUrl"],
+        },
+        "explanationTemplates": {**header["explanationTemplates"], **TRACE_TEMPLATES},
+        "animations": animations,
+        "explanationOverlay": explanations,
+    }
+
+
+def _sample_payload(problem: str, language: str, detail: str, max_frames: int, reason: str):
+    payload = generate_ar_payload(problem, "", language, detail, max_frames)
+    payload["metadata"] = {**payload["metadata"], "source": "sample", "traceError": reason}
+    return payload
+
+
+async def trace_ar_payload(code: str, problem: str, language: str, detail: str = FULL, max_frames: int = None):
+    """AR payload animated from the submission, or the sample scene if it can't be traced."""
+    spec = get_scene(problem)
+    if language != "python":
+        return _sample_payload(problem, language, detail, max_frames, "Only Python submissions can be traced")
+    if spec is None:
+        return _sample_payload(problem, language, detail, max_frames, "No scene for this problem")
+
+    array, target = spec["array"], spec.get("target")
+    key = animation_key("trace", array, (content_key(code, language), target, detail, max_frames))
+    trace = ANIMATION_CACHE.get(key)
+    if trace is None:
+        try:
+            with stage("sandbox"):
+                reply = await asyncio.to_thread(run_sandboxed, code, array, target)
+            trace = await run_cpu(compact_trace, reply, code, array, detail, max_frames)
+        except SandboxError as exc:
+            return _sample_payload(problem, language, detail, max_frames, str(exc))
+        except SyntaxError:
+            return _sample_payload(problem, language, detail, max_frames, error_message("syntax"))
+        if trace is None:
+            if reply.get("error"):
+                reason = error_message(reply["error"])
+            else:
+                reason = "The code never read or wrote the input array"
+            return _sample_payload(problem, language, detail, max_frames, reason)
+        ANIMATION_CACHE.put(key, trace)
+
+    return _traced_payload(problem, language, trace, detail)
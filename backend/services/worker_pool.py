@@ -0,0 +1,185 @@
+# backend/services/worker_pool.py
+#
+# Execution layer for CPU-heavy pipeline stages (detection, pattern
+# analysis, animation generation). Work runs in a bounded process pool so a
+# large submission can't hold the GIL that health checks and video lookups
+# need; I/O-only routes stay on the event loop.
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend import config
+from backend.services.metrics import current_trace, observe_stages, run_timed
+from backend.services.profiling import run_profiled
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = weakref.WeakKeyDictionary()   # event loop -> (all slots, batch slots)
+
+
+class WorkerPoolSaturated(Exception):
+    """Queue depth reached; the caller should retry later (503)."""
+
+
+class WorkerTimeout(Exception):
+    """A pool task ran past LEARNFLOW_WORKER_TASK_TIMEOUT (504)."""
+
+
+def pool_size():
+    return config.WORKER_PROCESSES or os.cpu_count() or 1
+
+
+def _warm_worker():
+    # Runs once in each new worker, so its first task doesn't pay for
+    # imports and table compilation
+    from backend.services.solution_generator import precompute_solution_tables
+    precompute_solution_tables()
+
+
+def get_process_pool():
+    """Process pool for CPU-bound pipeline work, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has live threads and locks
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return _pool
+
+
+def _ready():
+    return os.getpid()
+
+
+def start_process_pool():
+    """Spawn and warm every worker now (blocking), not on the first request."""
+    pool = get_process_pool()
+    for future in [pool.submit(_ready) for _ in range(pool_size())]:
+        future.result()
+
+
+def reset_process_pool():
+    """Drop a broken pool (a worker died) so the next call starts fresh."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def batch_depth():
+    """Slots batch work may hold; at least one is always left for interactive calls."""
+    return max(1, min(config.BATCH_QUEUE_DEPTH, config.WORKER_QUEUE_DEPTH - 1))
+
+
+def _loop_slots():
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = _slots[loop] = (
+            asyncio.Semaphore(config.WORKER_QUEUE_DEPTH),
+            asyncio.Semaphore(batch_depth()),
+        )
+    return slots
+
+
+def queue_depth():
+    """Tasks currently running or queued on the pool (for this event loop)."""
+    try:
+        slots, _ = _loop_slots()
+    except RuntimeError:
+        return 0
+    return config.WORKER_QUEUE_DEPTH - slots._value
+
+
+def _release(*semaphores):
+    for semaphore in semaphores:
+        semaphore.release()
+
+
+def _release_soon(loop, semaphores):
+    # Called from the pool's management thread
+    try:
+        loop.call_soon_threadsafe(_release, *semaphores)
+    except RuntimeError:
+        pass  # event loop already closed
+
+
+async def run_cpu(fn, *args, wait: bool = False):
+    """
+    Run fn(*args) on the process pool.
+
+    Stage timings recorded inside the worker come back with the result and
+    are observed here, in the process that serves /metrics. When the
+    current request asked for a profile, the task runs under cProfile and
+    its stats are attached to the request trace.
+
+    Interactive callers (wait=False) are rejected with WorkerPoolSaturated
+    when the queue is full. Batch callers (wait=True) queue for one of the
+    batch_depth() slots first, so a large batch can't starve interactive
+    requests. A slot is held until the task really finishes, even past a
+    timeout, so abandoned work still counts against the queue depth.
+    """
+    slots, batch_slots = _loop_slots()
+    if wait:
+        await batch_slots.acquire()
+        held = (slots, batch_slots)
+        try:
+            await slots.acquire()
+        except BaseException:
+            batch_slots.release()
+            raise
+    else:
+        if slots.locked():
+            raise WorkerPoolSaturated("Analysis queue is full, retry shortly")
+        await slots.acquire()
+        held = (slots,)
+
+    loop = asyncio.get_running_loop()
+    trace = current_trace()
+    profiled = trace is not None and trace.profile
+    submitted = time.perf_counter()
+    try:
+        future = get_process_pool().submit(run_profiled if profiled else run_timed, fn, *args)
+    except BaseException:
+        _release(*held)
+        raise
+    future.add_done_callback(lambda _: _release_soon(loop, held))
+
+    try:
+        outcome = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)),
+            timeout=config.WORKER_TASK_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        future.cancel()
+        raise WorkerTimeout(f"Task exceeded {config.WORKER_TASK_TIMEOUT:g}s") from None
+    except BrokenProcessPool:
+        reset_process_pool()
+        raise
+    if profiled:
+        result, timings, stats = outcome
+        trace.profiles.append(stats)
+    else:
+        result, timings = outcome
+    if trace is not None:
+        # Round trip including queueing and pickling, next to the worker's stages
+        trace.timings.append(("pool", time.perf_counter() - submitted))
+    observe_stages(timings)
+    return result
@@ -0,0 +1,25 @@
+# backend/tests/conftest.py
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.animation_cache import ANIMATION_CACHE
+from backend.services.ar_payload_generator import AR_SCENE_CACHE
+from backend.services.solution_generator import ANALYSIS_CACHE, SOLUTION_CACHE
+
+
+@pytest.fixture(scope="session")
+def client():
+    # One app (and one spawned worker pool) for the whole run
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def clear_caches():
+    caches = (ANALYSIS_CACHE, SOLUTION_CACHE, AR_SCENE_CACHE, ANIMATION_CACHE)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,77 @@
+# backend/tests/test_analysis_context.py
+import pytest
+
+from backend.services import analysis_context, lexer
+from backend.services.analysis_context import build_context
+from backend.services.budgets import BudgetExceeded
+from backend.services.keyword_matcher import KeywordMatcher
+from backend.services.lexer import guess_mode
+
+PYTHON = "def search(arr, target):\n    # for each item\n    return arr.index(target)\n"
+C_FAMILY = "int search(int arr[], int n) {\n    for (int i = 0; i < n; i++) {}\n    return -1;\n}\n"
+
+
+@pytest.mark.parametrize("code, mode", [
+    (PYTHON, "python"),
+    ("async def run(x):\n    return x\n", "python"),
+    ("class A:\n    def go(self):\n        pass\n", "python"),
+    (C_FAMILY, "c"),
+    ("// def main():\nint main() { return 0; }\n", "c"),
+    ("x = undefined(y)\n", "c"),
+    ("", "c"),
+])
+def test_guess_mode(code, mode):
+    assert guess_mode(code) == mode
+
+
+def test_build_context_lexes_once(monkeypatch):
+    calls = []
+    real_lex = lexer.lex
+
+    def counting_lex(*args, **kwargs):
+        calls.append(args[1] if len(args) > 1 else kwargs.get("mode"))
+        return real_lex(*args, **kwargs)
+
+    monkeypatch.setattr(analysis_context, "lex", counting_lex)
+    ctx = build_context(PYTHON)
+    assert calls == ["python"]
+    assert ctx.lex_mode == "python"
+
+
+def test_comments_and_strings_do_not_count():
+    ctx = build_context('def f(arr):\n    # while sorted(\n    s = "pivot"\n    return arr\n')
+    assert ctx.has("return", "arr")
+    assert not ctx.has("while", "sorted(", "pivot")
+    assert ctx.count("return") == 1
+    assert ctx.count("while") == 0
+
+
+def test_line_of():
+    ctx = build_context(C_FAMILY)
+    assert ctx.line_of(0) == 1
+    assert ctx.line_of(C_FAMILY.index("for")) == 2
+    assert ctx.line_of(C_FAMILY.index("return")) == 3
+
+
+def test_token_budget():
+    with pytest.raises(BudgetExceeded) as info:
+        build_context(C_FAMILY, max_tokens=5)
+    assert info.value.status_code == 422
+    assert build_context(C_FAMILY, max_tokens=10_000).token_count > 5
+
+
+def test_keyword_hits():
+    matcher = KeywordMatcher(["for", "max(", "low", "for"])
+    assert matcher.keywords == ("for", "max(", "low")
+
+    hits = matcher.counts("for x in y: for z in max(x): pass")
+    assert "for" in hits and "max(" in hits
+    assert "low" not in hits
+    assert "pass" not in hits  # only the vocabulary is searched
+    assert hits["for"] == 2
+    assert hits.get("low", 0) == 0
+    assert list(hits) == ["for", "max("]
+    assert len(hits) == 2
+    assert dict(hits) == {"for": 2, "max(": 1}
+    with pytest.raises(KeyError):
+        hits["low"]
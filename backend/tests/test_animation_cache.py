@@ -0,0 +1,84 @@
+# backend/tests/test_animation_cache.py
+import pytest
+
+from backend.services.animation_cache import (
+    ANIMATION_CACHE,
+    ENGINE_FRAMES,
+    CompactTrace,
+    animation_key,
+    generate_animation,
+    memoized_trace,
+)
+from backend.services.ar_animation_engine import DETAIL_LEVELS, collect_frames
+
+ARR = [7, 3, 9, 1, 4, 8, 2]
+
+
+@pytest.mark.parametrize("detail", DETAIL_LEVELS)
+@pytest.mark.parametrize("algorithm", sorted(ENGINE_FRAMES))
+def test_compact_trace_round_trip(algorithm, detail):
+    frames = ENGINE_FRAMES[algorithm]
+    arr = sorted(ARR) if algorithm == "binary_search" else ARR
+    expected = collect_frames(frames(arr, 4, detail))
+    assert CompactTrace(frames(arr, 4, detail)).collect() == expected
+
+
+def test_compact_trace_keeps_mixed_argument_types():
+    frames = [
+        ({"type": "highlight", "node": 0, "color": "red", "duration": 0.5}, ("t.a", (1.5, "x"))),
+        ({"type": "swap", "nodeA": 0, "nodeB": 1, "duration": 0.8}, ("t.b", (2 ** 70,))),
+        ({"type": "highlight", "node": 1, "color": "red", "duration": 0.5}, ("t.a", (None, True))),
+    ]
+    trace = CompactTrace(frames)
+    assert len(trace) == 3
+    assert trace.collect() == collect_frames(frames)
+    assert trace.nbytes > 0
+
+
+def test_animation_key_tells_inputs_apart():
+    base = animation_key("sorting", [1, 2, 3])
+    assert animation_key("sorting", (1, 2, 3)) == base
+    assert animation_key("sorting", [1.0, 2, 3]) != base
+    assert animation_key("sorting", [True, 2, 3]) != base
+    assert animation_key("merge_sort", [1, 2, 3]) != base
+    assert animation_key("sorting", [1, 2, 3], ("pass",)) != base
+
+
+def test_generate_animation_is_memoized(clear_caches):
+    calls = []
+
+    def frames():
+        calls.append(1)
+        return ENGINE_FRAMES["merge_sort"](ARR, None, "full")
+
+    first = memoized_trace("merge_sort", ARR, ("test",), frames)
+    second = memoized_trace("merge_sort", ARR, ("test",), frames)
+    assert first is second and len(calls) == 1
+
+    animations, explanations = generate_animation("quick_sort", ARR)
+    hits = ANIMATION_CACHE.stats()["hits"]
+    assert generate_animation("quick_sort", ARR) == (animations, explanations)
+    assert ANIMATION_CACHE.stats()["hits"] == hits + 1
+
+
+def test_cached_results_are_fresh_copies(clear_caches):
+    animations, explanations = generate_animation("sorting", ARR)
+    animations[0]["node"] = -99
+    explanations.clear()
+    assert generate_animation("sorting", ARR) != (animations, explanations)
+
+
+def test_generate_animation_respects_max_frames(clear_caches):
+    animations, _ = generate_animation("merge_sort", list(range(200, 0, -1)), max_frames=16)
+    assert len(animations) <= 16
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        generate_animation("bogo_sort", ARR)
+
+
+def test_cache_is_bounded_by_trace_bytes(clear_caches):
+    trace = CompactTrace(ENGINE_FRAMES["merge_sort"](ARR, None, "full"))
+    assert ANIMATION_CACHE._sizeof(trace) == trace.nbytes
+    assert ANIMATION_CACHE.max_bytes > 0
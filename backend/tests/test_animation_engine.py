@@ -0,0 +1,157 @@
+# backend/tests/test_animation_engine.py
+import random
+
+import pytest
+
+from backend.services.ar_animation_engine import (
+    DETAIL_LEVELS,
+    KEYFRAMES,
+    MS_MERGE,
+    MS_PLACE,
+    QS_SWAP,
+    TraceBuffer,
+    downsample_frames,
+    generate_merge_sort_animation,
+    generate_quick_sort_animation,
+    iter_quick_sort_frames,
+    trace_merge_sort,
+    trace_quick_sort,
+)
+
+SORT_INPUTS = [
+    [],
+    [1],
+    [2, 1],
+    [5, 5, 5, 5],
+    list(range(10)),
+    list(range(10, 0, -1)),
+    [3, -1, 4, 1, -5, 9, 2, 6, 5, 3, 5],
+    [0.5, -2.25, 3.0, 0.5, 1e9],
+    random.Random(7).choices(range(20), k=257),
+    random.Random(8).sample(range(10_000), 1000),
+]
+
+
+# ─────────────────────────────────────────
+# DOWNSAMPLING
+# ─────────────────────────────────────────
+def test_downsample_without_cap_keeps_everything():
+    assert list(downsample_frames(iter(range(50)), None)) == list(range(50))
+
+
+def test_downsample_rejects_non_positive_cap():
+    with pytest.raises(ValueError):
+        list(downsample_frames(range(5), 0))
+
+
+@pytest.mark.parametrize("max_frames", [1, 2, 3, 5, 10, 64])
+@pytest.mark.parametrize("n", [0, 1, 2, 9, 10, 11, 63, 64, 65, 100, 511, 1000])
+def test_downsample_bounds(n, max_frames):
+    kept = list(downsample_frames(iter(range(n)), max_frames))
+
+    if n <= max_frames:
+        assert kept == list(range(n))
+        return
+    assert (max_frames + 1) // 2 <= len(kept) <= max_frames
+    assert kept[-1] == n - 1                # the final state is always kept
+    if max_frames >= 2:
+        assert kept[0] == 0
+    assert kept == sorted(set(kept))
+    # Evenly spaced, apart from the final frame
+    assert len({b - a for a, b in zip(kept, kept[1:-1])}) <= 1
+
+
+def test_generators_honour_max_frames():
+    arr = list(range(40, 0, -1))
+    for generate in (generate_merge_sort_animation, generate_quick_sort_animation):
+        full, _ = generate(arr)
+        capped, explanations = generate(arr, max_frames=10)
+        assert len(full) > 10
+        assert len(capped) <= 10 and len(explanations) == len(capped)
+        assert capped[-1] == full[-1]
+
+
+def test_unknown_detail_level():
+    assert "full" in DETAIL_LEVELS
+    with pytest.raises(ValueError):
+        generate_merge_sort_animation([3, 1, 2], detail="everything")
+
+
+# ─────────────────────────────────────────
+# SORT TRACES
+# ─────────────────────────────────────────
+def _replay_merge(arr, trace):
+    a, aux = list(arr), list(arr)
+    for op, x, y, z in trace:
+        if op == MS_MERGE:
+            aux[x:z + 1] = a[x:z + 1]
+        elif op == MS_PLACE:
+            a[x] = aux[y]
+    return a
+
+
+def _replay_swaps(arr, trace):
+    a = list(arr)
+    for op, x, y, _ in trace:
+        if op == QS_SWAP:
+            a[x], a[y] = a[y], a[x]
+    return a
+
+
+@pytest.mark.parametrize("arr", SORT_INPUTS)
+def test_merge_sort_trace_sorts(arr):
+    result, trace = trace_merge_sort(arr)
+    assert result == sorted(arr)
+    # The recorded events alone are enough to rebuild the sort
+    assert _replay_merge(arr, trace) == sorted(arr)
+
+
+@pytest.mark.parametrize("arr", SORT_INPUTS)
+def test_quick_sort_trace_sorts(arr):
+    result, trace = trace_quick_sort(arr)
+    assert result == sorted(arr)
+    assert _replay_swaps(arr, trace) == sorted(arr)
+
+
+def test_traces_leave_input_untouched():
+    arr = [3, 1, 2]
+    trace_merge_sort(arr)
+    trace_quick_sort(arr)
+    assert arr == [3, 1, 2]
+
+
+def test_quick_sort_stays_shallow_on_sorted_input():
+    # Median-of-three keeps already sorted input at O(n log n) compares
+    _, trace = trace_quick_sort(list(range(2048)))
+    assert len(trace) < 2048 * 11 * 2
+
+
+@pytest.mark.parametrize("arr", SORT_INPUTS[2:])
+def test_quick_sort_swap_frames_sort_the_array(arr):
+    # Full and keyframe timelines show every swap, so playing them back
+    # must end sorted
+    for detail in ("full", KEYFRAMES):
+        a = list(arr)
+        for animation, _ in iter_quick_sort_frames(arr, detail):
+            if animation["type"] == "swap":
+                x, y = animation["nodeA"], animation["nodeB"]
+                a[x], a[y] = a[y], a[x]
+        assert a == sorted(arr)
+
+
+@pytest.mark.parametrize("detail", DETAIL_LEVELS)
+def test_sort_animations_end_on_sorted_frame(detail):
+    arr = SORT_INPUTS[6]
+    for generate in (generate_merge_sort_animation, generate_quick_sort_animation):
+        animations, explanations = generate(arr, detail)
+        assert len(animations) == len(explanations)
+        assert animations[-1]["type"] == "highlight_range"
+        assert (animations[-1]["low"], animations[-1]["high"]) == (0, len(arr) - 1)
+
+
+def test_trace_buffer_grows_past_capacity():
+    trace = TraceBuffer(2)
+    for i in range(10):
+        trace.record(i, i + 1, i + 2, i + 3)
+    assert len(trace) == 10
+    assert list(trace)[9] == (9, 10, 11, 12)
@@ -0,0 +1,52 @@
+# backend/tests/test_ar_encoding.py
+import struct
+
+import pytest
+
+from backend.services.ar_encoding import MAGIC, decode_ar_binary, encode_ar_binary, to_columns
+from backend.services.ar_payload_generator import generate_ar_payload
+from backend.services.problem_registry import problem_ids
+
+
+@pytest.mark.parametrize("problem", [*problem_ids(), "unknown"])
+def test_binary_round_trip_matches_json_payload(problem):
+    payload = generate_ar_payload(problem, "", "python")
+    data = encode_ar_binary(payload)
+    assert data[:4] == MAGIC
+    assert decode_ar_binary(data) == payload
+
+
+def test_round_trip_covers_every_animation_type():
+    animations = [
+        {"type": "highlight", "node": 2, "color": "yellow", "duration": 0.5},
+        {"type": "highlight_range", "low": 0, "high": 4, "color": "green", "duration": 1},
+        {"type": "compare", "nodeA": 1, "nodeB": 3, "color": "red", "duration": 0.6},
+        {"type": "swap", "nodeA": 3, "nodeB": 1, "duration": 0.8},
+    ]
+    payload = {"metadata": {"problem": "test"}, "animations": animations}
+    assert decode_ar_binary(encode_ar_binary(payload)) == payload
+
+
+def test_empty_timeline():
+    payload = {"metadata": {}, "animations": []}
+    assert decode_ar_binary(encode_ar_binary(payload)) == payload
+
+
+def test_columns_are_four_byte_aligned():
+    # Odd frame counts need padding after the u8 columns for the i32 ones
+    payload = {"animations": [{"type": "highlight", "node": i, "duration": 0.5} for i in range(3)]}
+    data = encode_ar_binary(payload)
+    _, _, _, n, header_len = struct.unpack_from("<4sHHII", data)
+    assert n == 3
+    assert len(data) % 4 == 0
+    assert len(data) == 16 + header_len + -header_len % 4 + 2 * n + -(2 * n) % 4 + 12 * n
+
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError):
+        decode_ar_binary(b"JSON" + bytes(12))
+
+
+def test_columns_use_fixed_width_storage():
+    animations = [{"type": "compare", "nodeA": i, "nodeB": i + 1, "color": "red", "duration": 0.6} for i in range(100)]
+    assert to_columns(animations).nbytes == 100 * (1 + 1 + 4 + 4 + 4)
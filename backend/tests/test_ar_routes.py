@@ -0,0 +1,78 @@
+# backend/tests/test_ar_routes.py
+import json
+
+import pytest
+
+from backend.services.ar_encoding import BINARY_MEDIA_TYPE, decode_ar_binary
+from backend.services.solution_generator import ANALYSIS_CACHE
+
+BINARY_SEARCH = """def binary_search(arr, target):
+    low, high = 0, len(arr) - 1
+    while low <= high:
+        mid = (low + high) // 2
+        if arr[mid] == target:
+            return mid
+        elif arr[mid] < target:
+            low = mid + 1
+        else:
+            high = mid - 1
+    return -1
+"""
+
+
+@pytest.fixture
+def analysis(client, clear_caches):
+    response = client.post("/api/analyze", json={"code": BINARY_SEARCH, "language": "python"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_etag_and_not_modified(client, analysis):
+    first = client.get(analysis["arPayloadUrl"])
+    assert first.status_code == 200
+    assert first.json()["metadata"]["problem"] == "binary_search"
+    etag = first.headers["etag"]
+
+    again = client.get(analysis["arPayloadUrl"], headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    stale = client.get(analysis["arPayloadUrl"], headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_binary_variant(client, analysis):
+    response = client.get(analysis["arPayloadUrl"], headers={"Accept": BINARY_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == BINARY_MEDIA_TYPE
+    assert "Accept" in response.headers["vary"]
+
+    as_json = client.get(analysis["arPayloadUrl"])
+    assert response.headers["etag"] != as_json.headers["etag"]
+    assert decode_ar_binary(response.content) == json.loads(as_json.content)
+
+
+def test_url_survives_analysis_eviction(client, analysis):
+    before = client.get(analysis["arPayloadUrl"]).json()
+    ANALYSIS_CACHE.clear()
+    after = client.get(analysis["arPayloadUrl"])
+    assert after.status_code == 200
+    assert after.json() == before
+
+
+def test_evicted_id_without_scene_params(client, analysis):
+    ANALYSIS_CACHE.clear()
+    response = client.get(f"/api/ar/{analysis['analysisId']}")
+    assert response.status_code == 404
+    assert client.get(f"/api/ar/{analysis['analysisId']}/stream").status_code == 404
+
+
+def test_rejects_unknown_scene(client, clear_caches):
+    response = client.get("/api/ar/missing", params={"problem": "no_such_problem", "language": "python"})
+    assert response.status_code == 422
+
+
+def test_detail_validation(client, analysis):
+    assert client.get(analysis["arPayloadUrl"] + "&detail=everything").status_code == 422
+    assert client.get(analysis["arPayloadUrl"] + "&max_frames=0").status_code == 422
@@ -0,0 +1,26 @@
+# backend/tests/test_benchmarks.py
+from backend.benchmarks.run import compare, measure
+
+
+def test_measure_counts_live_blocks():
+    small = measure(lambda: [[i] for i in range(1000)], None, min_time=0)
+    large = measure(lambda: [[i] for i in range(2000)], None, min_time=0)
+    # At least one block per inner list, growing with the result
+    assert small["allocBlocks"] >= 1000
+    assert large["allocBlocks"] > 1.8 * small["allocBlocks"]
+    assert small["retainedKiB"] > 0
+    assert measure(lambda: None, None, min_time=0)["allocBlocks"] < 10
+
+
+def _stats(ms, peak, blocks=None):
+    stats = {"msPerCall": ms, "peakKiB": peak}
+    if blocks is not None:
+        stats["allocBlocks"] = blocks
+    return stats
+
+
+def test_compare_flags_block_regressions(capsys):
+    baseline = {"a": _stats(1, 10, 100), "b": _stats(1, 10, 100), "old": _stats(1, 10)}
+    results = {"a": _stats(1, 10, 100), "b": _stats(1, 10, 200), "old": _stats(1, 10, 500), "new": _stats(1, 1, 1)}
+    assert compare(results, baseline, threshold=0.1) == ["b"]
+    assert "new" in capsys.readouterr().out
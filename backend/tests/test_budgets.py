@@ -0,0 +1,88 @@
+# backend/tests/test_budgets.py
+import json
+
+import pytest
+
+from backend import config
+from backend.routes import analyze
+from backend.services.budgets import BudgetExceeded, check_code_size, limit_frames
+
+CODE = "def total(arr):\n    s = 0\n    for x in arr:\n        s += x\n    return s\n"
+
+
+async def _inline_run_cpu(fn, *args, wait=False):
+    # The spawned workers don't see monkeypatched config; run in-process
+    return fn(*args)
+
+
+def test_check_code_size():
+    check_code_size("x" * 10, limit=10)
+    with pytest.raises(BudgetExceeded) as info:
+        check_code_size("x" * 11, limit=10)
+    assert info.value.status_code == 413
+    # Counted in UTF-8 bytes, not characters
+    with pytest.raises(BudgetExceeded):
+        check_code_size("é" * 6, limit=10)
+    check_code_size("\ud800" * 3, limit=10)
+    with pytest.raises(BudgetExceeded):
+        check_code_size("\ud800" * 4, limit=10)
+
+
+def test_byte_budget_implies_token_budget():
+    # Every token is at least one byte, so code within the byte limit can't
+    # trip the token limit: oversized input is always a 413, never a 422
+    assert config.MAX_TOKENS >= config.MAX_CODE_BYTES
+
+
+def test_limit_frames():
+    assert list(limit_frames(range(3), limit=3)) == [0, 1, 2]
+    with pytest.raises(BudgetExceeded) as info:
+        list(limit_frames(range(4), limit=3))
+    assert info.value.status_code == 422
+
+
+def test_oversized_code_is_413(client, clear_caches):
+    code = "x" * (config.MAX_CODE_BYTES + 1)
+    for path in ("/api/analyze", "/api/evaluate", "/api/ar/trace"):
+        response = client.post(path, json={"code": code, "language": "python"})
+        assert response.status_code == 413, path
+        assert "byte limit" in response.json()["detail"]
+
+
+def test_lone_surrogates_are_accepted(client, clear_caches):
+    # json.dumps escapes the surrogate; the client's own encoder would refuse it
+    body = json.dumps({"code": CODE + "# \ud800\n", "language": "python"})
+    for path in ("/api/analyze", "/api/evaluate", "/api/ar/trace"):
+        response = client.post(path, content=body, headers={"Content-Type": "application/json"})
+        assert response.status_code == 200, path
+
+
+def test_too_many_tokens_is_422(client, clear_caches, monkeypatch):
+    monkeypatch.setattr(analyze, "run_cpu", _inline_run_cpu)
+    monkeypatch.setattr(config, "MAX_TOKENS", 8)
+    response = client.post("/api/analyze", json={"code": CODE, "language": "python"})
+    assert response.status_code == 422
+    assert "8-token limit" in response.json()["detail"]
+
+
+def test_batch_reports_budget_per_item(client, clear_caches):
+    items = [
+        {"code": CODE, "language": "python"},
+        {"code": "x" * (config.MAX_CODE_BYTES + 1), "language": "python"},
+    ]
+    response = client.post("/api/analyze/batch", json={"items": items})
+    assert response.status_code == 200
+    first, second = response.json()["results"]
+    assert first["ok"] and first["index"] == 0
+    assert not second["ok"] and second["status"] == 413
+
+
+def test_benchmark_token_override_is_scoped():
+    from backend.benchmarks.run import unlimited_tokens
+
+    saved = config.MAX_TOKENS
+    with pytest.raises(RuntimeError):
+        with unlimited_tokens():
+            assert config.MAX_TOKENS > saved
+            raise RuntimeError
+    assert config.MAX_TOKENS == saved
@@ -0,0 +1,53 @@
+# backend/tests/test_evaluate.py
+from backend.services.result_cache import content_key
+from backend.services.solution_generator import ANALYSIS_CACHE
+
+BINARY_SEARCH = """def binary_search(arr, target):
+    low, high = 0, len(arr) - 1
+    while low <= high:
+        mid = (low + high) // 2
+        if arr[mid] == target:
+            return mid
+        elif arr[mid] < target:
+            low = mid + 1
+        else:
+            high = mid - 1
+    return -1
+"""
+
+FIND_MAX = """def find_max(arr):
+    best = arr[0]
+    for x in arr:
+        if x > best:
+            best = x
+    return best
+"""
+
+
+def _evaluate(client, code, analysis_id=None):
+    body = {"code": code, "language": "python"}
+    if analysis_id is not None:
+        body["analysisId"] = analysis_id
+    response = client.post("/api/evaluate", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_reuses_own_analysis(client, clear_caches):
+    analysis = client.post("/api/analyze", json={"code": BINARY_SEARCH, "language": "python"}).json()
+    hits = ANALYSIS_CACHE.stats()["hits"]
+    assert _evaluate(client, BINARY_SEARCH, analysis["analysisId"]) == _evaluate(client, BINARY_SEARCH)
+    assert ANALYSIS_CACHE.stats()["hits"] > hits
+
+
+def test_foreign_analysis_id_is_ignored(client, clear_caches):
+    other = client.post("/api/analyze", json={"code": BINARY_SEARCH, "language": "python"}).json()
+    forged = _evaluate(client, FIND_MAX, other["analysisId"])
+    ANALYSIS_CACHE.clear()
+    assert forged == _evaluate(client, FIND_MAX)
+    # The foreign id's entry was left alone; this code got its own
+    assert ANALYSIS_CACHE.get(content_key(FIND_MAX, "python")) is not None
+
+
+def test_unknown_analysis_id(client, clear_caches):
+    assert _evaluate(client, FIND_MAX, "0" * 64) == _evaluate(client, FIND_MAX)
@@ -0,0 +1,48 @@
+# backend/tests/test_profiling.py
+import pytest
+
+from backend import config
+from backend.services.solution_generator import SOLUTION_CACHE
+
+CODE = "def total(arr):\n    s = 0\n    for x in arr:\n        s += x\n    return s\n"
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(config, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _analyze(client, **headers):
+    return client.post("/api/analyze", json={"code": CODE, "language": "python"}, headers=headers)
+
+
+def test_off_by_default(client, clear_caches):
+    assert not config.PROFILING_ENABLED
+    response = _analyze(client, **{"X-Profile": "1"})
+    assert response.status_code == 200
+    assert "x-profile-url" not in response.headers
+    assert client.get("/api/profiles/" + "0" * 32).status_code == 404
+
+
+def test_requires_the_token(client, clear_caches, profiling):
+    assert "x-profile-url" not in _analyze(client, **{"X-Profile": "1"}).headers
+
+    # Only pool work is profiled, so make this a cache miss again
+    SOLUTION_CACHE.clear()
+    response = _analyze(client, **{"X-Profile": "secret"})
+    url = response.headers["x-profile-url"]
+    assert client.get(url).status_code == 403
+    assert client.get(url, headers={"X-Profile": "wrong"}).status_code == 403
+
+    report = client.get(url, headers={"X-Profile": "secret"})
+    assert report.status_code == 200
+    assert str(profiling) not in report.text
+    assert url.rsplit("/", 1)[1] in report.text
+
+
+def test_rejects_bad_request_ids(client, profiling):
+    response = client.get("/api/profiles/..%2F..%2Fetc", headers={"X-Profile": "secret"})
+    assert response.status_code == 404
@@ -0,0 +1,132 @@
+# backend/tests/test_python_ast_analyzer.py
+from pathlib import Path
+
+import pytest
+
+from backend import config
+from backend.services import python_ast_analyzer
+from backend.services.python_ast_analyzer import AST_CACHE, analyze_python_patterns
+from backend.services.solution_generator import analyze_patterns, classify_solution
+
+CORPUS = Path(__file__).resolve().parents[1] / "benchmarks" / "corpus"
+
+RECURSIVE_BINARY_SEARCH = """
+def bs(arr, low, high, target):
+    if low > high:
+        return -1
+    mid = (low + high) // 2
+    if arr[mid] == target:
+        return mid
+    if arr[mid] < target:
+        return bs(arr, mid + 1, high, target)
+    return bs(arr, low, mid - 1, target)
+"""
+
+ITERATIVE_BINARY_SEARCH = """
+def search(arr, target):
+    low, high = 0, len(arr) - 1
+    while low <= high:
+        mid = low + (high - low) // 2
+        if arr[mid] < target:
+            low = mid + 1
+        elif arr[mid] > target:
+            high = mid - 1
+        else:
+            return mid
+    return -1
+"""
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    AST_CACHE.clear()
+    yield
+    AST_CACHE.clear()
+
+
+def _classify(code):
+    return classify_solution(analyze_patterns(code, "python"))
+
+
+def test_format_is_not_a_loop():
+    patterns = analyze_python_patterns(
+        'def show(before, after):\n    print("{} -> {}".format(before, after))\n'
+    )
+    assert patterns["single_loop"] is False
+    assert patterns["nested_loop"] is False
+
+
+def test_int_is_not_recursion():
+    patterns = analyze_python_patterns(
+        "def parse(items):\n    total: int = 0\n    for s in items:\n        total += int(s)\n    return total\n"
+    )
+    assert patterns["recursion"] is False
+    assert patterns["single_loop"] is True
+
+
+def test_real_recursion():
+    patterns = analyze_python_patterns("def fact(n):\n    return 1 if n < 2 else n * fact(n - 1)\n")
+    assert patterns["recursion"] is True
+    assert patterns["binary_search"] is False
+
+
+def test_iterative_binary_search():
+    assert analyze_python_patterns(ITERATIVE_BINARY_SEARCH)["binary_search"] is True
+    assert _classify(ITERATIVE_BINARY_SEARCH) == ("optimal", "O(log n)", 90)
+
+
+def test_recursive_binary_search():
+    patterns = analyze_python_patterns(RECURSIVE_BINARY_SEARCH)
+    assert patterns["recursion"] is True
+    assert patterns["binary_search"] is True
+    assert _classify(RECURSIVE_BINARY_SEARCH) == ("optimal", "O(log n)", 90)
+
+
+def test_merge_sort_corpus_keeps_its_baseline_score():
+    code = (CORPUS / "merge_sort.py").read_text()
+    assert analyze_python_patterns(code)["binary_search"] is True
+    assert _classify(code) == ("optimal", "O(log n)", 90)
+
+
+def test_halving_needs_recursion():
+    code = "def halves(arr):\n    middle = len(arr) // 2\n    return arr[:middle], arr[middle:]\n"
+    assert analyze_python_patterns(code)["binary_search"] is False
+
+
+@pytest.mark.parametrize("code", [
+    "from bisect import bisect_left\n\ndef find(a, x):\n    return bisect_left(a, x)\n",
+    "import bisect\n\ndef find(a, x):\n    return bisect.bisect_right(a, x)\n",
+])
+def test_bisect_calls(code):
+    assert analyze_python_patterns(code)["binary_search"] is True
+
+
+@pytest.mark.parametrize("code, nested", [
+    ("pairs = [(x, y) for x in a for y in a]\n", True),
+    ("pairs = {x: [y for y in a] for x in a}\n", True),
+    ("pairs = [x for x in a if x]\n", False),
+    ("total = sum(x for x in [y * 2 for y in a])\n", False),
+    ("for x in a:\n    total = sum(y for y in a)\n", True),
+])
+def test_comprehension_nesting(code, nested):
+    assert analyze_python_patterns(code)["nested_loop"] is nested
+
+
+def test_built_ins():
+    assert analyze_python_patterns("best = max(arr)\n")["built_in"] is True
+    assert analyze_python_patterns("arr.sort()\n")["built_in"] is True
+    assert analyze_python_patterns("sort(arr)\n")["built_in"] is False
+
+
+def test_unparseable_and_over_budget(monkeypatch):
+    assert analyze_python_patterns("def broken(:\n") is None
+    monkeypatch.setattr(config, "AST_NODE_BUDGET", 5)
+    assert analyze_python_patterns(ITERATIVE_BINARY_SEARCH) is None
+    # Falls back to the keyword analysis
+    assert analyze_patterns(ITERATIVE_BINARY_SEARCH, "python")["while_loop"] is True
+
+
+def test_results_are_cached(monkeypatch):
+    first = analyze_python_patterns(ITERATIVE_BINARY_SEARCH)
+    monkeypatch.setattr(python_ast_analyzer, "_walk", None)
+    assert analyze_python_patterns(ITERATIVE_BINARY_SEARCH) == first
@@ -0,0 +1,108 @@
+# backend/tests/test_result_cache.py
+from backend.services import result_cache
+from backend.services.result_cache import ResultCache, content_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _cache(max_entries=3, ttl=60.0, max_bytes=1000):
+    return ResultCache(max_entries=max_entries, ttl_seconds=ttl, max_bytes=max_bytes, sizeof=len)
+
+
+def test_get_miss_and_hit():
+    cache = _cache()
+    assert cache.get("a") is None
+    assert cache.get("a", "default") == "default"
+    cache.put("a", "xx")
+    assert cache.get("a") == "xx"
+    assert cache.stats() == {"entries": 1, "bytes": 2, "hits": 1, "misses": 2, "hitRatio": 1 / 3}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = _cache(max_entries=3)
+    for key in "abc":
+        cache.put(key, key)
+    cache.get("a")                  # a is now the most recent
+    cache.put("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in "acd"] == ["a", "c", "d"]
+
+
+def test_put_replaces_existing_entry():
+    cache = _cache()
+    cache.put("a", "x" * 10)
+    cache.put("a", "y")
+    assert cache.get("a") == "y"
+    assert cache.stats()["bytes"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    cache = _cache(ttl=10)
+    cache.put("a", "x")
+    clock.now += 9.9
+    assert cache.get("a") == "x"
+    clock.now += 0.2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_byte_ceiling_evicts_oldest():
+    cache = _cache(max_entries=100, max_bytes=10)
+    cache.put("a", "x" * 4)
+    cache.put("b", "x" * 4)
+    cache.put("c", "x" * 4)         # 12 bytes: a has to go
+    assert cache.get("a") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 8
+
+
+def test_value_larger_than_ceiling_is_not_stored():
+    cache = _cache(max_bytes=10)
+    cache.put("a", "x" * 4)
+    cache.put("big", "x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("a") == "x" * 4
+
+
+def test_get_or_compute_runs_once():
+    cache = _cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_compute("k", compute) == "value"
+    assert cache.get_or_compute("k", compute) == "value"
+    assert len(calls) == 1
+
+
+def test_clear():
+    cache = _cache()
+    cache.put("a", "x")
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_content_key_normalizes_code_and_language():
+    key = content_key("def f():\n    return 1\n", "python")
+    assert content_key("def f():   \r\n    return 1", " Python ") == key
+    assert content_key("def f():\n    return 2\n", "python") != key
+    assert content_key("def f():\n    return 1\n", "javascript") != key
+
+
+def test_content_key_accepts_lone_surrogates():
+    # "\ud800" is valid JSON, so it can arrive in a submission
+    key = content_key("x = 1  # \ud800", "python")
+    assert key == content_key("x = 1  # \ud800\n", "python")
+    assert key != content_key("x = 1  # \udc00", "python")
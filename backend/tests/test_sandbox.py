@@ -0,0 +1,124 @@
+# backend/tests/test_sandbox.py
+import os
+import sys
+import warnings
+
+import pytest
+
+from backend import config
+from backend.services import sandbox
+from backend.services.sandbox import ERROR_MESSAGES, SandboxError, error_message, get_sandbox_pool, run_sandboxed, run_submission
+from backend.services.trace_animation import iter_trace_frames
+
+CODE = "def touch(arr):\n    for i in range(len(arr)):\n        arr[i] = arr[i]\n"
+
+# Reaches the real builtins the way the reviewer's exploit did
+ESCAPE = """
+def probe(arr):
+    for c in ().__class__.__base__.__subclasses__():
+        if c.__name__ == "catch_warnings":
+            b = c()._module.__builtins__
+            os = b["__import__"]("os")
+            seen = [str(int(os.path.exists(p))) for p in PATHS]
+            return "|".join(seen + [str(os.getpid()), str(os.getuid() == 0), ",".join(os.listdir("/"))])
+"""
+
+LEAK = """
+def leak(arr):
+    for c in ().__class__.__base__.__subclasses__():
+        if c.__name__ == "catch_warnings":
+            raise ValueError(c()._module.__builtins__["open"](PATH).read())
+"""
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(sandbox, "_pool", None)
+    monkeypatch.setattr(sandbox, "_pool_error", None)
+    yield
+    sandbox.shutdown_sandbox_pool()
+
+
+@pytest.fixture
+def live_pool(monkeypatch, fresh_pool):
+    monkeypatch.setattr(config, "SANDBOX_ENABLED", True)
+    monkeypatch.setattr(config, "SANDBOX_WORKERS", 1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            return get_sandbox_pool()
+        except SandboxError:
+            pytest.skip("workers can't be isolated here (no namespaces)")
+
+
+def test_disabled_by_default(fresh_pool):
+    assert not config.SANDBOX_ENABLED
+    assert get_sandbox_pool() is None
+    with pytest.raises(SandboxError, match="disabled"):
+        run_sandboxed(CODE, [3, 1, 2])
+
+
+def test_trace_falls_back_to_the_sample_scene(client, clear_caches, fresh_pool):
+    response = client.post("/api/ar/trace", json={"code": CODE, "language": "python"})
+    assert response.status_code == 200
+    metadata = response.json()["metadata"]
+    assert metadata["source"] == "sample"
+    assert metadata["traceError"] == "Code tracing is disabled"
+
+
+@pytest.mark.skipif(sys.platform != "linux" or os.geteuid() != 0, reason="needs a root server on Linux")
+def test_refuses_to_run_as_root(monkeypatch, fresh_pool):
+    monkeypatch.setattr(config, "SANDBOX_ENABLED", True)
+    monkeypatch.setattr(config, "SANDBOX_USER", "root")
+    # The reason goes to the operator; clients get a fixed message
+    with pytest.warns(UserWarning, match="must not be root"):
+        with pytest.raises(SandboxError) as info:
+            get_sandbox_pool()
+    assert "root" not in str(info.value)
+    # The failure is remembered rather than retried on every request
+    monkeypatch.setattr(config, "SANDBOX_USER", "nobody")
+    with pytest.raises(SandboxError):
+        get_sandbox_pool()
+
+
+@pytest.mark.parametrize("code, error", [
+    ("def f(arr:\n", "syntax"),
+    ("x = 1\n", "no_function"),
+    ("def f(arr, mystery):\n    return arr\n", "arguments"),
+    ("def f(arr):\n    return arr[99]\n", "IndexError"),
+    ("def f(arr):\n    raise ValueError(repr(arr) * 3)\n", "ValueError"),
+    ("class Oops(Exception):\n    pass\n\ndef f(arr):\n    raise Oops('secret')\n", "exception"),
+])
+def test_errors_are_categories(code, error):
+    reply = run_submission(code, [3, 1, 2])
+    assert reply["ok"] is False
+    assert reply["error"] == error
+    assert error_message(error) == ERROR_MESSAGES[error]
+
+
+@pytest.mark.parametrize("key", ["Traceback: DB_PASSWORD=hunter2", 7, ["syntax"]])
+def test_unknown_error_keys_are_not_echoed(key):
+    assert error_message(key) == ERROR_MESSAGES["failure"]
+    reply = {"events": [], "values": [], "error": key}
+    (_, (template, args)), = iter_trace_frames(reply, CODE, [3, 1, 2])
+    assert template == "trace.error" and args == (ERROR_MESSAGES["failure"],)
+
+
+def test_worker_sees_no_host_files(live_pool, tmp_path):
+    secret = tmp_path / "secret.env"
+    secret.write_text("DB_PASSWORD=hunter2\n")
+    secret.chmod(0o644)
+    paths = ["/etc/passwd", "/proc/1/cmdline", "/proc/self/environ", str(secret), os.getcwd()]
+    reply = run_sandboxed(ESCAPE.replace("PATHS", repr(paths)), [3, 1, 2])
+    assert reply["ok"], reply
+    *seen, pid, is_root, root_listing = reply["result"].split("|")
+    assert seen == ["0"] * len(paths)
+    assert pid == "1" and is_root == "False"
+    assert "etc" not in root_listing.split(",")
+
+
+def test_worker_exception_text_stays_in_the_worker(live_pool):
+    # The Python install is the one thing the worker can read
+    reply = run_sandboxed(LEAK.replace("PATH", repr(os.__file__)), [3, 1, 2])
+    assert reply["error"] == "ValueError"
+    assert "import" not in str(reply)
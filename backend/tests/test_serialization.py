@@ -0,0 +1,77 @@
+# backend/tests/test_serialization.py
+import json
+
+import pytest
+
+from backend.services import serialization
+from backend.services.serialization import JSONFragment, dumps
+
+orjson = serialization.orjson
+has_fragment = orjson is not None and hasattr(orjson, "Fragment")
+
+ENCODERS = [
+    pytest.param((False, False), id="stdlib"),
+    pytest.param((True, False), id="orjson-placeholders",
+                 marks=pytest.mark.skipif(orjson is None, reason="orjson not installed")),
+    pytest.param((True, True), id="orjson-native",
+                 marks=pytest.mark.skipif(not has_fragment, reason="orjson without Fragment")),
+]
+
+
+@pytest.fixture(params=ENCODERS)
+def encoder(request, monkeypatch):
+    use_orjson, native = request.param
+    monkeypatch.setattr(serialization, "_USE_ORJSON", use_orjson)
+    monkeypatch.setattr(serialization, "_NATIVE_FRAGMENTS", native)
+
+
+def test_plain_values(encoder):
+    value = {"a": [1, 2.5, None, True], "b": {"c": "é"}}
+    assert json.loads(dumps(value)) == value
+
+
+def test_fragment_is_spliced_verbatim(encoder):
+    fragment = JSONFragment(b'{"z":1,  "a":[1,2]}')
+    body = dumps({"scene": fragment, "n": 1})
+    assert b'{"z":1,  "a":[1,2]}' in body
+    assert json.loads(body) == {"scene": {"z": 1, "a": [1, 2]}, "n": 1}
+
+
+def test_fragments_inside_a_list(encoder):
+    items = [JSONFragment("1"), {"x": JSONFragment(b'"two"')}, JSONFragment(b"[3]"), 4]
+    assert json.loads(dumps(items)) == [1, {"x": "two"}, [3], 4]
+
+
+def test_nested_fragments(encoder):
+    inner = JSONFragment.encode({"inner": JSONFragment(b"[1,2,3]")})
+    outer = JSONFragment.encode({"outer": inner, "list": [inner]})
+    expected = {"inner": [1, 2, 3]}
+    assert json.loads(dumps({"top": outer})) == {"top": {"outer": expected, "list": [expected]}}
+
+
+def test_nul_characters_in_strings(encoder):
+    token = serialization._TOKEN
+    values = [
+        "\u0000",
+        "a\u0000b",
+        f"\u0000{token}:0",           # not a complete placeholder
+        f"\u0000{'0' * 16}:0\u0000",  # placeholder shape, wrong token
+    ]
+    payload = {"values": values, "fragment": JSONFragment(b"[0]")}
+    assert json.loads(dumps(payload)) == {"values": values, "fragment": [0]}
+
+
+def test_wide_ints_fall_back_to_stdlib(encoder):
+    value = {"big": 2 ** 70, "neg": -(2 ** 64), "fragment": JSONFragment(b'{"k":1}')}
+    assert json.loads(dumps(value)) == {"big": 2 ** 70, "neg": -(2 ** 64), "fragment": {"k": 1}}
+
+
+def test_unsupported_types_still_fail(encoder):
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def test_json_response_renders_fragments(encoder):
+    response = serialization.json_response({"f": JSONFragment(b"[1]")}, status_code=201)
+    assert response.status_code == 201
+    assert json.loads(response.body) == {"f": [1]}
@@ -0,0 +1,59 @@
+# backend/tests/test_worker_pool.py
+import asyncio
+import os
+import time
+
+import pytest
+
+from backend import config
+from backend.services import worker_pool
+from backend.services.worker_pool import WorkerPoolSaturated, batch_depth, queue_depth, run_cpu
+
+
+@pytest.fixture
+def small_queue(monkeypatch):
+    # Slots are per event loop, so each asyncio.run below gets fresh ones
+    monkeypatch.setattr(config, "WORKER_QUEUE_DEPTH", 3)
+    monkeypatch.setattr(config, "BATCH_QUEUE_DEPTH", 16)
+
+
+@pytest.mark.parametrize("queue, batch, expected", [
+    (64, 16, 16),
+    (3, 16, 2),
+    (1, 16, 1),
+    (64, 0, 1),
+])
+def test_batch_depth(monkeypatch, queue, batch, expected):
+    monkeypatch.setattr(config, "WORKER_QUEUE_DEPTH", queue)
+    monkeypatch.setattr(config, "BATCH_QUEUE_DEPTH", batch)
+    assert batch_depth() == expected
+
+
+def test_batch_leaves_room_for_interactive_calls(small_queue):
+    async def scenario():
+        batch = [asyncio.create_task(run_cpu(time.sleep, 0.3, wait=True)) for _ in range(6)]
+        await asyncio.sleep(0.05)
+        assert queue_depth() == batch_depth() == 2
+        pid = await run_cpu(os.getpid)
+        await asyncio.gather(*batch)
+        return pid
+
+    assert asyncio.run(scenario()) != os.getpid()
+
+
+def test_interactive_calls_fail_fast_when_full(small_queue):
+    async def scenario():
+        busy = [asyncio.create_task(run_cpu(time.sleep, 0.3)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(WorkerPoolSaturated):
+            await run_cpu(os.getpid)
+        await asyncio.gather(*busy)
+        await asyncio.sleep(0.05)  # slots are released from the pool's thread
+        assert queue_depth() == 0
+
+    asyncio.run(scenario())
+
+
+def test_start_process_pool_warms_every_worker():
+    worker_pool.start_process_pool()
+    assert worker_pool._pool is not None
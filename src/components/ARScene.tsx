@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { ExternalLink } from "lucide-react";
+import { expandExplanation } from "@/lib/arExplanations";
 interface ARSceneProps {
   arPayload: any;
 }
@@ -14,6 +15,7 @@ export const ARScene = ({ arPayload }: ARSceneProps) => {
 
   const animations = arPayload.animations || [];
   const explanations = arPayload.explanationOverlay || [];
+  const explanationTemplates = arPayload.explanationTemplates || {};
   const metadata = arPayload.metadata || {};
   const currentAnimation = animations[currentStep];
 
@@ -228,7 +230,7 @@ export const ARScene = ({ arPayload }: ARSceneProps) => {
               Current Step Explanation
             </p>
             <p className="font-medium text-gray-800">
-              {explanations[currentStep] ||
+              {expandExplanation(explanations[currentStep], explanationTemplates) ||
                 "Click 'Auto Play' or 'Next' to begin visualization."}
             </p>
           </div>
@@ -1,4 +1,5 @@
 // src/lib/api.ts
+import { AR_BINARY_MEDIA_TYPE, decodeArBinary } from "@/lib/arBinary";
 
 const API_BASE_URL = "http://127.0.0.1:8001/api";
 
@@ -22,13 +23,17 @@ export async function analyzeCode(code: string, language: string) {
 }
 
 /* ---------- Evaluate Code ---------- */
-export async function evaluateCode(code: string, language: string) {
+export async function evaluateCode(
+  code: string,
+  language: string,
+  analysisId?: string
+) {
   const response = await fetch(`${API_BASE_URL}/evaluate/`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
     },
-    body: JSON.stringify({ code, language }),
+    body: JSON.stringify({ code, language, analysisId }),
   });
 
   if (!response.ok) {
@@ -40,6 +45,50 @@ export async function evaluateCode(code: string, language: string) {
   return await response.json();
 }
 
+/* ---------- Fetch AR Payload (lazy) ---------- */
+export type ArDetail = "full" | "pass" | "keyframes";
+
+export async function fetchArPayload(
+  analysisId: string,
+  options: {
+    detail?: ArDetail;
+    maxFrames?: number;
+    // Scene from the analyze response; lets the server rebuild it after
+    // the analysis behind analysisId has expired
+    problem?: string;
+    language?: string;
+  } = {}
+) {
+  const params = new URLSearchParams();
+  if (options.problem && options.language) {
+    params.set("problem", options.problem);
+    params.set("language", options.language);
+  }
+  if (options.detail) params.set("detail", options.detail);
+  if (options.maxFrames) params.set("max_frames", String(options.maxFrames));
+  const query = params.toString();
+
+  const response = await fetch(
+    `${API_BASE_URL}/ar/${encodeURIComponent(analysisId)}${query ? `?${query}` : ""}`,
+    {
+      headers: {
+        Accept: `${AR_BINARY_MEDIA_TYPE}, application/json;q=0.9`,
+      },
+    }
+  );
+
+  if (!response.ok) {
+    const errorText = await response.text();
+    console.error("AR API error:", errorText);
+    throw new Error("Failed to fetch AR payload");
+  }
+
+  if (response.headers.get("Content-Type")?.startsWith(AR_BINARY_MEDIA_TYPE)) {
+    return decodeArBinary(await response.arrayBuffer());
+  }
+  return await response.json();
+}
+
 /* ---------- Fetch Video ---------- */
 export async function fetchVideo(language: string, concept: string) {
   const response = await fetch(
@@ -0,0 +1,57 @@
+// src/lib/arBinary.ts
+// Decoder for the packed columnar AR payload (see backend/services/ar_encoding.py)
+
+export const AR_BINARY_MEDIA_TYPE = "application/vnd.learnflow.ar+binary";
+
+const MAGIC = "LFAR";
+const FORMAT_VERSION = 1;
+
+const pad4 = (n: number) => (4 - (n % 4)) % 4;
+
+export function decodeArBinary(buffer: ArrayBuffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0),
+    view.getUint8(1),
+    view.getUint8(2),
+    view.getUint8(3)
+  );
+  if (magic !== MAGIC || view.getUint16(4, true) !== FORMAT_VERSION) {
+    throw new Error("Not a Learn-Flow AR binary payload");
+  }
+
+  const count = view.getUint32(8, true);
+  const headerLength = view.getUint32(12, true);
+  let offset = 16;
+
+  const header = JSON.parse(
+    new TextDecoder().decode(new Uint8Array(buffer, offset, headerLength))
+  );
+  offset += headerLength + pad4(headerLength);
+
+  const { types, colors, fields } = header.animationTables;
+  delete header.animationTables;
+
+  const kindOffset = offset;
+  const colorOffset = offset + count;
+  offset += 2 * count + pad4(2 * count);
+  const aOffset = offset;
+  const bOffset = aOffset + 4 * count;
+  const durationOffset = bOffset + 4 * count;
+
+  const animations = new Array(count);
+  for (let i = 0; i < count; i++) {
+    const type = types[view.getUint8(kindOffset + i)];
+    const [fieldA, fieldB] = fields[type];
+    const animation: Record<string, unknown> = { type };
+    animation[fieldA] = view.getInt32(aOffset + 4 * i, true);
+    if (fieldB) animation[fieldB] = view.getInt32(bOffset + 4 * i, true);
+    const color = view.getUint8(colorOffset + i);
+    if (color) animation.color = colors[color];
+    animation.duration =
+      Math.round(view.getFloat32(durationOffset + 4 * i, true) * 1e4) / 1e4;
+    animations[i] = animation;
+  }
+
+  return { ...header, animations };
+}
@@ -0,0 +1,16 @@
+// src/lib/arExplanations.ts
+// AR payloads send explanations as [templateId, ...args] plus one
+// explanationTemplates table; expand an entry into display text.
+
+export function expandExplanation(
+  entry: unknown,
+  templates: Record<string, string> = {}
+): string {
+  if (!Array.isArray(entry)) return (entry as string) ?? "";
+
+  const [templateId, ...args] = entry;
+  const template = templates[templateId];
+  if (template === undefined) return "";
+
+  return template.replace(/\{(\d+)\}/g, (_, index) => String(args[Number(index)]));
+}
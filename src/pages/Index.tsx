@@ -8,7 +8,7 @@ import { SolutionComparison } from "@/components/SolutionComparison";
 import { CodeEvaluation } from "@/components/CodeEvaluation";
 import { ARVideoPlayer } from "@/components/ARVideoPlayer";
 import { ARScene } from "@/components/ARScene";
-import { analyzeCode, evaluateCode, fetchVideo } from "@/lib/api";
+import { analyzeCode, evaluateCode, fetchArPayload, fetchVideo } from "@/lib/api";
 
 import {
   Brain,
@@ -32,6 +32,8 @@ const Index = () => {
   const [evaluation, setEvaluation] = useState<any | null>(null);
   const [video, setVideo] = useState<any | null>(null);
   const [arPayload, setArPayload] = useState<any | null>(null);
+  const [analysisId, setAnalysisId] = useState<string | null>(null);
+  const [arScene, setArScene] = useState<{ problem: string; language: string } | null>(null);
 
   const { toast } = useToast();
 
@@ -45,10 +47,21 @@ const Index = () => {
       // 1️⃣ Analyze Code
       const analysisRes = await analyzeCode(code, language);
       setSolutions(analysisRes.solutions || []);
-      setArPayload(analysisRes.arPayload || null);
-
-      // 2️⃣ Evaluate Code
-      const evaluationRes = await evaluateCode(code, language);
+      // AR payload is fetched lazily from /api/ar when first needed
+      setArPayload(null);
+      setAnalysisId(analysisRes.analysisId || null);
+      setArScene(
+        analysisRes.problemDetected && analysisRes.detectedLanguage
+          ? { problem: analysisRes.problemDetected, language: analysisRes.detectedLanguage }
+          : null
+      );
+
+      // 2️⃣ Evaluate Code (reuses the analysis above via its id)
+      const evaluationRes = await evaluateCode(
+        code,
+        language,
+        analysisRes.analysisId
+      );
       setEvaluation(evaluationRes || null);
 
       // 3️⃣ Fetch Video
@@ -60,7 +73,7 @@ const Index = () => {
 
       toast({
         title: "Analysis Complete",
-        description: "Code analyzed, evaluation generated, AR payload ready.",
+        description: "Code analyzed, evaluation generated, AR scene available.",
       });
     } catch (error) {
       console.error(error);
@@ -76,8 +89,22 @@ const Index = () => {
 
   /* ------------------- NAVIGATION HANDLERS ------------------- */
 
-  const handleViewInAR = () => {
-    if (!arPayload) {
+  const loadArPayload = async () => {
+    if (arPayload) return arPayload;
+    if (!analysisId) return null;
+    try {
+      const payload = await fetchArPayload(analysisId, arScene ?? {});
+      setArPayload(payload);
+      return payload;
+    } catch (error) {
+      console.error(error);
+      return null;
+    }
+  };
+
+  const handleViewInAR = async () => {
+    const payload = await loadArPayload();
+    if (!payload) {
       toast({
         title: "AR Not Available",
         description: "AR payload not generated for this problem.",
@@ -88,10 +115,13 @@ const Index = () => {
     setCurrentStep("ar");
   };
 
-  const handleWatchVideo = () => setCurrentStep("video");
+  const handleWatchVideo = () => {
+    loadArPayload();
+    setCurrentStep("video");
+  };
 
-  const handleEnterAR = () => {
-    if (arPayload) setCurrentStep("ar");
+  const handleEnterAR = async () => {
+    if (await loadArPayload()) setCurrentStep("ar");
   };
 
   /* ------------------- UI ------------------- */
@@ -222,7 +252,7 @@ const Index = () => {
                   </Button>
                   <Button
                     variant="ar-outline"
-                    onClick={() => setCurrentStep("video")}
+                    onClick={handleWatchVideo}
                   >
                     <Eye className="w-4 h-4 mr-2" />
                     Watch Video